@@ -0,0 +1,70 @@
+"""
+Отчеты по задачам: проход по объектам `Task` против колоночной таблицы.
+
+    python -m benchmarks.bench_columnar --count 1000000
+"""
+import argparse
+import time
+from collections import Counter
+from datetime import datetime
+
+from benchmarks.generate import make_records
+from tasks.columnar import TaskTable, numpy
+from tasks.models import Task
+
+# Момент, относительно которого считаются просроченные задачи
+NOW = datetime(2025, 1, 15)
+
+
+def timed(func) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def bench_objects(tasks: list[Task]) -> dict[str, float]:
+    """Отчеты в стиле `get_cats`/`get_incompleted`: по объектам."""
+    return {
+        "category": timed(lambda: Counter(task.category for task in tasks))[0],
+        "status": timed(lambda: sum(1 for task in tasks if task.status))[0],
+        "overdue": timed(lambda: [task.id for task in tasks
+                                  if not task.status and task.deadline_at < NOW])[0],
+    }
+
+
+def bench_table(table: TaskTable) -> dict[str, float]:
+    """Те же отчеты по колонкам."""
+    return {
+        "category": timed(table.count_by_category)[0],
+        "status": timed(table.count_by_status)[0],
+        "overdue": timed(lambda: table.overdue_ids(NOW))[0],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    records = list(make_records(args.count))
+    tasks = [Task.from_dict(task_map) for task_map in records]
+    # Срок разбирается при первом обращении, как при показе задач
+    for task in tasks:
+        task.deadline_at
+
+    results = {"Task": bench_objects(tasks)}
+    build_time, _ = timed(lambda: TaskTable(use_numpy=False).rebuild(records))
+    for use_numpy in ((False, True) if numpy is not None else (False,)):
+        table = TaskTable(use_numpy=use_numpy)
+        table.rebuild(records)
+        results["numpy" if use_numpy else "array"] = bench_table(table)
+
+    print(f"Задач: {args.count}, построение таблицы: {build_time:.2f} с")
+    print(f"{'способ':<7} {'категории, мс':>14} {'статусы, мс':>12} {'просрочено, мс':>15}")
+    for name, result in results.items():
+        print(f"{name:<7} {result['category'] * 1000:>14.1f} "
+              f"{result['status'] * 1000:>12.1f} {result['overdue'] * 1000:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Сравнение форматов хранения задач: время записи, чтения и размер файла.
+
+    python -m benchmarks.bench_formats --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.generate import make_records
+from utils.formats import FORMATS, read_records
+
+
+def bench_format(name: str, records: list[dict], directory: str) -> dict:
+    """Замерить один формат на готовом списке задач."""
+    path = os.path.join(directory, f"tasks.{name}")
+    store_format = FORMATS[name]
+
+    start = time.perf_counter()
+    store_format.write(path, records)
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    count = sum(1 for _ in read_records(path))
+    load_time = time.perf_counter() - start
+    assert count == len(records)
+
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {"format": name, "save": save_time, "load": load_time, "size": size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--formats", nargs="+", choices=sorted(FORMATS),
+                        default=list(FORMATS))
+    args = parser.parse_args()
+
+    print(f"{'задач':>9} {'формат':<13} {'запись, с':>10} {'чтение, с':>10} {'размер, МБ':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            records = list(make_records(size))
+            for name in args.formats:
+                result = bench_format(name, records, directory)
+                print(f"{size:>9} {name:<13} {result['save']:>10.3f} "
+                      f"{result['load']:>10.3f} {result['size'] / 2 ** 20:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
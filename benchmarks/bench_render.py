@@ -0,0 +1,76 @@
+"""
+Отрисовка страницы списка задач: время кадра и байты в терминал.
+Сравниваются сборка строк задач с нуля и очистка экрана на каждый
+кадр против `RenderCache` и перерисовки по разнице кадров (`Screen`).
+
+    python -m benchmarks.bench_render --frames 200 --page 20
+"""
+import argparse
+import io
+import time
+
+from rich.console import Console
+from rich.padding import Padding
+
+from benchmarks.generate import make_records
+from tasks.models import Task
+from tasks.views import TaskCLI
+from utils.funcs import make_panel
+from utils.render import Screen
+
+
+def make_console(output: io.StringIO) -> Console:
+    """Консоль как у терминала 120x60, но с выводом в память."""
+    return Console(file=output, force_terminal=True, color_system="truecolor",
+                   width=120, height=60)
+
+
+def bench_frames(tasks: list[Task], frames: int, fast: bool) -> dict[str, float]:
+    """
+    Нарисовать `frames` кадров одной страницы. Каждый второй кадр
+    у одной задачи меняется статус, как после отметки о выполнении.
+    :param fast: С кэшем строк и перерисовкой по разнице.
+    """
+    output = io.StringIO()
+    task_cli = TaskCLI()
+    task_cli.console = make_console(output)
+    screen = Screen(task_cli.console, diff=fast)
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        if frame % 2:
+            task = tasks[frame % len(tasks)]
+            task.status = not task.status
+            task_cli.render_cache.invalidate(task.id)
+        if fast:
+            rows = [task_cli.abb_repr_task(num, task) for num, task in enumerate(tasks, 1)]
+        else:
+            rows = [Padding(task_cli.build_abb_task(num, task, False), pad=(1, 1))
+                    for num, task in enumerate(tasks, 1)]
+        panel = make_panel(*rows, task_cli.options_panel, title="Список всех задач")
+        if fast:
+            screen.draw(panel)
+        else:
+            # Как раньше: очистка и кадр целиком
+            task_cli.console.clear()
+            task_cli.console.print(panel)
+    elapsed = time.perf_counter() - start
+    return {"frame": elapsed / frames, "bytes": len(output.getvalue().encode()) / frames}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--page", type=int, default=6, help="Задач на странице")
+    args = parser.parse_args()
+
+    print(f"Кадров: {args.frames}, задач на странице: {args.page}")
+    print(f"{'способ':<18} {'кадр, мс':>9} {'байт/кадр':>10}")
+    for name, fast in (("очистка + сборка", False), ("кэш + разница", True)):
+        tasks = [Task.from_dict(task_map) for task_map in make_records(args.page)]
+        result = bench_frames(tasks, args.frames, fast)
+        print(f"{name:<18} {result['frame'] * 1000:>9.2f} {result['bytes']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Один файл задач против шардов: чтение всех задач и цена одной правки.
+
+    python -m benchmarks.bench_shards --count 1000000 --shards 1 2 4 8
+
+Для шардов чтение меряется дважды: по очереди в одном процессе
+и параллельно в пуле процессов (`settings.shard_workers`). Пул
+запускается до замеров, как и в работе: он один на менеджер.
+
+Параллельное чтение раскладывается на этапы: разбор шарда с упаковкой
+в процессе пула, распаковка в родителе и слияние. Из них собирается
+оценка времени на машине, где ядер не меньше, чем шардов: самый
+долгий шард плюс то, что родитель делает один. На машине с одним
+ядром это единственный честный способ оценить выигрыш пула.
+"""
+import argparse
+import itertools
+import marshal
+import os
+import tempfile
+import time
+
+from benchmarks.generate import make_records
+from settings import settings
+from tasks.db import TaskManagerJSON
+from tasks.sharded import TaskManagerSharded, by_id, decode_shard
+from utils.formats import get_format
+
+
+def best(func, repeat: int) -> float:
+    """Лучшее время из `repeat` запусков."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def estimate_parallel(manager: TaskManagerSharded, repeat: int) -> dict[str, float]:
+    """
+    Этапы параллельного чтения, каждый замерен отдельно в этом процессе.
+    :return: Самый долгий шард в пуле, распаковка, слияние и их сумма -
+    время чтения, если на каждый шард хватает ядра.
+    """
+    paths = [shard.path for shard in manager.shards]
+    worker = max(best(lambda: decode_shard(path), repeat) for path in paths)
+    blobs = [decode_shard(path) for path in paths]
+    unpack = best(lambda: [marshal.loads(blob) for blob in blobs], repeat)
+    parts = [marshal.loads(blob) for blob in blobs]
+    merge = best(lambda: sorted(itertools.chain(*parts), key=by_id), repeat)
+    return {"worker": worker, "unpack": unpack, "merge": merge,
+            "total": worker + unpack + merge}
+
+
+def edit(manager, task_id: int) -> None:
+    manager.update_tasks({task_id: {"status": True}})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    saved = (settings.path_db, settings.path_auto_incr, settings.path_shards,
+             settings.parallel_load_min_bytes)
+    with tempfile.TemporaryDirectory() as directory:
+        settings.path_db = os.path.join(directory, "data.json")
+        settings.path_auto_incr = os.path.join(directory, "auto_increment_tasks.txt")
+        try:
+            get_format(settings.storage_format).write(settings.path_db, make_records(args.count))
+            with open(settings.path_auto_incr, "w", encoding="utf-8") as file:
+                file.write(str(args.count))
+            task_id = args.count // 2
+
+            print(f"ядер: {os.cpu_count()}")
+            print(f"{'хранилище':<14} {'чтение, мс':>11} {'в пуле, мс':>11} "
+                  f"{'шард/распаковка/слияние, мс':>28} {'оценка, мс':>11} {'правка, мс':>11}")
+            single = TaskManagerJSON()
+            print(f"{'один файл':<14} {best(single.load_data, args.repeat) * 1000:>11.1f} "
+                  f"{'-':>11} {'-':>28} {'-':>11} "
+                  f"{best(lambda: edit(single, task_id), args.repeat) * 1000:>11.1f}")
+
+            for count in args.shards:
+                settings.path_shards = os.path.join(directory, f"shards-{count}")
+                manager = TaskManagerSharded(count=count)
+                try:
+                    settings.parallel_load_min_bytes = float("inf")
+                    sequential = best(manager.load_data, args.repeat)
+                    settings.parallel_load_min_bytes = 0
+                    manager.load_data()
+                    parallel = best(manager.load_data, args.repeat)
+                    stages = estimate_parallel(manager, args.repeat)
+                    edit_time = best(lambda: edit(manager, task_id), args.repeat)
+                finally:
+                    manager.close()
+                breakdown = "/".join(f"{stages[key] * 1000:.0f}"
+                                     for key in ("worker", "unpack", "merge"))
+                print(f"{f'{count} шардов':<14} {sequential * 1000:>11.1f} "
+                      f"{parallel * 1000:>11.1f} {breakdown:>28} "
+                      f"{stages['total'] * 1000:>11.1f} {edit_time * 1000:>11.1f}")
+        finally:
+            (settings.path_db, settings.path_auto_incr, settings.path_shards,
+             settings.parallel_load_min_bytes) = saved
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Операции хранилища JSON на разных объемах: время и пик памяти.
+
+    python -m benchmarks.bench_store --sizes 1000 10000 100000 1000000
+    python -m benchmarks.bench_store --save-baseline
+    python -m benchmarks.bench_store --threshold 0.3
+
+Результаты сравниваются с базовыми из `benchmarks/baselines.json`:
+если операция стала медленнее или прожорливее больше чем на `--threshold`,
+скрипт завершается с кодом 1. Время зависит от машины, поэтому базовые
+значения записываются на той же машине, где потом идет сравнение
+(`--save-baseline`).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from benchmarks.generate import make_records
+from settings import settings
+from tasks.db import TaskManagerJSON
+from tasks.models import Task
+from utils.formats import get_format
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Разница во времени меньше этой (в секундах) - шум, а не регрессия
+MIN_TIME_DELTA = 0.005
+# Запрос для `find_to_entry_title`: слово целиком и начало слова
+SEARCH_QUERY = "отчет сроч"
+
+
+@contextmanager
+def temp_store(records: list[dict]) -> Iterator[TaskManagerJSON]:
+    """Менеджер задач на временном файле с готовыми задачами."""
+    saved = settings.path_db, settings.path_auto_incr
+    with tempfile.TemporaryDirectory() as directory:
+        settings.path_db = os.path.join(directory, "data.json")
+        settings.path_auto_incr = os.path.join(directory, "auto_increment_tasks.txt")
+        try:
+            get_format(settings.storage_format).write(settings.path_db, records)
+            with open(settings.path_auto_incr, "w", encoding="utf-8") as file:
+                file.write(str(len(records)))
+            manager = TaskManagerJSON()
+            yield manager
+            # Неиспользованные ID возвращаются в файл, пока он существует
+            manager.manager_id.release()
+        finally:
+            settings.path_db, settings.path_auto_incr = saved
+
+
+def make_operations(manager: TaskManagerJSON, size: int) -> dict[str, Callable[[], object]]:
+    """Операции для замера. Данные для `save_data` и `find_by_id` готовятся заранее."""
+    all_tasks = manager.load_data()
+    rnd = random.Random(size)
+
+    def add_task() -> None:
+        manager.add_task(Task(
+            title="Новая задача из замера", description="Проверка добавления",
+            category="Работа", deadline="2025-02-01T12:00:00.000001",
+            priority="Средний", status=False,
+        ))
+
+    return {
+        "load_data": manager.load_data,
+        "save_data": lambda: manager.save_data(all_tasks),
+        "add_task": add_task,
+        "find_by_id": lambda: manager.find_by_id(all_tasks, rnd.randint(1, size)),
+        "get_cats": manager.get_cats,
+        "get_incompleted": manager.get_incompleted,
+        "find_to_entry_title": lambda: manager.find_to_entry_title(SEARCH_QUERY),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    """
+    Лучшее время из `repeat` запусков и пик памяти отдельным запуском:
+    `tracemalloc` замедляет код, поэтому время с ним не меряется.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"time": best, "peak": peak}
+
+
+def bench_size(size: int, operations: list[str], repeat: int) -> dict[str, dict]:
+    """Замерить операции на `size` задачах."""
+    records = list(make_records(size))
+    with temp_store(records) as manager:
+        del records
+        funcs = make_operations(manager, size)
+        return {name: measure(funcs[name], repeat) for name in operations}
+
+
+def compare(result: dict, baseline: dict | None, threshold: float) -> list[str]:
+    """
+    Чем результат хуже базового больше чем на `threshold`.
+    :return: Описания регрессий, пустой список - регрессий нет.
+    """
+    if baseline is None:
+        return []
+    problems = []
+    if (result["time"] > baseline["time"] * (1 + threshold)
+            and result["time"] - baseline["time"] > MIN_TIME_DELTA):
+        problems.append(f"время {baseline['time']:.4f} -> {result['time']:.4f} с")
+    if result["peak"] > baseline["peak"] * (1 + threshold):
+        problems.append(f"память {baseline['peak'] / 2 ** 20:.2f} -> "
+                        f"{result['peak'] / 2 ** 20:.2f} МБ")
+    return problems
+
+
+def load_baselines(path: str) -> dict:
+    """Базовые результаты: число задач -> операция -> время и пик памяти."""
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    operations = ["load_data", "save_data", "add_task", "find_by_id",
+                  "get_cats", "get_incompleted", "find_to_entry_title"]
+    parser.add_argument("--ops", nargs="+", choices=operations, default=operations)
+    parser.add_argument("--repeat", type=int, default=5, help="Запусков на замер времени")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Файл базовых результатов")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Записать результаты как базовые")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Допустимое ухудшение, 0.25 - на 25%%")
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baseline)
+    regressions = []
+    print(f"{'задач':>9} {'операция':<20} {'время, мс':>10} {'пик, МБ':>9} {'к базовому':>11}")
+    for size in args.sizes:
+        results = bench_size(size, args.ops, args.repeat)
+        size_baselines = baselines.setdefault(str(size), {})
+        for name, result in results.items():
+            baseline = size_baselines.get(name)
+            change = (f"{result['time'] / baseline['time'] - 1:>+10.0%}"
+                      if baseline else f"{'нет':>11}")
+            print(f"{size:>9} {name:<20} {result['time'] * 1000:>10.2f} "
+                  f"{result['peak'] / 2 ** 20:>9.2f} {change}")
+            for problem in compare(result, baseline, args.threshold):
+                regressions.append(f"{size} {name}: {problem}")
+        if args.save_baseline:
+            size_baselines.update(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        print(f"Базовые результаты записаны в {args.baseline}")
+        return 0
+    if regressions:
+        print("\nРегрессии:", *regressions, sep="\n  ", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Сравнение модели задачи: прежний dataclass с `__dict__` и разбором
+срока через `strptime` на каждый показ против `Task` на слотах
+с разобранным один раз сроком.
+
+    python -m benchmarks.bench_task_model --count 100000
+"""
+import argparse
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from benchmarks.generate import make_records
+from tasks.models import Task
+
+# Сколько раз срок нужен при показе задачи: список страниц
+# (`abb_repr_task`), подробный вид (`__rich__`) и повторный показ.
+RENDERS = 3
+
+
+@dataclass
+class LegacyTask:
+    """Модель задачи в прежнем виде, для сравнения."""
+    title: str
+    description: str
+    category: str
+    deadline: str
+    priority: str
+    status: bool
+
+    id: int | None = None
+
+    def timing(self) -> timedelta:
+        parsing_deadline = datetime.strptime(
+            self.deadline, "%Y-%m-%dT%H:%M:%S.%f"
+        )
+        return parsing_deadline - datetime.now()
+
+
+def bench_model(model, records: list[dict]) -> dict:
+    """Замерить память под задачи и время показа сроков."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = [model(**task_map) for task_map in records]
+    create_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(RENDERS):
+        for task in tasks:
+            task.timing()
+    render_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if model is Task:
+        dumped = [task.to_dict() for task in tasks]
+    else:
+        dumped = [task.__dict__.copy() for task in tasks]
+    dump_time = time.perf_counter() - start
+    assert len(dumped) == len(records)
+
+    return {"memory": memory, "create": create_time,
+            "render": render_time, "dump": dump_time}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    records = list(make_records(args.count))
+    print(f"Задач: {args.count}, показов срока на задачу: {RENDERS}")
+    print(f"{'модель':<11} {'байт/задача':>12} {'создание, с':>12} "
+          f"{'показ, с':>9} {'в словарь, с':>13}")
+    for name, model in (("LegacyTask", LegacyTask), ("Task", Task)):
+        result = bench_model(model, records)
+        print(f"{name:<11} {result['memory'] / args.count:>12.0f} "
+              f"{result['create']:>12.3f} {result['render']:>9.3f} "
+              f"{result['dump']:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
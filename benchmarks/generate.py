@@ -0,0 +1,41 @@
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+
+VERBS = ["Сделать", "Проверить", "Написать", "Купить", "Позвонить", "Исправить",
+         "Обновить", "Подготовить", "Отправить", "Обсудить", "Починить", "Оплатить"]
+OBJECTS = ["отчет", "презентацию", "письмо клиенту", "продукты", "маме", "баг в поиске",
+           "документацию", "договор", "счет за свет", "задачу по API", "релиз", "тесты"]
+DETAILS = ["до обеда", "к пятнице", "срочно", "после встречи", "вместе с командой",
+           "по новому шаблону", "без спешки", "для отдела продаж", "ёмко и коротко"]
+CATEGORIES = ["Работа", "Дом", "Учеба", "Здоровье", "Покупки", "Финансы",
+              "Тестовое", "Исправления", "Личное", "Проекты"]
+PRIORITIES = ["Высокий", "Средний", "Низкий"]
+
+
+def make_records(count: int, seed: int = 0) -> Iterator[dict]:
+    """
+    Сгенерировать правдоподобные задачи в формате `data.json`.
+    :param count: Сколько задач.
+    :param seed: Зерно, чтобы результаты были повторяемыми.
+    """
+    rnd = random.Random(seed)
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    for task_id in range(1, count + 1):
+        title = f"{rnd.choice(VERBS)} {rnd.choice(OBJECTS)} {rnd.choice(DETAILS)}"
+        description = " ".join(
+            f"{rnd.choice(VERBS).lower()} {rnd.choice(OBJECTS)}"
+            for _ in range(rnd.randint(1, 4))
+        )
+        deadline = now + timedelta(minutes=rnd.randint(-30 * 24 * 60, 90 * 24 * 60),
+                                   microseconds=rnd.randint(1, 999_999))
+        yield {
+            "id": task_id,
+            "title": title,
+            "description": description,
+            "category": rnd.choice(CATEGORIES),
+            "deadline": deadline.isoformat(),
+            "priority": rnd.choice(PRIORITIES),
+            "status": rnd.random() < 0.3,
+        }
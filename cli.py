@@ -0,0 +1,251 @@
+"""
+Неинтерактивный режим: одна команда - один вызов.
+
+    python main.py list --pending --json
+    python main.py list --category Работа --due d2 --sort deadline
+    python main.py add "Купить хлеб" --category Дом --deadline "h3"
+    python main.py done 12
+
+Экраны `rich` здесь не строятся, вывод - простой текст или JSON.
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import Iterable
+
+from tasks.db import TaskManagerI, make_manager
+from tasks.models import Task
+from tasks.query import SORT_FIELDS, Query
+from utils.terms import deadline_from_term, parse_term
+
+PRIORITIES = ["Высокий", "Средний", "Низкий"]
+
+
+def format_record(task_map: dict) -> str:
+    """Одна задача в одну строку, поля через табуляцию."""
+    return "\t".join((
+        str(task_map["id"]),
+        "+" if task_map["status"] else "-",
+        str(task_map["deadline"])[:16],
+        str(task_map["priority"]),
+        str(task_map["category"]),
+        str(task_map["title"]),
+    ))
+
+
+def print_records(records: Iterable[dict], as_json: bool) -> None:
+    """Вывести задачи по мере поступления: строками или JSON-массивом."""
+    if not as_json:
+        for task_map in records:
+            print(format_record(task_map))
+        return
+    print("[", end="")
+    for num, task_map in enumerate(records):
+        print("," if num else "", json.dumps(task_map, ensure_ascii=False), sep="", end="")
+    print("]")
+
+
+def print_json(data) -> None:
+    """Вывести данные одной строкой JSON."""
+    print(json.dumps(data, ensure_ascii=False))
+
+
+def task_query(args: argparse.Namespace) -> Query:
+    """Запрос к задачам из аргументов команды `list`."""
+    status = None
+    if args.pending:
+        status = False
+    elif args.done:
+        status = True
+    deadline_to = None
+    if args.due is not None:
+        term = parse_term(args.due)
+        if term is None:
+            raise ValueError(f"Неправильный формат срока: {args.due}")
+        deadline_to = datetime.now() + term
+    return Query(
+        status=status,
+        category=args.category,
+        priority=args.priority,
+        deadline_to=deadline_to,
+        text=args.search,
+        sort=args.sort,
+        descending=args.desc,
+        offset=args.offset,
+        limit=args.limit,
+    )
+
+
+def cmd_list(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Список задач по фильтрам, задачи выводятся потоком."""
+    print_records(manager.query_records(task_query(args)), args.json)
+    return 0
+
+
+def cmd_add(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Добавить задачу, срок задается как в меню: `h12 d2 m1`."""
+    deadline = deadline_from_term(args.deadline)
+    if deadline is None:
+        print(f"Неправильный формат срока: {args.deadline}", file=sys.stderr)
+        return 2
+    task = Task(
+        title=args.title,
+        description=args.description,
+        category=args.category,
+        deadline=deadline,
+        priority=args.priority,
+        status=False,
+    )
+    manager.add_task(task)
+    if args.json:
+        print_json({"title": task.title, "deadline": task.deadline})
+    else:
+        print(f"Задача создана: {task.title}")
+    return 0
+
+
+def cmd_done(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Отметить задачи по ID, код 1 - если какой-то ID не найден."""
+    status = not args.undo
+    updated = manager.update_tasks({task_id: {"status": status} for task_id in args.ids})
+    if args.json:
+        print_json({"updated": updated})
+    else:
+        print(f"Изменено задач: {updated}")
+    return 0 if updated == len(set(args.ids)) else 1
+
+
+def cmd_search(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Полнотекстовый поиск, как в меню."""
+    tasks = manager.find_to_entry_title(" ".join(args.query))
+    print_records((task.to_dict() for task in tasks), args.json)
+    return 0
+
+
+def cmd_cats(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Категории: сколько задач всего, выполнено и не выполнено."""
+    counts = manager.get_cat_counts()
+    if args.json:
+        print_json(counts)
+    else:
+        for cat, cat_counts in counts.items():
+            print(f"{cat}\t{cat_counts['total']}\t{cat_counts['done']}\t{cat_counts['pending']}")
+    return 0
+
+
+def cmd_stats(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Сколько задач всего, выполнено, ждет и просрочено."""
+    # Сроки хранятся в isoformat, их можно сравнивать как строки
+    now = datetime.now().isoformat()
+    stats = {"total": 0, "done": 0, "pending": 0, "overdue": 0}
+    for task_map in manager.iter_records():
+        stats["total"] += 1
+        if task_map["status"]:
+            stats["done"] += 1
+        else:
+            stats["pending"] += 1
+            if task_map["deadline"] < now:
+                stats["overdue"] += 1
+    if args.json:
+        print_json(stats)
+    else:
+        print(f"Всего: {stats['total']}\n"
+              f"Выполнено: {stats['done']}\n"
+              f"Не выполнено: {stats['pending']}\n"
+              f"Просрочено: {stats['overdue']}")
+    return 0
+
+
+def cmd_transfer(manager: TaskManagerI, args: argparse.Namespace) -> int:
+    """Импорт или экспорт через `tasks.transfer`."""
+    from tasks.transfer import export_tasks, import_tasks, print_progress
+
+    action = import_tasks if args.command == "import" else export_tasks
+    total = action(manager, args.path, args.format,
+                   print_progress if args.progress else None)
+    if args.progress:
+        print(file=sys.stderr)
+    if args.json:
+        print_json({"count": total})
+    else:
+        print(f"{'Импортировано' if args.command == 'import' else 'Выгружено'} задач: {total}")
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """Разбор аргументов: у каждой команды свой обработчик `handler`."""
+    parser = argparse.ArgumentParser(prog="main.py", description="Менеджер задач")
+    # --json можно писать и до, и после команды
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true", default=argparse.SUPPRESS,
+                        help="Вывод в JSON")
+    parser.add_argument("--json", action="store_true", help="Вывод в JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", parents=[common], help="Список задач")
+    status = list_parser.add_mutually_exclusive_group()
+    status.add_argument("--pending", action="store_true", help="Только не выполненные")
+    status.add_argument("--done", action="store_true", help="Только выполненные")
+    list_parser.add_argument("--category", help="Только из категории")
+    list_parser.add_argument("--priority", choices=PRIORITIES, help="Только с приоритетом")
+    list_parser.add_argument("--due", help="Срок не позже чем через, например 'd2'")
+    list_parser.add_argument("--search", help="Слова из названия, описания или категории")
+    list_parser.add_argument("--sort", choices=SORT_FIELDS, help="Сортировать по полю")
+    list_parser.add_argument("--desc", action="store_true", help="В обратном порядке")
+    list_parser.add_argument("--limit", type=int, help="Сколько задач вывести")
+    list_parser.add_argument("--offset", type=int, default=0, help="Сколько задач пропустить")
+    list_parser.set_defaults(handler=cmd_list)
+
+    add_parser = commands.add_parser("add", parents=[common], help="Добавить задачу")
+    add_parser.add_argument("title")
+    add_parser.add_argument("--category", required=True)
+    add_parser.add_argument("--deadline", required=True, help="Срок, например 'h12 d2'")
+    add_parser.add_argument("--description", default="")
+    add_parser.add_argument("--priority", choices=PRIORITIES, default="Высокий")
+    add_parser.set_defaults(handler=cmd_add)
+
+    done_parser = commands.add_parser("done", parents=[common],
+                                      help="Отметить задачи выполненными")
+    done_parser.add_argument("ids", type=int, nargs="+")
+    done_parser.add_argument("--undo", action="store_true",
+                             help="Отметить не выполненными")
+    done_parser.set_defaults(handler=cmd_done)
+
+    search_parser = commands.add_parser("search", parents=[common], help="Найти задачи")
+    search_parser.add_argument("query", nargs="+")
+    search_parser.set_defaults(handler=cmd_search)
+
+    cats_parser = commands.add_parser("cats", parents=[common],
+                                      help="Категории и число задач в них")
+    cats_parser.set_defaults(handler=cmd_cats)
+
+    stats_parser = commands.add_parser("stats", parents=[common], help="Статистика")
+    stats_parser.set_defaults(handler=cmd_stats)
+
+    for name, help_text in (("import", "Импорт из JSON Lines или CSV"),
+                            ("export", "Экспорт в JSON Lines или CSV")):
+        transfer_parser = commands.add_parser(name, parents=[common], help=help_text)
+        transfer_parser.add_argument("path")
+        transfer_parser.add_argument("--format", choices=["jsonl", "csv"])
+        transfer_parser.add_argument("--progress", action="store_true",
+                                     help="Показывать прогресс в stderr")
+        transfer_parser.set_defaults(handler=cmd_transfer)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Выполнить одну команду.
+    :return: Код возврата процесса.
+    """
+    args = make_parser().parse_args(argv)
+    try:
+        return args.handler(make_manager(), args)
+    except (OSError, ValueError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
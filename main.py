@@ -1,10 +1,31 @@
-from menu import Menu
+import sys
+
+from settings import settings
+from utils import profiling
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        # С аргументами - одна команда без меню
+        from cli import main
+        profiling.install()
+        sys.exit(main(sys.argv[1:]))
+
+    from menu import Menu
+
+    profiling.install(ui=True)
     menu = Menu()
 
+    if settings.storage == "async":
+        # Запись идет в фоне, цикл asyncio дожидается ее при выходе
+        import asyncio
+
+        try:
+            asyncio.run(menu.run())
+        except (KeyboardInterrupt, EOFError):
+            pass
+        sys.exit()
+
     while True:
         menu.start()
         selected_choice = str(menu.console.input())
         menu.distribute(selected_choice)
-
@@ -1,7 +1,9 @@
-from rich.console import Console
+import asyncio
+
+from rich.panel import Panel
 from rich.text import Text
 
-from utils.funcs import make_panel, choices_options
+from utils.funcs import get_time, make_panel, choices_options
 
 from utils import const
 from tasks.views import TaskCLI
@@ -9,14 +11,17 @@ from tasks.views import TaskCLI
 
 class Menu:
     def __init__(self):
-        self.console = Console()
         self.task_cli = TaskCLI()
+        # Один экран на меню и списки задач: он помнит последний кадр
+        self.console = self.task_cli.console
+        self.screen = self.task_cli.screen
         self.nav_comm = Text.assemble((const.GREY_MAKE_A_CHOICE, "bold grey42"))
         self.options = {
             "1": ("Список задач", self.task_cli.get_tasks),
             "2": ("Добавить новую задачу", self.task_cli.add_task),
             "3": ("Найти задачу", self.task_cli.search_task)
         }
+        self._welcome: tuple[tuple[str, str], Panel] | None = None
 
     def start(self) -> None:
         """
@@ -24,15 +29,39 @@ class Menu:
         На данном этапе происходит вывод опций
         на главном экране.
         """
-        self.console.clear()
-        group_choices = choices_options(self.options)
+        self.screen.draw(self.welcome_panel())
 
-        self.console.print(
-            make_panel(
+    async def run(self) -> None:
+        """
+        Главный цикл для asyncio: ввод и сами экраны (у них свои
+        синхронные вопросы пользователю) работают в отдельном потоке,
+        цикл событий свободен для фоновых задач (записи на диск,
+        напоминаний). При выходе дожидается записи изменений.
+        """
+        try:
+            while True:
+                self.start()
+                selected_choice = str(await asyncio.to_thread(self.console.input))
+                await asyncio.to_thread(self.distribute, selected_choice)
+        finally:
+            drain = getattr(self.task_cli.manager, "drain", None)
+            if drain is not None:
+                await drain()
+
+    def welcome_panel(self) -> Panel:
+        """
+        Панель главного экрана. Собирается заново, только
+        если поменялась подсказка или время в подписи.
+        """
+        key = (self.nav_comm.plain, get_time())
+        if self._welcome is None or self._welcome[0] != key:
+            group_choices = choices_options(self.options)
+            panel = make_panel(
                 self.nav_comm, *group_choices,
                 title="Добро пожаловать!"
             )
-        )
+            self._welcome = (key, panel)
+        return self._welcome[1]
 
 
     def distribute(self, selected: str) -> None:
@@ -48,5 +77,19 @@ class Menu:
             _, func = action
             func()
             self.nav_comm = Text.assemble((const.GREY_MAKE_A_CHOICE, "bold grey42"))
+            self.check_saved()
         else:
             self.nav_comm = Text.assemble((const.RED_MAKE_A_CHOICE, "bold red1"))
+
+    def check_saved(self) -> None:
+        """
+        Показать ошибку фоновой записи, если она была: хранилище
+        при этом перечитывает задачи с диска (см. `TaskManagerAsync`).
+        """
+        raise_errors = getattr(self.task_cli.manager, "raise_errors", None)
+        if raise_errors is None:
+            return
+        try:
+            raise_errors()
+        except Exception as error:
+            self.nav_comm = Text.assemble((f"{const.NOT_SAVED}{error}", "bold red1"))
@@ -8,6 +8,63 @@ class SETTINGS:
     base_dir: str = os.path.dirname(os.path.abspath(__file__))
     path_db: str = os.path.join(base_dir, "db", "data.json")
     path_auto_incr: str = os.path.join(base_dir, "db", "auto_increment_tasks.txt")
+    path_journal: str = os.path.join(base_dir, "db", "journal.log")
+    path_snapshot: str = os.path.join(base_dir, "db", "snapshot.json")
+    path_sqlite: str = os.path.join(base_dir, "db", "tasks.sqlite3")
+    path_shards: str = os.path.join(base_dir, "db", "shards")
+
+    # Хранилище задач: "json" - запись в файл на каждое изменение,
+    # "json_cached" - задачи в памяти, запись на диск пачками,
+    # "async" - задачи в памяти, запись в файл JSON в фоновом потоке,
+    # "journal" - журнал изменений со снимком (задачи из JSON
+    # переносятся при первом запуске),
+    # "sqlite" - БД SQLite с индексами (задачи из JSON переносятся
+    # при первом запуске),
+    # "sharded" - несколько файлов по ID задачи в `path_shards`: изменение
+    # переписывает только один файл, чтение идет параллельно (задачи
+    # из JSON переносятся при первом запуске).
+    storage: str = "json"
+    # Формат файла задач: "json" - JSON с отступами, "json_compact" - JSON
+    # без отступов, "jsonl" - JSON Lines, "binary" - MessagePack.
+    # При чтении формат определяется сам, при записи берется этот.
+    storage_format: str = "json"
+    # Сбрасывать ли файлы на диск (fsync) при каждой записи. В режиме
+    # "json_cached" несколько изменений уходят на диск одним fsync.
+    fsync: bool = True
+    # Сколько резервных копий файла задач держать (data.json.bak.1 ...).
+    backups: int = 0
+    # Сколько ID задач резервировать в файле за один раз.
+    id_block_size: int = 100
+    # Через сколько изменений кэш сбрасывается на диск.
+    flush_every: int = 50
+    # Через сколько секунд после первого изменения кэш сбрасывается на диск.
+    flush_interval: float = 5.0
+    # Сколько строк в журнале, прежде чем свернуть его в снимок.
+    journal_compact_after: int = 1000
+    # Хранилище "sharded": на сколько файлов делить задачи. При смене
+    # числа задачи раскладываются заново при следующем запуске.
+    shard_count: int = 4
+    # Сколько процессов читают шарды, 0 - по числу ядер.
+    shard_workers: int = 0
+    # С какого общего размера шардов (в байтах) читать их параллельно:
+    # у маленьких файлов запуск процессов дороже самого разбора.
+    parallel_load_min_bytes: int = 4 * 1024 * 1024
+    # Сколько задач пакетные операции и импорт обрабатывают за раз.
+    batch_size: int = 1000
+    # За сколько часов до срока задача считается срочной (метка SOS).
+    sos_hours: int = 7
+    # Напоминания: как часто (в секундах) перечитывать задачи, даже если
+    # до ближайшего срока далеко, - чтобы увидеть изменения из других процессов.
+    reminder_recheck: float = 60.0
+    # Перерисовывать списки задач по разнице с прошлым кадром, без очистки
+    # экрана: меньше мигания и трафика на медленных терминалах и по SSH.
+    diff_redraw: bool = True
+    # Замеры скорости (см. `utils.profiling`): "" - выключены, иначе режимы
+    # через запятую: "summary", "trace", "cprofile". Переменная окружения
+    # TASKS_PROFILE важнее этой настройки.
+    profile: str = ""
+    # Куда сохранять трассы и профили.
+    profile_dir: str = os.path.join(base_dir, "db", "profiles")
 
 
 settings = SETTINGS()
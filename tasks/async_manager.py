@@ -0,0 +1,186 @@
+"""
+Хранилище, которое не заставляет интерфейс ждать диск.
+
+Задачи держатся в памяти (`TaskManagerMemory`): чтение и ответ
+на изменение идут сразу из памяти. Запись в файл уходит
+в фоновый поток с одним исполнителем, поэтому изменения попадают на диск
+строго в том порядке, в каком были сделаны. Из asyncio дождаться записи
+можно через `await manager.drain()`.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable
+
+from tasks.db import TaskManagerJSON
+from tasks.indexes import file_signature
+from tasks.memory import TaskManagerMemory
+
+logger = logging.getLogger(__name__)
+
+
+class TaskManagerAsync(TaskManagerMemory):
+    """
+    Задачи в памяти, запись в файл JSON в фоне.
+    Изменения описываются записями (`{"op": "add", ...}`):
+    они сразу применяются к памяти, а в фоновом потоке превращаются
+    в вызовы `TaskManagerJSON`. ID новым задачам выдаются сразу,
+    из того же счетчика, что у файла.
+    Изменения из других процессов, сделанные после открытия, не видны.
+    """
+    def __init__(self, store: TaskManagerJSON | None = None):
+        """
+        :param store: Куда сохранять задачи, по умолчанию `TaskManagerJSON()`.
+        """
+        self.store = store if store is not None else TaskManagerJSON()
+        self.id_path = self.store.id_path
+        # Счетчик ID файла: выдавать ID может и фоновый поток, и основной
+        self.manager_id = self.store.manager_id
+        super().__init__()
+        # Один поток - записи выполняются по очереди, в порядке отправки
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tasks-io")
+        self._pending: set[Future] = set()
+        self._errors: list[BaseException] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.replay()
+        atexit.register(self.close)
+
+    @classmethod
+    async def open(cls, store: TaskManagerJSON | None = None) -> "TaskManagerAsync":
+        """Открыть хранилище, не останавливая цикл событий на чтение файла."""
+        return await asyncio.to_thread(cls, store)
+
+    def replay(self) -> None:
+        """Загрузить задачи из файла."""
+        self.signature = self.store_signature()
+        self.load_tasks(self.store.iter_records())
+
+    def store_signature(self) -> list | None:
+        """Отпечаток файла задач."""
+        return file_signature(self.store.path)
+
+    def sync(self) -> bool:
+        """
+        Перечитать задачи, если файл поменял другой процесс.
+        Пока свои изменения ждут записи, память новее файла
+        и не перечитывается.
+        """
+        if self.pending_writes:
+            return False
+        return super().sync()
+
+    @property
+    def pending_writes(self) -> int:
+        """Сколько изменений еще не записано на диск."""
+        with self._lock:
+            return len(self._pending)
+
+    def write_many(self, entries: Iterable[dict]) -> int:
+        """
+        Применить изменения к памяти и поставить их запись в очередь.
+        :return: Сколько изменений применено.
+        """
+        entries = list(entries)
+        for entry in entries:
+            self.apply(entry)
+        if entries:
+            self.submit(self.persist, entries)
+        return len(entries)
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Поставить работу с файлом в очередь фонового потока."""
+        future = self.executor.submit(func, *args)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        """Запись закончилась: убрать ее из очереди и запомнить ошибку."""
+        with self._lock:
+            self._pending.discard(future)
+        error = future.exception()
+        if error is not None:
+            logger.error("Не удалось сохранить задачи", exc_info=error)
+            self._errors.append(error)
+
+    def persist(self, entries: list[dict]) -> None:
+        """
+        Записать изменения в файл, выполняется в фоновом потоке.
+        Подряд идущие изменения одного вида пишутся одним вызовом.
+        """
+        # Свои записи не повод перечитывать файл, а чужие - повод
+        in_sync = self.store_signature() == self.signature
+        self.write_entries(entries)
+        if in_sync:
+            self.signature = self.store_signature()
+
+    def write_entries(self, entries: list[dict]) -> None:
+        """Превратить изменения в вызовы `TaskManagerJSON`."""
+        added: list[dict] = []
+        removed: list[int] = []
+        edited: dict[int, dict] = {}
+        for entry in entries:
+            op = entry["op"]
+            if op != "add" and added:
+                self.store.add_records(added)
+                added = []
+            if op != "remove" and removed:
+                self.store.remove_tasks(removed)
+                removed = []
+            if op == "add" or op == "remove":
+                # Правки до добавления или удаления должны попасть раньше
+                if edited:
+                    self.store.update_tasks(edited)
+                    edited = {}
+
+            if op == "add":
+                added.append(dict(entry["task"]))
+            elif op == "remove":
+                removed.append(entry["id"])
+            elif op == "edit":
+                edited.setdefault(entry["id"], {})[entry["key"]] = entry["value"]
+            else:
+                edited.setdefault(entry["id"], {})["status"] = op == "complete"
+        if added:
+            self.store.add_records(added)
+        if removed:
+            self.store.remove_tasks(removed)
+        if edited:
+            self.store.update_tasks(edited)
+
+    def raise_errors(self) -> None:
+        """
+        Поднять первую ошибку фоновой записи, если она была.
+        Память к этому моменту разошлась с диском, поэтому очередь
+        дописывается и задачи перечитываются из файла: несохраненные
+        изменения пропадают, зато видно то, что на самом деле на диске.
+        """
+        if not self._errors:
+            return
+        if not self._closed:
+            self.executor.submit(lambda: None).result()
+        error, self._errors = self._errors[0], []
+        self.replay()
+        raise error
+
+    def flush(self) -> None:
+        """Дождаться, пока все изменения запишутся на диск."""
+        # Очередь выполняется по порядку: последняя работа - конец очереди
+        self.executor.submit(lambda: None).result()
+        self.raise_errors()
+
+    async def drain(self) -> None:
+        """То же, что `flush`, но не останавливая цикл событий."""
+        await asyncio.wrap_future(self.executor.submit(lambda: None))
+        self.raise_errors()
+
+    def close(self) -> None:
+        """Дописать очередь и остановить фоновый поток."""
+        atexit.unregister(self.close)
+        self.executor.shutdown(wait=True)
+        self._closed = True
+        self.raise_errors()
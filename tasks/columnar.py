@@ -0,0 +1,218 @@
+"""
+Колоночное представление задач для отчетов.
+
+Каждое поле лежит в своем массиве `array`, категории и приоритеты
+закодированы номерами из словаря. Подсчеты по категориям и статусам
+и поиск просроченных задач идут по массивам целиком: через NumPy,
+если он установлен, или через встроенные функции на C.
+"""
+import itertools
+import operator
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Iterable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Номера словаря до этого значения хранятся по байту:
+# к ним можно прибавить 1 без переноса в соседний байт
+MAX_BYTE_CODE = 255
+# Срок хранится как секунды от этой даты (время без часового пояса)
+EPOCH = datetime(1970, 1, 1)
+
+
+def deadline_seconds(deadline: str) -> float:
+    """Срок задачи в секундах от `EPOCH`, `nan` - если срок не разобрать."""
+    try:
+        return (datetime.fromisoformat(deadline) - EPOCH).total_seconds()
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class Dictionary:
+    """Словарь для кодирования строк номерами."""
+    def __init__(self) -> None:
+        self.values: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: str) -> int:
+        """Номер строки, новая строка получает следующий номер."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class TaskTable:
+    """
+    Таблица задач по колонкам.
+    Работает как индекс по содержимому (см. `record_indexes`
+    в `TaskManagerJSON`): строится по записям и обновляется
+    через `add`/`remove`. Удаленная строка только помечается,
+    а когда таких набирается больше половины, таблица сжимается.
+    """
+    def __init__(self, use_numpy: bool | None = None) -> None:
+        """
+        :param use_numpy: Считать через NumPy. По умолчанию - если он есть.
+        """
+        if use_numpy and numpy is None:
+            raise ValueError("NumPy не установлен")
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.categories = Dictionary()
+        self.priorities = Dictionary()
+        self.signature: list[int] | None = None
+        self.clear()
+
+    def clear(self) -> None:
+        """Очистить колонки, словари остаются."""
+        self.ids = array("q")
+        self.status = array("b")
+        # Пока в словаре меньше 255 строк, номера занимают байт
+        self.category = array("B")
+        self.priority = array("B")
+        self.deadline = array("d")
+        # 1 - строка жива, 0 - задача удалена
+        self.alive = array("b")
+        # ID задачи -> номер строки
+        self.rows: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def rebuild(self, all_tasks: Iterable[dict]) -> None:
+        """Построить таблицу заново по записям."""
+        self.clear()
+        for task_map in all_tasks:
+            self.add(task_map)
+
+    def add(self, task_map: dict) -> None:
+        """Дописать задачу в конец колонок."""
+        task_id = task_map.get("id")
+        if task_id in self.rows:
+            self.remove(task_map)
+        self.rows[task_id] = len(self.ids)
+        self.ids.append(task_id if task_id is not None else -1)
+        self.status.append(1 if task_map.get("status") else 0)
+        self.category = self._append_code(
+            self.category, self.categories.encode(task_map.get("category", "")))
+        self.priority = self._append_code(
+            self.priority, self.priorities.encode(task_map.get("priority", "")))
+        self.deadline.append(deadline_seconds(task_map.get("deadline")))
+        self.alive.append(1)
+
+    @staticmethod
+    def _append_code(column: array, code: int) -> array:
+        """Дописать номер, при переполнении байта расширить колонку."""
+        if code >= MAX_BYTE_CODE and column.typecode == "B":
+            column = array("l", column)
+        column.append(code)
+        return column
+
+    def remove(self, task_map: dict) -> None:
+        """Пометить строку задачи удаленной."""
+        row = self.rows.pop(task_map.get("id"), None)
+        if row is None:
+            return
+        self.alive[row] = 0
+        if len(self.rows) * 2 < len(self.alive) and len(self.alive) > 1024:
+            self.compact()
+
+    def compact(self) -> None:
+        """Выбросить удаленные строки из колонок."""
+        alive = self.alive
+        for name in ("ids", "status", "category", "priority", "deadline"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, itertools.compress(column, alive)))
+        self.alive = array("b", [1]) * len(self.ids)
+        self.rows = {task_id: row for row, task_id in enumerate(self.ids)}
+
+    def _np(self, column: array):
+        """Колонка как массив NumPy без копирования."""
+        return numpy.frombuffer(column, dtype=column.typecode)
+
+    def _decode_counts(self, dictionary: Dictionary, counts) -> dict[str, int]:
+        """Счетчики по номерам -> счетчики по строкам, без нулевых."""
+        return {dictionary.values[code]: int(count)
+                for code, count in enumerate(counts) if count}
+
+    def count_by_category(self) -> dict[str, int]:
+        """Категория -> сколько в ней задач."""
+        return self._count_codes(self.category, self.categories)
+
+    def count_by_priority(self) -> dict[str, int]:
+        """Приоритет -> сколько задач с ним."""
+        return self._count_codes(self.priority, self.priorities)
+
+    def _count_codes(self, column: array, dictionary: Dictionary) -> dict[str, int]:
+        """Сколько живых строк с каждым номером из словаря."""
+        if self.use_numpy:
+            codes = self._np(column)[self._np(self.alive).astype(bool)]
+            counts = numpy.bincount(codes, minlength=len(dictionary))
+        elif column.typecode == "B":
+            # Номера сдвигаются на 1, а удаленные строки обнуляются,
+            # дальше каждый номер считает `bytes.count`
+            size = len(column)
+            ones = int.from_bytes(b"\x01" * size, "little")
+            alive = int.from_bytes(self.alive, "little") * 0xFF
+            shifted = ((int.from_bytes(column, "little") + ones) & alive).to_bytes(size, "little")
+            counts = [shifted.count(code + 1) for code in range(len(dictionary))]
+        else:
+            counter = Counter(itertools.compress(column, self.alive))
+            counts = [counter.get(code, 0) for code in range(len(dictionary))]
+        return self._decode_counts(dictionary, counts)
+
+    def count_by_status(self) -> dict[str, int]:
+        """Сколько задач выполнено и сколько ждет выполнения."""
+        if self.use_numpy:
+            done = int(numpy.count_nonzero(self._np(self.status) & self._np(self.alive)))
+        else:
+            # В колонках только 0 и 1, поэтому единичные биты - это строки
+            alive = int.from_bytes(self.alive, "little")
+            done = (int.from_bytes(self.status, "little") & alive).bit_count()
+        return {"done": done, "pending": len(self) - done}
+
+    def _pending_mask(self) -> bytes:
+        """
+        Маска живых невыполненных строк: `alive and not status`.
+        Колонки из нулей и единиц складываются как длинные числа.
+        """
+        size = len(self.alive)
+        alive = int.from_bytes(self.alive, "little")
+        status = int.from_bytes(self.status, "little")
+        return (alive & ~status).to_bytes(size, "little")
+
+    def overdue_ids(self, now: datetime | None = None) -> list[int]:
+        """
+        ID невыполненных задач, у которых срок уже прошел.
+        :param now: Момент, с которым сравнивать, по умолчанию - сейчас.
+        """
+        limit = ((now or datetime.now()) - EPOCH).total_seconds()
+        if self.use_numpy:
+            mask = ((self._np(self.alive) == 1) & (self._np(self.status) == 0)
+                    & (self._np(self.deadline) < limit))
+            return self._np(self.ids)[mask].tolist()
+        # Все циклы - внутри map/compress, без байткода на каждую строку
+        late = map(limit.__gt__, self.deadline)
+        return list(itertools.compress(
+            self.ids, map(operator.and_, self._pending_mask(), late)
+        ))
+
+    def ids_in_category(self, category: str) -> list[int]:
+        """ID задач из категории."""
+        code = self.categories.codes.get(category)
+        if code is None:
+            return []
+        if self.use_numpy:
+            mask = (self._np(self.alive) == 1) & (self._np(self.category) == code)
+            return self._np(self.ids)[mask].tolist()
+        return list(itertools.compress(
+            self.ids, map(operator.and_, self.alive, map(code.__eq__, self.category))
+        ))
@@ -1,13 +1,28 @@
 import abc
-import json
+import atexit
+import bisect
+import itertools
 import os
+import threading
+import weakref
 from collections import defaultdict
-from dataclasses import asdict
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 from settings import settings
+from tasks.indexes import (CategoryIndex, DeadlineIndex, IdIndex,
+                           SearchIndex, file_signature)
 from tasks.models import Task
+from tasks.query import Query, plan, select
+from utils.fileio import atomic_write
+from utils.formats import get_format, load_records, read_records
+from utils.locks import FileLock
 from utils.manager_id import ManagerID
 
+if TYPE_CHECKING:
+    from tasks.columnar import TaskTable
+
 
 class TaskManagerI(abc.ABC):
     """Абстрактный класс для работы с БД"""
@@ -22,7 +37,12 @@ class TaskManagerI(abc.ABC):
         ...
 
     @abc.abstractmethod
-    def remove_task(self, task: Task):
+    def edit_task(self, task: Task, key: str, editable: str):
+        """Изменить поле задачи."""
+        ...
+
+    @abc.abstractmethod
+    def remove_task(self, task_id: int):
         """Удалить определенную задачу"""
         ...
 
@@ -41,66 +61,372 @@ class TaskManagerI(abc.ABC):
         """Отметить задачу как невыполненную."""
         ...
 
+    @abc.abstractmethod
+    def get_cats(self) -> dict[str, list[Task]]:
+        """Сгруппировать задачи по категориям."""
+        ...
+
+    @abc.abstractmethod
+    def get_cat_counts(self) -> dict[str, dict[str, int]]:
+        """Категория -> сколько задач всего, выполнено и не выполнено."""
+        ...
+
+    @abc.abstractmethod
+    def get_incompleted(self) -> list[Task]:
+        """Получить список с не выполненными задачами."""
+        ...
+
+    @abc.abstractmethod
+    def find_to_entry_title(self, entry_str: str) -> list[Task]:
+        """Поиск задач по строке."""
+        ...
+
+    @abc.abstractmethod
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать задачи по одной в виде словарей."""
+        ...
+
+    @abc.abstractmethod
+    def get_page(
+            self,
+            offset: int,
+            limit: int,
+            filters: dict | None = None
+    ) -> list[Task]:
+        """Достать одну страницу задач."""
+        ...
+
+    @abc.abstractmethod
+    def get_urgent(self, within: timedelta | None = None) -> list[Task]:
+        """Просроченные и срочные невыполненные задачи по порядку сроков."""
+        ...
+
+    @abc.abstractmethod
+    def add_tasks(self, tasks: Iterable[Task]) -> int:
+        """Добавить много задач за раз."""
+        ...
+
+    @abc.abstractmethod
+    def remove_tasks(self, task_ids: Iterable[int]) -> int:
+        """Удалить много задач за раз."""
+        ...
+
+    @abc.abstractmethod
+    def update_tasks(self, changes: dict[int, dict]) -> int:
+        """Изменить поля у многих задач за раз."""
+        ...
+
+    @abc.abstractmethod
+    def query_records(self, query: Query) -> Iterator[dict]:
+        """Задачи по запросу (см. `tasks.query`) в виде словарей."""
+        ...
+
+    def query(self, query: Query) -> list[Task]:
+        """Задачи по запросу (см. `tasks.query`)."""
+        return [Task.from_dict(task_map) for task_map in self.query_records(query)]
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Разбить поток на списки по `size` элементов."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def match_filters(task_map: dict, filters: dict | None) -> bool:
+    """
+    Подходит ли задача под фильтры.
+    :param filters: Поле задачи -> нужное значение,
+    например `{"status": False, "category": "Работа"}`.
+    """
+    if not filters:
+        return True
+    return all(task_map.get(key) == value for key, value in filters.items())
+
+
+def page_from_records(
+        records: Iterable[dict],
+        offset: int,
+        limit: int,
+        filters: dict | None = None
+) -> list[Task]:
+    """
+    Вырезать страницу из потока задач.
+    Объекты `Task` создаются только для задач этой страницы.
+    """
+    if filters:
+        records = (task_map for task_map in records
+                   if match_filters(task_map, filters))
+    page = itertools.islice(records, offset, offset + limit)
+    return [Task.from_dict(task_map) for task_map in page]
 
 
 class TaskManagerJSON(TaskManagerI):
     """Класс для управления списком задач."""
-    def __init__(self):
-        self.path = settings.path_db
-        self.manager_id = ManagerID(settings.path_auto_incr)
-        self.id_path = settings.path_auto_incr
-        self.categories = dict()
+    def __init__(self, path: str | None = None, id_path: str | None = None):
+        """
+        :param path: Файл задач, по умолчанию `settings.path_db`.
+        :param id_path: Файл счетчика ID, по умолчанию `settings.path_auto_incr`.
+        """
+        self.path = path or settings.path_db
+        self.id_path = id_path or settings.path_auto_incr
+        self._manager_id: ManagerID | None = None
+        self._file_lock: FileLock | None = None
+        self.categories: CategoryIndex | None = None
+        self.index = IdIndex()
+        # Найденные задачи отдаются из индекса, без второго чтения файла
+        self.search_index = SearchIndex(store_docs=True)
+        # Колоночная таблица для отчетов и индекс сроков, строятся по запросу
+        self.table: "TaskTable | None" = None
+        self.deadline_index: DeadlineIndex | None = None
+        # Индексы по содержимому задач, обновляются при каждом изменении
+        self.record_indexes = [self.search_index]
 
         # Если файл не существует, то создаем
         if not os.path.exists(self.path):
-            with open(self.path, 'w', encoding='utf-8') as file:
-                json.dump([], file, ensure_ascii=False, indent=4)
+            atomic_write(self.path, lambda tmp_path: get_format(
+                settings.storage_format).write(tmp_path, []))
 
     def load_data(self) -> list[dict]:
         """
-        Достать список из файла JSON
+        Достать список из файла задач.
+        Формат файла определяется по его началу. Файл читается
+        целиком, без потока: список все равно нужен весь, а так быстрее.
         :return: Список с задачами в виде словарей.
         """
-        with open(self.path, 'r', encoding='utf-8') as file:
-            all_tasks = json.load(file)
-        return all_tasks
+        return load_records(self.path)
 
     def save_data(self, all_tasks: list[dict]) -> None:
-        """Сохранить новый список в файле JSON"""
+        """
+        Сохранить новый список в файле в формате `settings.storage_format`.
+        Запись атомарная: при сбое остается прежний файл.
+        """
         if not all_tasks or type(all_tasks) is not list:
             all_tasks = []
-        with open(self.path, 'w', encoding='utf-8') as file:
-            json.dump(all_tasks, file, ensure_ascii=False, indent=4)
+        old_signature = file_signature(self.path)
+        store_format = get_format(settings.storage_format)
+        atomic_write(self.path, lambda tmp_path: store_format.write_all(tmp_path, all_tasks))
+        signature = file_signature(self.path)
+
+        if len(self.index) != len(all_tasks):
+            self.index.rebuild(all_tasks)
+        self.index.signature = signature
+        # Индексы, которые шли вместе с файлом, остаются актуальными
+        for index in self.record_indexes:
+            if index.signature == old_signature:
+                index.signature = signature
+
+    @property
+    def manager_id(self) -> ManagerID:
+        """Счетчик ID для текущего `id_path`, один на менеджер."""
+        if self._manager_id is None or self._manager_id.path != self.id_path:
+            self._manager_id = ManagerID(self.id_path)
+        return self._manager_id
+
+    @property
+    def lock(self) -> FileLock:
+        """Блокировка файла задач между процессами."""
+        if self._file_lock is None or self._file_lock.path != self.path + ".lock":
+            self._file_lock = FileLock(self.path + ".lock")
+        return self._file_lock
+
+    @property
+    def index_path(self) -> str:
+        """Файл с индексом ID лежит рядом с файлом задач."""
+        return self.path + ".idx"
+
+    def get_index(self, all_tasks: list[dict]) -> IdIndex:
+        """
+        Индекс ID -> позиция для `all_tasks`.
+        Если файл задач менялся без нас, индекс пересобирается
+        по уже прочитанному списку. Файл индекса с диска читается
+        только при первом обращении (его пишет `rebuild_index`).
+        """
+        signature = file_signature(self.path)
+        if self.index.signature != signature:
+            first_use = self.index.signature is None
+            if not (first_use and self.index.load(self.index_path)) \
+                    or self.index.signature != signature:
+                self.index.rebuild(all_tasks)
+                self.index.signature = signature
+        return self.index
+
+    def sync_indexes(self, all_tasks: Iterable[dict]) -> None:
+        """Пересобрать индексы по содержимому, если файл задач менялся без нас."""
+        signature = file_signature(self.path)
+        stale = [index for index in self.record_indexes if index.signature != signature]
+        if len(stale) > 1:
+            # Поток задач можно пройти только один раз
+            all_tasks = list(all_tasks)
+        for index in stale:
+            index.rebuild(all_tasks)
+            index.signature = signature
+
+    def get_table(self) -> "TaskTable":
+        """
+        Колоночная таблица задач для отчетов (см. `tasks.columnar`).
+        Строится при первом обращении, дальше обновляется вместе
+        с остальными индексами по содержимому.
+        """
+        if self.table is None:
+            from tasks.columnar import TaskTable
+
+            self.table = TaskTable()
+            self.record_indexes.append(self.table)
+        self.sync_indexes(self.iter_records())
+        return self.table
+
+    def get_category_index(self) -> CategoryIndex:
+        """
+        Индекс категорий. Строится при первом обращении,
+        дальше обновляется при каждом изменении.
+        """
+        if self.categories is None:
+            self.categories = CategoryIndex()
+            self.record_indexes.append(self.categories)
+        self.sync_indexes(self.iter_records())
+        return self.categories
+
+    def get_cat_counts(self) -> dict[str, dict[str, int]]:
+        """
+        Категория -> сколько задач всего, выполнено и не выполнено.
+        Считается по индексу, задачи не читаются, пока файл не менялся.
+        """
+        return self.get_category_index().counts()
+
+    def get_deadline_index(self) -> DeadlineIndex:
+        """
+        Индекс сроков невыполненных задач. Строится при первом
+        обращении, дальше обновляется при каждом изменении.
+        """
+        if self.deadline_index is None:
+            self.deadline_index = DeadlineIndex()
+            self.record_indexes.append(self.deadline_index)
+        self.sync_indexes(self.iter_records())
+        return self.deadline_index
+
+    def get_urgent(self, within: timedelta | None = None) -> list[Task]:
+        """
+        Невыполненные задачи, срок которых прошел или наступит
+        в ближайшие `within` (по умолчанию `settings.sos_hours`).
+        :return: Задачи по порядку сроков, просроченные первыми.
+        """
+        if within is None:
+            within = timedelta(hours=settings.sos_hours)
+        task_ids = self.get_deadline_index().due_before(datetime.now() + within)
+        if not task_ids:
+            return []
+        ranks = {task_id: rank for rank, task_id in enumerate(task_ids)}
+        urgent = [task_map for task_map in self.iter_records()
+                  if task_map.get("id") in ranks]
+        urgent.sort(key=lambda task_map: ranks[task_map["id"]])
+        return [Task.from_dict(task_map) for task_map in urgent]
+
+    def index_add(self, task_map: dict) -> None:
+        """Добавить задачу в индексы по содержимому."""
+        for index in self.record_indexes:
+            index.add(task_map)
+
+    def index_remove(self, task_map: dict) -> None:
+        """Убрать задачу из индексов по содержимому."""
+        for index in self.record_indexes:
+            index.remove(task_map)
+
+    def rebuild_index(self) -> int:
+        """
+        Пересобрать индекс ID и записать его на диск.
+        :return: Сколько задач в индексе.
+        """
+        all_tasks = self.load_data()
+        self.index.rebuild(all_tasks)
+        self.index.signature = file_signature(self.path)
+        self.index.save(self.index_path)
+        return len(self.index)
 
     def find_by_id(self, all_tasks: list[dict], task_id: int) -> int | None:
         """
-        Находит задачу по ID. Бинарный поиск.
+        Находит задачу по ID через индекс, порядок задач
+        в файле не важен.
         :param all_tasks: Список с задачами в виде словаря.
         :param task_id: ID Задачи.
         :return: Либо индекс задачи в `all_tasks`, либо
         если ничего не найдено `None`.
         """
-        left = 0
-        right = len(all_tasks) - 1
-        while left <= right:
-            middle = (left + right) // 2
-            if all_tasks[middle].get("id") == task_id:
-                return middle
+        index = self.get_index(all_tasks)
+        pos = index.get(task_id)
+        if pos is not None and pos < len(all_tasks) \
+                and all_tasks[pos].get("id") == task_id:
+            return pos
+        if pos is None and len(index) == len(all_tasks):
+            return None
+        # Индекс разошелся со списком
+        index.rebuild(all_tasks)
+        return index.get(task_id)
+
+    def mutate(self, change: Callable[[list[dict]], None]) -> None:
+        """
+        Изменить задачи под блокировкой файла: свежий список
+        читается, меняется и сохраняется, пока остальные процессы ждут,
+        поэтому чужие изменения не затираются.
+        :param change: Функция, которая меняет список задач на месте.
+        Она не должна зависеть от старого содержимого списка, чтобы
+        ее можно было повторить на более свежей версии.
+        """
+        with self.lock:
+            all_tasks = self.load_data()
+            try:
+                change(all_tasks)
+                self.save_data(all_tasks)
+            except BaseException:
+                # Индексы уже изменены, а файл остался прежним
+                self.index.signature = None
+                for index in self.record_indexes:
+                    index.signature = None
+                raise
 
-            elif all_tasks[middle].get("id") < task_id:
-                left = middle + 1
+    def update_field(self, task_id: int, key: str, value) -> None:
+        """Поменять одно поле задачи."""
+        def change(all_tasks: list[dict]) -> None:
+            pos = self.find_by_id(all_tasks, task_id)
+            if pos is None:
+                # Задачу уже удалили в другом процессе
+                return
+            task_dict = all_tasks[pos]
+            self.index_remove(task_dict)
+            task_dict[key] = value
+            self.index_add(task_dict)
 
-            elif all_tasks[middle].get("id") > task_id:
-                right = middle - 1
-        return None
+        self.mutate(change)
 
     def add_task(self, task: Task) -> None:
         """Добавить задачу в список."""
-        all_tasks = self.load_data()
-        task_dict = asdict(task)
-        task_dict["id"] = ManagerID(self.id_path).increment()
-        all_tasks.append(task_dict)
-        self.save_data(all_tasks)
+        task_dict = task.to_dict()
+        task_dict["id"] = self.manager_id.increment()
+        self.add_records([task_dict])
+
+    def add_records(self, task_dicts: list[dict], in_order: bool = False) -> None:
+        """
+        Дописать задачи, которым ID уже выданы, одним изменением.
+        :param in_order: Держать файл упорядоченным по ID: задача с ID
+        меньше последнего (другой процесс взял блок ID раньше нас)
+        вставляется на свое место, а не в конец.
+        """
+        def change(all_tasks: list[dict]) -> None:
+            index = self.get_index(all_tasks)
+            shifted = False
+            for task_dict in task_dicts:
+                if in_order and all_tasks and all_tasks[-1]["id"] > task_dict["id"]:
+                    bisect.insort(all_tasks, dict(task_dict), key=itemgetter("id"))
+                    shifted = True
+                else:
+                    all_tasks.append(dict(task_dict))
+                    index.add(task_dict["id"], len(all_tasks) - 1)
+                self.index_add(task_dict)
+            if shifted:
+                # Вставка в середину сдвинула позиции
+                index.rebuild(all_tasks)
+
+        self.mutate(change)
 
     def edit_task(self, task: Task, key: str, editable: str) -> None:
         """
@@ -109,18 +435,123 @@ class TaskManagerJSON(TaskManagerI):
         :param key: Ключ также элемент задачи, который будем менять.
         :param editable: Новое значение для элемента.
         """
-        all_tasks = self.load_data()
-        task_id = self.find_by_id(all_tasks, task.id)
-        task_dict = all_tasks[task_id]
-        task_dict[key] = editable
-        self.save_data(all_tasks)
+        self.update_field(task.id, key, editable)
 
     def remove_task(self, task_id: int):
-        """Удалить задачу по имени."""
-        all_tasks = self.load_data()
-        task = self.find_by_id(all_tasks, task_id)
-        all_tasks.pop(task)
-        self.save_data(all_tasks)
+        """Удалить задачу по ID."""
+        def change(all_tasks: list[dict]) -> None:
+            pos = self.find_by_id(all_tasks, task_id)
+            if pos is None:
+                return
+            self.index_remove(all_tasks.pop(pos))
+            self.index.remove(task_id)
+
+        self.mutate(change)
+
+    def assign_ids(self, tasks: Iterable[Task]) -> Iterator[dict]:
+        """
+        Выдать задачам новые ID. ID резервируются в файле
+        пачками по `settings.batch_size`, а не по одному.
+        :return: Поток задач в виде словарей.
+        """
+        for chunk in batched(tasks, settings.batch_size):
+            for task_id, task in zip(self.manager_id.reserve(len(chunk)), chunk):
+                task_dict = task.to_dict()
+                task_dict["id"] = task_id
+                yield task_dict
+
+    def add_tasks(self, tasks: Iterable[Task]) -> int:
+        """
+        Добавить много задач за одну запись файла.
+        Старые и новые задачи переписываются в новый файл потоком,
+        поэтому даже миллионы задач не держатся в памяти.
+        Если поток оборвется с ошибкой, файл останется прежним.
+        :param tasks: Задачи, их ID не учитываются.
+        :return: Сколько задач добавлено.
+        """
+        with self.lock:
+            old_signature = file_signature(self.path)
+            # Индексы дополняются, только если они совпадали с файлом
+            id_index = self.index if self.index.signature == old_signature else None
+            synced = [index for index in self.record_indexes
+                      if index.signature == old_signature]
+            start = len(self.index)
+            count = 0
+
+            def new_records() -> Iterator[dict]:
+                nonlocal count
+                for task_dict in self.assign_ids(tasks):
+                    if id_index is not None:
+                        id_index.add(task_dict["id"], start + count)
+                    for index in synced:
+                        index.add(task_dict)
+                    count += 1
+                    yield task_dict
+
+            store_format = get_format(settings.storage_format)
+            try:
+                atomic_write(self.path, lambda tmp_path: store_format.write(
+                    tmp_path, itertools.chain(read_records(self.path), new_records())
+                ))
+            except BaseException:
+                self.index.signature = None
+                for index in synced:
+                    index.signature = None
+                raise
+
+            signature = file_signature(self.path)
+            if id_index is not None:
+                id_index.signature = signature
+            for index in synced:
+                index.signature = signature
+        return count
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> int:
+        """
+        Удалить задачи по ID за одну запись файла.
+        :return: Сколько задач удалено.
+        """
+        task_ids = set(task_ids)
+        removed = 0
+
+        def change(all_tasks: list[dict]) -> None:
+            nonlocal removed
+            kept = []
+            for task_map in all_tasks:
+                if task_map.get("id") in task_ids:
+                    self.index_remove(task_map)
+                else:
+                    kept.append(task_map)
+            removed = len(all_tasks) - len(kept)
+            all_tasks[:] = kept
+            self.index.rebuild(all_tasks)
+
+        self.mutate(change)
+        return removed
+
+    def update_tasks(self, changes: dict[int, dict]) -> int:
+        """
+        Изменить поля у многих задач за одну запись файла.
+        :param changes: ID задачи -> {поле: новое значение}.
+        :return: Сколько задач найдено и изменено.
+        """
+        updated = 0
+
+        def change(all_tasks: list[dict]) -> None:
+            nonlocal updated
+            updated = 0
+            for task_id, fields in changes.items():
+                pos = self.find_by_id(all_tasks, task_id)
+                if pos is None:
+                    continue
+                task_dict = all_tasks[pos]
+                self.index_remove(task_dict)
+                task_dict.update(fields)
+                self.index_add(task_dict)
+                updated += 1
+
+        self.mutate(change)
+        return updated
 
     def get_cats(self) -> dict[str, list[Task]]:
         """
@@ -129,54 +560,235 @@ class TaskManagerJSON(TaskManagerI):
         а значением список с принадлежащими категорию
         задач.
         """
-        tasks = self.get_tasks()
         cat_with_task = defaultdict(list)
-        for task in tasks:
-            cat_with_task[task.category].append(task)
+        for task_map in self.load_data():
+            cat_with_task[task_map["category"]].append(Task.from_dict(task_map))
         return cat_with_task
 
     def get_tasks(self) -> list[Task]:
         """Вывести список задач."""
         all_tasks = []
         for task_map in self.load_data():
-            all_tasks.append(Task(**task_map))
+            all_tasks.append(Task.from_dict(task_map))
         return all_tasks
 
+    def iter_records(self) -> Iterator[dict]:
+        """
+        Перебрать задачи из файла по одной в виде словарей.
+        Файл читается потоком, целиком в памяти он не держится.
+        """
+        yield from read_records(self.path)
+
+    def get_page(
+            self,
+            offset: int,
+            limit: int,
+            filters: dict | None = None
+    ) -> list[Task]:
+        """
+        Достать одну страницу задач.
+        :param offset: Сколько подходящих задач пропустить.
+        :param limit: Размер страницы.
+        :param filters: Поле задачи -> нужное значение.
+        """
+        return page_from_records(self.iter_records(), offset, limit, filters)
+
     def get_incompleted(self) -> list[Task]:
         """Получить список с не выполненными задачами."""
-        all_tasks = self.get_tasks()
-        complited_tasks = [task for task in all_tasks
-                           if not task.status]
+        complited_tasks = [Task.from_dict(task_map) for task_map in self.load_data()
+                           if not task_map["status"]]
         return complited_tasks
 
     def complete_task(self, task: Task):
         """Отметить задачу как выполненную."""
-        all_tasks = self.load_data()
-        task_id = self.find_by_id(all_tasks=all_tasks, task_id=task.id)
-        curr_task = all_tasks[task_id]
-        curr_task["status"] = True
-        self.save_data(all_tasks)
+        self.update_field(task.id, "status", True)
 
     def incomplete_task(self, task: Task):
         """Отметить задачу как невыполненную."""
-        all_tasks = self.load_data()
-        task_id = self.find_by_id(all_tasks=all_tasks, task_id=task.id)
-        curr_task = all_tasks[task_id]
-        curr_task["status"] = False
-        self.save_data(all_tasks)
+        self.update_field(task.id, "status", False)
 
     def find_to_entry_title(self, entry_str: str) -> list[Task]:
         """
-        Поиск по вхождениям строки в `title` задач
-        :param entry_str: Строка которая должна присутствовать
-        в задаче.
-        :return: Список с задачами в которых присутствует подстрока
+        Полнотекстовый поиск по названию, описанию и категории.
+        Слова запроса могут быть началом слов в задаче.
+        :param entry_str: Строка запроса.
+        :return: Список найденных задач, самые подходящие первыми.
         """
-        all_tasks = self.load_data()
-        entry_str = entry_str.lower()
-        finded_tasks = []
-        for task in all_tasks:
-            title = task.get("title").lower()
-            if entry_str in title:
-                finded_tasks.append(Task(**task))
-        return finded_tasks
+        if not entry_str:
+            return self.get_tasks()
+        # Файл читается, только если индекс устарел, и один раз
+        self.sync_indexes(self.iter_records())
+        docs = self.search_index.docs
+        return [Task.from_dict(docs[task_id])
+                for task_id in self.search_index.search(entry_str)]
+
+    def query_records(self, query: Query) -> Iterator[dict]:
+        """
+        Задачи по запросу. Индексы берутся, только если они уже
+        построены и совпадают с файлом: ради одного запроса они
+        не строятся, вместо этого задачи читаются одним проходом.
+        """
+        signature = file_signature(self.path)
+
+        def fresh(index):
+            return index if index is not None and index.signature == signature else None
+
+        candidates, ranks = plan(
+            query,
+            search_index=fresh(self.search_index),
+            category_index=fresh(self.categories),
+            deadline_index=fresh(self.deadline_index),
+        )
+        if candidates is not None and not candidates:
+            return iter(())
+        if ranks is not None:
+            # Текст искали по индексу: кандидаты берутся из него же,
+            # порядок задаст сортировка по рангу или полю
+            docs = self.search_index.docs
+            records = (docs[task_id] for task_id in candidates)
+        else:
+            records = self.iter_records()
+            if candidates is not None:
+                records = (task_map for task_map in records if task_map["id"] in candidates)
+        return select(query, records, ranks)
+
+
+# Кэши с несохраненными изменениями: при выходе они сбрасываются на диск.
+# Ссылки слабые, чтобы выброшенный менеджер не жил до конца процесса.
+_dirty: "weakref.WeakSet[TaskManagerJSONCached]" = weakref.WeakSet()
+
+
+def flush_all() -> None:
+    """Сбросить на диск изменения всех живых кэшей."""
+    for manager in list(_dirty):
+        manager.flush()
+
+
+atexit.register(flush_all)
+
+
+class TaskManagerJSONCached(TaskManagerJSON):
+    """
+    Менеджер задач с кэшем в памяти.
+    Файл читается один раз, изменения копятся в памяти
+    и сбрасываются на диск пачкой: после `flush_every`
+    изменений, по таймеру `flush_interval` или при выходе.
+    Если файл тем временем поменял другой процесс, при сбросе
+    свои изменения повторяются поверх его версии.
+    """
+    def __init__(
+            self,
+            flush_every: int | None = None,
+            flush_interval: float | None = None,
+            path: str | None = None,
+            id_path: str | None = None
+    ):
+        super().__init__(path=path, id_path=id_path)
+        self.flush_every = (settings.flush_every
+                            if flush_every is None else flush_every)
+        self.flush_interval = (settings.flush_interval
+                               if flush_interval is None else flush_interval)
+        self._tasks: list[dict] | None = None
+        # Отпечаток файла, из которого прочитан кэш
+        self._loaded_signature: list[int] | None = None
+        # Изменения, которые еще не записаны на диск
+        self._changes: list[Callable[[list[dict]], None]] = []
+        self._timer: threading.Timer | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def dirty(self) -> bool:
+        """Есть ли изменения, которые еще не записаны на диск."""
+        return bool(self._changes)
+
+    def load_data(self) -> list[dict]:
+        """
+        Достать список задач из памяти. Он читается из файла
+        при первом обращении, а также если файл поменяли
+        снаружи, пока своих несохраненных изменений нет.
+        Возвращаемый список - это сам кэш, менять его
+        нужно только через `mutate`.
+        """
+        with self._lock:
+            if self._tasks is None or (
+                    not self._changes
+                    and file_signature(self.path) != self._loaded_signature):
+                with self.lock:
+                    self._tasks = super().load_data()
+                    self._loaded_signature = file_signature(self.path)
+            return self._tasks
+
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать задачи из кэша."""
+        return iter(self.load_data())
+
+    def mutate(self, change: Callable[[list[dict]], None]) -> None:
+        """Изменить задачи в памяти и запомнить изменение до сброса на диск."""
+        with self._lock:
+            change(self.load_data())
+            self._changes.append(change)
+            _dirty.add(self)
+            if len(self._changes) >= self.flush_every:
+                self.flush()
+            elif self._timer is None and self.flush_interval > 0:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def add_tasks(self, tasks: Iterable[Task]) -> int:
+        """Добавить много задач в кэш одним изменением."""
+        new_tasks = list(self.assign_ids(tasks))
+        self.add_records(new_tasks)
+        return len(new_tasks)
+
+    def flush(self) -> None:
+        """
+        Записать накопленные изменения на диск.
+        Под блокировкой файла проверяется, не поменял ли его другой
+        процесс; если поменял, изменения повторяются на свежей версии.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._changes:
+                return
+            with self.lock:
+                if file_signature(self.path) != self._loaded_signature:
+                    fresh = super().load_data()
+                    for change in self._changes:
+                        change(fresh)
+                    self._tasks = fresh
+                    # Индексы строились по старой версии
+                    self.index.rebuild(fresh)
+                    for index in self.record_indexes:
+                        index.signature = None
+                self.save_data(self._tasks)
+                self._loaded_signature = file_signature(self.path)
+            self._changes = []
+            _dirty.discard(self)
+
+    def close(self) -> None:
+        """Сбросить изменения на диск перед тем, как выбросить менеджер."""
+        self.flush()
+
+
+def make_manager() -> TaskManagerI:
+    """Создать менеджер задач, указанный в `settings.storage`."""
+    from tasks.async_manager import TaskManagerAsync
+    from tasks.journal import TaskManagerJournal
+    from tasks.sharded import TaskManagerSharded
+    from tasks.sqlite import TaskManagerSQLite
+
+    managers = {
+        "json": TaskManagerJSON,
+        "json_cached": TaskManagerJSONCached,
+        "async": TaskManagerAsync,
+        "journal": TaskManagerJournal,
+        "sqlite": TaskManagerSQLite,
+        "sharded": TaskManagerSharded,
+    }
+    manager_cls = managers.get(settings.storage)
+    if manager_cls is None:
+        raise ValueError(f"Неизвестное хранилище: {settings.storage}")
+    return manager_cls()
@@ -0,0 +1,354 @@
+import bisect
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from utils.fileio import atomic_write_text
+
+
+def file_signature(path: str) -> list[int] | None:
+    """
+    Отпечаток файла: время изменения и размер.
+    По нему понятно, менялся ли файл с прошлого раза.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class IdIndex:
+    """
+    Индекс ID задачи -> позиция в списке задач.
+    Держится в памяти вместе с отпечатком файла задач, поэтому
+    устаревший индекс сразу видно и его можно пересобрать.
+    На диск (рядом с БД) его пишет только `rebuild_index`,
+    а не каждое сохранение: иначе каждая правка пишет лишний файл.
+
+    Удаление не сдвигает позиции остальных задач: позиции хранятся
+    такими, какими были при сборке, а удаленные запоминаются
+    в отсортированном списке и вычитаются при чтении.
+    """
+    # Сколько удалений копить, прежде чем пересчитать позиции
+    COMPACT_AFTER = 1024
+
+    def __init__(self) -> None:
+        self.positions: dict[int, int] = {}
+        # Удаленные позиции в нумерации `positions`, по возрастанию
+        self.removed: list[int] = []
+        # Отпечаток файла задач, с которым индекс совпадает
+        self.signature: list[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def get(self, task_id: int) -> int | None:
+        """Позиция задачи или `None`."""
+        pos = self.positions.get(task_id)
+        if pos is None or not self.removed:
+            return pos
+        return pos - bisect.bisect_left(self.removed, pos)
+
+    def rebuild(self, all_tasks: list[dict]) -> None:
+        """Построить индекс заново по списку задач."""
+        self.positions = {
+            task_map.get("id"): pos for pos, task_map in enumerate(all_tasks)
+        }
+        self.removed = []
+
+    def add(self, task_id: int, pos: int) -> None:
+        """Запомнить позицию новой задачи в конце списка."""
+        self.positions[task_id] = pos + len(self.removed)
+
+    def remove(self, task_id: int) -> None:
+        """Забыть задачу, следующие за ней сдвигаются на одну."""
+        pos = self.positions.pop(task_id, None)
+        if pos is None:
+            return
+        bisect.insort(self.removed, pos)
+        if len(self.removed) > max(self.COMPACT_AFTER, len(self.positions)):
+            self.positions = {task_id: self.get(task_id) for task_id in self.positions}
+            self.removed = []
+
+    def load(self, path: str) -> bool:
+        """
+        Прочитать индекс из файла.
+        :return: Удалось ли прочитать.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        self.signature = data.get("signature")
+        self.positions = {
+            task_id: pos for pos, task_id in enumerate(data.get("ids", []))
+        }
+        self.removed = []
+        return True
+
+    def save(self, path: str) -> None:
+        """Записать индекс в файл."""
+        ids = sorted(self.positions, key=self.positions.get)
+        # Индекс всегда можно пересобрать, поэтому без fsync и копий
+        atomic_write_text(
+            path, json.dumps({"signature": self.signature, "ids": ids}),
+            fsync=False, backups=0
+        )
+
+
+TOKEN_RE = re.compile(r"\w+")
+# Вес поля задачи при ранжировании результатов поиска
+SEARCH_FIELDS = {"title": 3, "category": 2, "description": 1}
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Разбить текст на слова без учета регистра.
+    `casefold` корректно работает с кириллицей, `ё` приравнивается к `е`.
+    """
+    return TOKEN_RE.findall(text.casefold().replace("ё", "е"))
+
+
+class SearchIndex:
+    """
+    Обратный индекс слово -> задачи для полнотекстового поиска
+    по названию, описанию и категории.
+    Слова хранятся отсортированными, поэтому поиск по началу
+    слова - это бинарный поиск диапазона.
+    """
+    def __init__(self, store_docs: bool = False) -> None:
+        """
+        :param store_docs: Хранить ли сами задачи (`docs`), чтобы отдавать
+        найденное без чтения файла. Нужно хранилищам, которые не держат
+        задачи в памяти.
+        """
+        # слово -> {ID задачи: вес}
+        self.postings: dict[str, dict[int, int]] = {}
+        self.vocabulary: list[str] = []
+        # ID -> задача, если `store_docs`
+        self.docs: dict[int, dict] | None = {} if store_docs else None
+        # Отпечаток файла задач, с которым индекс совпадает
+        self.signature: list[int] | None = None
+
+    @staticmethod
+    def record_tokens(task_map: dict) -> dict[str, int]:
+        """Слова задачи с суммарным весом полей, где они встречаются."""
+        weights = defaultdict(int)
+        for field, weight in SEARCH_FIELDS.items():
+            for token in set(tokenize(str(task_map.get(field) or ""))):
+                weights[token] += weight
+        return weights
+
+    def rebuild(self, all_tasks) -> None:
+        """Построить индекс заново по задачам."""
+        self.postings = {}
+        if self.docs is not None:
+            self.docs = {}
+        for task_map in all_tasks:
+            task_id = task_map.get("id")
+            for token, weight in self.record_tokens(task_map).items():
+                self.postings.setdefault(token, {})[task_id] = weight
+            if self.docs is not None:
+                self.docs[task_id] = task_map
+        self.vocabulary = sorted(self.postings)
+
+    def add(self, task_map: dict) -> None:
+        """Добавить задачу в индекс."""
+        task_id = task_map.get("id")
+        for token, weight in self.record_tokens(task_map).items():
+            docs = self.postings.get(token)
+            if docs is None:
+                docs = self.postings[token] = {}
+                bisect.insort(self.vocabulary, token)
+            docs[task_id] = weight
+        if self.docs is not None:
+            self.docs[task_id] = task_map
+
+    def remove(self, task_map: dict) -> None:
+        """Убрать задачу из индекса."""
+        task_id = task_map.get("id")
+        if self.docs is not None:
+            self.docs.pop(task_id, None)
+        for token in self.record_tokens(task_map):
+            docs = self.postings.get(token)
+            if docs is None:
+                continue
+            docs.pop(task_id, None)
+            if not docs:
+                del self.postings[token]
+                pos = bisect.bisect_left(self.vocabulary, token)
+                del self.vocabulary[pos]
+
+    def expand(self, prefix: str) -> list[str]:
+        """Все слова индекса, которые начинаются с `prefix`."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+        return self.vocabulary[start:end]
+
+    def search(self, query: str) -> list[int]:
+        """
+        Найти задачи, в которых есть все слова запроса
+        (или слова, начинающиеся с них).
+        :return: ID задач, самые релевантные первыми.
+        """
+        scores = None
+        for prefix in set(tokenize(query)):
+            prefix_scores = defaultdict(int)
+            for token in self.expand(prefix):
+                # Полное совпадение слова важнее совпадения начала
+                bonus = 2 if token == prefix else 1
+                for task_id, weight in self.postings[token].items():
+                    prefix_scores[task_id] += weight * bonus
+
+            if scores is None:
+                scores = prefix_scores
+            else:
+                scores = {task_id: score + prefix_scores[task_id]
+                          for task_id, score in scores.items()
+                          if task_id in prefix_scores}
+            if not scores:
+                return []
+
+        if scores is None:
+            return []
+        return sorted(scores, key=lambda task_id: (-scores[task_id], task_id))
+
+
+class CategoryIndex:
+    """
+    Индекс категория -> ID задач со счетчиками выполненных.
+    По нему экран категорий рисуется без чтения самих задач.
+    """
+    def __init__(self) -> None:
+        self.ids: dict[str, set[int]] = {}
+        # Категория -> сколько в ней выполненных задач
+        self.done: dict[str, int] = {}
+        # Отпечаток файла задач, с которым индекс совпадает
+        self.signature: list[int] | None = None
+
+    def rebuild(self, all_tasks) -> None:
+        """Построить индекс заново по задачам."""
+        self.ids = {}
+        self.done = {}
+        for task_map in all_tasks:
+            self.add(task_map)
+
+    def add(self, task_map: dict) -> None:
+        """Добавить задачу в ее категорию."""
+        category = task_map.get("category")
+        self.ids.setdefault(category, set()).add(task_map.get("id"))
+        self.done[category] = self.done.get(category, 0) + bool(task_map.get("status"))
+
+    def remove(self, task_map: dict) -> None:
+        """Убрать задачу из ее категории, пустая категория пропадает."""
+        category = task_map.get("category")
+        ids = self.ids.get(category)
+        if ids is None or task_map.get("id") not in ids:
+            return
+        ids.discard(task_map.get("id"))
+        self.done[category] -= bool(task_map.get("status"))
+        if not ids:
+            del self.ids[category]
+            del self.done[category]
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """Категория -> сколько задач всего, выполнено и не выполнено."""
+        return {
+            category: {"total": len(ids), "done": self.done[category],
+                       "pending": len(ids) - self.done[category]}
+            for category, ids in self.ids.items()
+        }
+
+
+class DeadlineIndex:
+    """
+    Невыполненные задачи, упорядоченные по сроку.
+    Список пар (срок, ID) держится отсортированным, поэтому
+    границы "просрочено" и "срок в ближайшие N часов" находятся
+    бинарным поиском, а сроки не разбираются заново при каждом запросе.
+    """
+    def __init__(self) -> None:
+        self.entries: list[tuple[datetime, int]] = []
+        # Отпечаток файла задач, с которым индекс совпадает
+        self.signature: list[int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def entry(task_map: dict) -> tuple[datetime, int] | None:
+        """Ключ задачи в индексе или `None`, если ее там быть не должно."""
+        if task_map.get("status"):
+            return None
+        try:
+            deadline = datetime.fromisoformat(task_map.get("deadline"))
+        except (TypeError, ValueError):
+            return None
+        task_id = task_map.get("id")
+        return deadline, task_id if task_id is not None else -1
+
+    def rebuild(self, all_tasks) -> None:
+        """Построить индекс заново по задачам."""
+        self.entries = sorted(filter(None, map(self.entry, all_tasks)))
+
+    def add(self, task_map: dict) -> None:
+        """Добавить задачу в индекс, если она не выполнена."""
+        entry = self.entry(task_map)
+        if entry is not None:
+            bisect.insort(self.entries, entry)
+
+    def remove(self, task_map: dict) -> None:
+        """Убрать задачу из индекса."""
+        entry = self.entry(task_map)
+        if entry is None:
+            return
+        pos = bisect.bisect_left(self.entries, entry)
+        if pos < len(self.entries) and self.entries[pos] == entry:
+            del self.entries[pos]
+
+    def due_before(self, moment: datetime) -> list[int]:
+        """ID задач со сроком раньше `moment`, самые ранние первыми."""
+        end = bisect.bisect_left(self.entries, (moment,))
+        return [task_id for _, task_id in self.entries[:end]]
+
+    def between(self, start: datetime | None, end: datetime | None) -> list[int]:
+        """ID задач со сроком в `[start, end)`, границы можно не задавать."""
+        first = bisect.bisect_left(self.entries, (start,)) if start is not None else 0
+        last = (bisect.bisect_left(self.entries, (end,)) if end is not None
+                else len(self.entries))
+        return [task_id for _, task_id in self.entries[first:last]]
+
+    def overdue(self, now: datetime | None = None) -> list[int]:
+        """ID просроченных задач."""
+        return self.due_before(now or datetime.now())
+
+    def due_within(self, term: timedelta, now: datetime | None = None) -> list[int]:
+        """ID задач, срок которых наступит в ближайшие `term`, без просроченных."""
+        now = now or datetime.now()
+        start = bisect.bisect_left(self.entries, (now,))
+        end = bisect.bisect_left(self.entries, (now + term,))
+        return [task_id for _, task_id in self.entries[start:end]]
+
+    def next_after(self, moment: datetime) -> datetime | None:
+        """Ближайший срок строго позже `moment` или `None`."""
+        pos = bisect.bisect_right(self.entries, (moment, float("inf")))
+        return self.entries[pos][0] if pos < len(self.entries) else None
+
+    def next_due(self, count: int, now: datetime | None = None) -> list[int]:
+        """ID `count` ближайших задач, срок которых еще не прошел."""
+        start = bisect.bisect_left(self.entries, (now or datetime.now(),))
+        return [task_id for _, task_id in self.entries[start:start + count]]
+
+
+if __name__ == '__main__':
+    # Пересобрать индекс, если он пропал или устарел:
+    # python -m tasks.indexes
+    from tasks.db import TaskManagerJSON
+
+    manager = TaskManagerJSON()
+    count = manager.rebuild_index()
+    print(f"Индекс пересобран: {count} задач")
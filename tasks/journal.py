@@ -0,0 +1,129 @@
+import json
+import os
+from typing import Iterable
+
+from settings import settings
+from tasks.indexes import file_signature
+from tasks.memory import TaskManagerMemory
+from utils.fileio import atomic_write_text
+from utils.formats import read_records
+from utils.manager_id import ManagerID
+
+
+class TaskManagerJournal(TaskManagerMemory):
+    """
+    Менеджер задач на журнале изменений.
+    Каждое изменение дописывается одной строкой в журнал,
+    при запуске состояние собирается из снимка и журнала.
+    Когда журнал разрастается, он сворачивается в новый снимок.
+    При первом открытии задачи переносятся из `settings.path_db`.
+    """
+    def __init__(
+            self,
+            path: str | None = None,
+            snapshot_path: str | None = None,
+            id_path: str | None = None,
+            compact_after: int | None = None,
+            json_path: str | None = None
+    ):
+        """
+        :param json_path: Файл JSON, из которого задачи переносятся
+        один раз, пока нет ни снимка, ни журнала.
+        """
+        self.path = path or settings.path_journal
+        self.snapshot_path = snapshot_path or settings.path_snapshot
+        self.id_path = id_path or settings.path_auto_incr
+        self.manager_id = ManagerID(self.id_path)
+        self.compact_after = (settings.journal_compact_after
+                              if compact_after is None else compact_after)
+        super().__init__()
+        self.journal_size = 0
+        if not os.path.exists(self.snapshot_path) and not os.path.exists(self.path):
+            json_path = json_path or settings.path_db
+            if os.path.exists(json_path):
+                self.migrate_from_json(json_path)
+        self.replay()
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Перенести задачи из файла задач (JSON или другой формат
+        из `utils.formats`) в снимок, ID сохраняются.
+        :return: Сколько задач перенесено.
+        """
+        self.tasks = {task_map["id"]: task_map for task_map in read_records(json_path)}
+        self.compact()
+        return len(self.tasks)
+
+    def replay(self) -> None:
+        """Восстановить задачи из снимка и журнала."""
+        self.journal_size = 0
+        snapshot = []
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+        self.load_tasks(snapshot)
+
+        if not os.path.exists(self.path):
+            self.signature = self.store_signature()
+            return
+        good_offset = 0
+        with open(self.path, 'rb') as file:
+            for line in file:
+                # Строка без перевода строки могла оборваться на границе
+                # значения JSON и все равно разобраться
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                self.apply(entry)
+                self.journal_size += 1
+                good_offset += len(line)
+        # Оборванную после сбоя строку отрезаем, чтобы
+        # следующая запись не склеилась с ней.
+        if good_offset != os.path.getsize(self.path):
+            os.truncate(self.path, good_offset)
+        self.signature = self.store_signature()
+
+    def store_signature(self) -> list | None:
+        """Отпечаток снимка и журнала вместе."""
+        snapshot, journal = file_signature(self.snapshot_path), file_signature(self.path)
+        if snapshot is None and journal is None:
+            return None
+        return [snapshot, journal]
+
+    def write_many(self, entries: Iterable[dict]) -> int:
+        """
+        Применить изменения и дописать их в журнал,
+        файл открывается один раз на всю пачку.
+        :return: Сколько записей дописано.
+        """
+        # Свои записи не повод перечитывать журнал, а чужие - повод
+        in_sync = self.store_signature() == self.signature
+        count = 0
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for entry in entries:
+                self.apply(entry)
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                count += 1
+            if settings.fsync:
+                # Пачка на диске до возврата, как у `atomic_write`
+                file.flush()
+                os.fsync(file.fileno())
+        self.journal_size += count
+        if self.journal_size >= self.compact_after:
+            self.compact()
+        if in_sync:
+            self.signature = self.store_signature()
+        return count
+
+    def compact(self) -> None:
+        """Свернуть журнал в снимок и очистить его."""
+        atomic_write_text(
+            self.snapshot_path,
+            json.dumps(list(self.tasks.values()), ensure_ascii=False)
+        )
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+        self.journal_size = 0
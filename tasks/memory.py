@@ -0,0 +1,233 @@
+"""
+Задачи в памяти: общая основа хранилищ, которые держат все задачи
+в словаре и отвечают на чтение без диска.
+
+Изменения описываются записями (`{"op": "add", "task": {...}}`,
+`{"op": "edit", "id": ..., "key": ..., "value": ...}` и т.д.), они
+применяются к памяти и индексам в `apply`. Куда и как записи попадают
+на диск, решает наследник в `write_many`, откуда берутся задачи
+при запуске - в `replay`.
+
+Изменения других процессов сами в память не попадают: долгоживущий
+читатель (например, демон напоминаний) вызывает `sync`, и задачи
+перечитываются, если файлы хранилища поменялись.
+"""
+import abc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from settings import settings
+from tasks.db import TaskManagerI, batched, page_from_records
+from tasks.indexes import CategoryIndex, DeadlineIndex, SearchIndex
+from tasks.models import Task
+from tasks.query import Query, plan, select
+from utils.manager_id import ManagerID
+
+
+class TaskManagerMemory(TaskManagerI):
+    """Задачи и индексы в памяти, запись - через `write_many` наследника."""
+    manager_id: ManagerID
+
+    def __init__(self) -> None:
+        self.tasks: dict[int, dict] = {}
+        self.search_index = SearchIndex()
+        self.deadline_index = DeadlineIndex()
+        self.category_index = CategoryIndex()
+        # Отпечаток файлов хранилища, с которым совпадает память
+        self.signature: list | None = None
+
+    @abc.abstractmethod
+    def replay(self) -> None:
+        """Загрузить задачи в память."""
+        ...
+
+    @abc.abstractmethod
+    def store_signature(self) -> list | None:
+        """Отпечаток файлов, в которых лежат задачи (см. `file_signature`)."""
+        ...
+
+    def sync(self) -> bool:
+        """
+        Перечитать задачи, если файлы хранилища поменял другой процесс.
+        :return: Перечитаны ли задачи.
+        """
+        if self.store_signature() == self.signature:
+            return False
+        self.replay()
+        return True
+
+    @abc.abstractmethod
+    def write_many(self, entries: Iterable[dict]) -> int:
+        """
+        Применить изменения к памяти и сохранить их.
+        :return: Сколько изменений применено.
+        """
+        ...
+
+    def load_tasks(self, records: Iterable[dict]) -> None:
+        """Заменить задачи в памяти и пересобрать индексы."""
+        self.tasks = {task_map["id"]: task_map for task_map in records}
+        self.search_index.rebuild(self.tasks.values())
+        self.deadline_index.rebuild(self.tasks.values())
+        self.category_index.rebuild(self.tasks.values())
+
+    def apply(self, entry: dict) -> None:
+        """
+        Применить запись изменения к задачам в памяти.
+        Записи идемпотентны, поэтому повторное применение
+        журнала поверх свежего снимка ничего не ломает.
+        """
+        op = entry["op"]
+        task_id = entry["task"]["id"] if op == "add" else entry["id"]
+        old_task = self.tasks.get(task_id)
+        if old_task is not None:
+            self.search_index.remove(old_task)
+            self.deadline_index.remove(old_task)
+            self.category_index.remove(old_task)
+
+        if op == "add":
+            self.tasks[task_id] = entry["task"]
+        elif op == "remove":
+            self.tasks.pop(task_id, None)
+        elif old_task is not None:
+            if op == "edit":
+                old_task[entry["key"]] = entry["value"]
+            elif op == "complete":
+                old_task["status"] = True
+            elif op == "incomplete":
+                old_task["status"] = False
+
+        new_task = self.tasks.get(task_id)
+        if new_task is not None:
+            self.search_index.add(new_task)
+            self.deadline_index.add(new_task)
+            self.category_index.add(new_task)
+
+    def write(self, entry: dict) -> None:
+        """Применить и сохранить одно изменение."""
+        self.write_many([entry])
+
+    def find_by_id(self, all_tasks: list[dict], task_id: int) -> int | None:
+        """
+        Находит задачу по ID.
+        :return: Либо индекс задачи в `all_tasks`, либо `None`.
+        """
+        for idx, task_map in enumerate(all_tasks):
+            if task_map.get("id") == task_id:
+                return idx
+        return None
+
+    def add_task(self, task: Task) -> None:
+        """Добавить задачу."""
+        task_dict = task.to_dict()
+        task_dict["id"] = self.manager_id.increment()
+        self.write({"op": "add", "task": task_dict})
+
+    def edit_task(self, task: Task, key: str, editable: str) -> None:
+        """Изменить поле задачи."""
+        self.write({"op": "edit", "id": task.id, "key": key, "value": editable})
+
+    def remove_task(self, task_id: int) -> None:
+        """Удалить задачу по ID."""
+        self.write({"op": "remove", "id": task_id})
+
+    def add_tasks(self, tasks: Iterable[Task]) -> int:
+        """Добавить много задач одной пачкой изменений."""
+        def entries() -> Iterator[dict]:
+            for chunk in batched(tasks, settings.batch_size):
+                for task_id, task in zip(self.manager_id.reserve(len(chunk)), chunk):
+                    task_dict = task.to_dict()
+                    task_dict["id"] = task_id
+                    yield {"op": "add", "task": task_dict}
+
+        return self.write_many(entries())
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> int:
+        """Удалить много задач одной пачкой изменений."""
+        task_ids = [task_id for task_id in set(task_ids) if task_id in self.tasks]
+        self.write_many({"op": "remove", "id": task_id} for task_id in task_ids)
+        return len(task_ids)
+
+    def update_tasks(self, changes: dict[int, dict]) -> int:
+        """Изменить поля у многих задач одной пачкой изменений."""
+        task_ids = [task_id for task_id in changes if task_id in self.tasks]
+        self.write_many(
+            {"op": "edit", "id": task_id, "key": key, "value": value}
+            for task_id in task_ids
+            for key, value in changes[task_id].items()
+        )
+        return len(task_ids)
+
+    def complete_task(self, task: Task) -> None:
+        """Отметить задачу как выполненную."""
+        self.write({"op": "complete", "id": task.id})
+
+    def incomplete_task(self, task: Task) -> None:
+        """Отметить задачу как невыполненную."""
+        self.write({"op": "incomplete", "id": task.id})
+
+    def get_tasks(self) -> list[Task]:
+        """Вывести список задач."""
+        return [Task.from_dict(task_map) for task_map in self.tasks.values()]
+
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать задачи по одной в виде словарей."""
+        return iter(self.tasks.values())
+
+    def get_page(
+            self,
+            offset: int,
+            limit: int,
+            filters: dict | None = None
+    ) -> list[Task]:
+        """Достать одну страницу задач."""
+        return page_from_records(self.tasks.values(), offset, limit, filters)
+
+    def get_cats(self) -> dict[str, list[Task]]:
+        """Сгруппировать задачи по категориям."""
+        cat_with_task = defaultdict(list)
+        for task_map in self.tasks.values():
+            cat_with_task[task_map["category"]].append(Task.from_dict(task_map))
+        return cat_with_task
+
+    def get_cat_counts(self) -> dict[str, dict[str, int]]:
+        """Категория -> сколько задач всего, выполнено и не выполнено."""
+        return self.category_index.counts()
+
+    def get_incompleted(self) -> list[Task]:
+        """Получить список с не выполненными задачами."""
+        return [Task.from_dict(task_map) for task_map in self.tasks.values()
+                if not task_map["status"]]
+
+    def get_deadline_index(self) -> DeadlineIndex:
+        """Индекс сроков, он обновляется с каждым изменением."""
+        return self.deadline_index
+
+    def get_urgent(self, within: timedelta | None = None) -> list[Task]:
+        """Просроченные и срочные невыполненные задачи по порядку сроков."""
+        if within is None:
+            within = timedelta(hours=settings.sos_hours)
+        task_ids = self.deadline_index.due_before(datetime.now() + within)
+        return [Task.from_dict(self.tasks[task_id]) for task_id in task_ids]
+
+    def find_to_entry_title(self, entry_str: str) -> list[Task]:
+        """Полнотекстовый поиск по названию, описанию и категории."""
+        if not entry_str:
+            return self.get_tasks()
+        return [Task.from_dict(self.tasks[task_id])
+                for task_id in self.search_index.search(entry_str)]
+
+    def query_records(self, query: Query) -> Iterator[dict]:
+        """Задачи по запросу, кандидаты берутся из индексов в памяти."""
+        candidates, ranks = plan(query, self.search_index,
+                                 self.category_index, self.deadline_index)
+        if candidates is None:
+            records = iter(self.tasks.values())
+        elif query.sort is not None or ranks is not None:
+            # Порядок все равно задаст сортировка
+            records = (self.tasks[task_id] for task_id in candidates)
+        else:
+            records = (task_map for task_map in self.tasks.values()
+                       if task_map["id"] in candidates)
+        return select(query, records, ranks)
@@ -1,14 +1,27 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
-from rich.console import Group
-from rich.padding import Padding
-from rich.text import Text
+if TYPE_CHECKING:
+    from rich.padding import Padding
 
 
-@dataclass
-class Task:
-        """dataclass для представление единицы задачи"""
+class _DeadlineCache:
+    """
+    Слот для разобранного срока. Он вынесен в базовый класс,
+    чтобы не попадать в поля dataclass: `asdict`, сравнение
+    и `repr` его не видят.
+    """
+    __slots__ = ("_deadline_cache",)
+
+
+@dataclass(slots=True)
+class Task(_DeadlineCache):
+        """
+        dataclass для представление единицы задачи.
+        Без `__dict__`: поля лежат в слотах, так задача
+        занимает в памяти заметно меньше.
+        """
         title: str
         description: str
         category: str
@@ -18,6 +31,38 @@ class Task:
 
         id: int | None = None
 
+        @classmethod
+        def from_dict(cls, task_map: dict) -> "Task":
+            """Задача из словаря в том виде, как она хранится в файле."""
+            return cls(**task_map)
+
+        def to_dict(self) -> dict:
+            """
+            Словарь для хранения, как `asdict`, только без
+            глубокого копирования: все поля задачи - простые значения.
+            """
+            return {
+                "title": self.title,
+                "description": self.description,
+                "category": self.category,
+                "deadline": self.deadline,
+                "priority": self.priority,
+                "status": self.status,
+                "id": self.id,
+            }
+
+        @property
+        def deadline_at(self) -> datetime:
+            """
+            Срок в виде `datetime`. Строка разбирается один раз,
+            пока `deadline` не поменяют.
+            """
+            cache = getattr(self, "_deadline_cache", None)
+            if cache is None or cache[0] is not self.deadline:
+                cache = (self.deadline, datetime.fromisoformat(self.deadline))
+                self._deadline_cache = cache
+            return cache[1]
+
         def repr_status(self) -> str:
             """
             :return: Возвращает строку исходя от статуса задачи
@@ -29,18 +74,20 @@ class Task:
             Вычисляет время, которое осталось до конца срока
             выполнение задачи
             """
-            parsing_deadline = datetime.strptime(
-                self.deadline, "%Y-%m-%dT%H:%M:%S.%f"
-            )
-            now = datetime.now()
-            return parsing_deadline - now
+            return self.deadline_at - datetime.now()
 
-        def __rich__(self) -> Padding:
+        def __rich__(self) -> "Padding":
             """
             Метод, который предлагает фреймворк `rich`.
             Repr для `rich.console.Console`
             :return: Padding[Group[Text]] - грубо говоря.
             """
+            # rich нужен только для отрисовки, модель без него
+            # импортируется быстрее (например, в `cli.py`)
+            from rich.console import Group
+            from rich.padding import Padding
+            from rich.text import Text
+
             timing = self.timing()
             task = Group(
                 Text.assemble((f"{self.title}", "blue")),
@@ -0,0 +1,167 @@
+"""
+Составные запросы к задачам: фильтры, сортировка и страница.
+
+Планировщик (`plan`) берет из индексов хранилища множества подходящих
+ID и пересекает их, начиная с самого маленького. Если подходящих
+индексов нет, запрос выполняется одним потоковым проходом по задачам.
+"""
+import heapq
+import itertools
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator
+
+from tasks.indexes import CategoryIndex, DeadlineIndex, SearchIndex, tokenize
+
+SORT_FIELDS = ("id", "deadline", "priority")
+# Порядок приоритетов при сортировке, неизвестные - в конце
+PRIORITY_ORDER = {"Высокий": 0, "Средний": 1, "Низкий": 2}
+
+
+@dataclass
+class Query:
+    """
+    Запрос к задачам. Пустые поля не фильтруют.
+    Срок задается полуинтервалом `[deadline_from, deadline_to)`.
+    Без `sort` задачи идут в порядке хранилища, а при поиске
+    по тексту - самые подходящие первыми.
+    """
+    status: bool | None = None
+    category: str | None = None
+    priority: str | None = None
+    deadline_from: datetime | None = None
+    deadline_to: datetime | None = None
+    text: str | None = None
+    sort: str | None = None
+    descending: bool = False
+    offset: int = 0
+    limit: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.sort is not None and self.sort not in SORT_FIELDS:
+            raise ValueError(f"Нельзя сортировать по полю {self.sort}")
+
+    @property
+    def has_deadline_range(self) -> bool:
+        return self.deadline_from is not None or self.deadline_to is not None
+
+    def matches(self, task_map: dict, check_text: bool = True) -> bool:
+        """
+        Подходит ли задача под фильтры.
+        :param check_text: Проверять ли текст; не нужно, если
+        кандидаты уже взяты из поискового индекса.
+        """
+        if self.status is not None and bool(task_map.get("status")) != self.status:
+            return False
+        if self.category is not None and task_map.get("category") != self.category:
+            return False
+        if self.priority is not None and task_map.get("priority") != self.priority:
+            return False
+        if self.has_deadline_range and not self.deadline_matches(task_map.get("deadline")):
+            return False
+        if check_text and self.text and not text_matches(self.text, task_map):
+            return False
+        return True
+
+    def deadline_matches(self, deadline: str | None) -> bool:
+        """Попадает ли срок в диапазон запроса."""
+        try:
+            moment = datetime.fromisoformat(deadline)
+        except (TypeError, ValueError):
+            return False
+        if self.deadline_from is not None and moment < self.deadline_from:
+            return False
+        if self.deadline_to is not None and moment >= self.deadline_to:
+            return False
+        return True
+
+
+def text_matches(text: str, task_map: dict) -> bool:
+    """
+    Та же проверка, что в `SearchIndex.search`, но без индекса:
+    каждое слово запроса - начало какого-то слова задачи.
+    Запрос без слов (одни знаки) не находит ничего, как и в индексе.
+    """
+    prefixes = set(tokenize(text))
+    if not prefixes:
+        return False
+    words = set()
+    for field in ("title", "description", "category"):
+        words.update(tokenize(str(task_map.get(field) or "")))
+    return all(any(word.startswith(prefix) for word in words)
+               for prefix in prefixes)
+
+
+def plan(
+        query: Query,
+        search_index: SearchIndex | None = None,
+        category_index: CategoryIndex | None = None,
+        deadline_index: DeadlineIndex | None = None
+) -> tuple[set[int] | None, dict[int, int] | None]:
+    """
+    Выбрать кандидатов по индексам, которые есть и актуальны.
+    :return: ID кандидатов (`None` - нужен полный проход) и ранги
+    результатов поиска по тексту (`None` - текст не искали по индексу).
+    """
+    candidates = []
+    ranks = None
+    if query.text and search_index is not None:
+        found = search_index.search(query.text)
+        ranks = {task_id: rank for rank, task_id in enumerate(found)}
+        candidates.append(set(found))
+    if query.category is not None and category_index is not None:
+        candidates.append(category_index.ids.get(query.category, set()))
+    # В индексе сроков только невыполненные задачи
+    if query.status is False and query.has_deadline_range and deadline_index is not None:
+        candidates.append(set(deadline_index.between(query.deadline_from, query.deadline_to)))
+    if not candidates:
+        return None, ranks
+
+    candidates.sort(key=len)
+    ids = set(candidates[0])
+    for other in candidates[1:]:
+        ids &= other
+    return ids, ranks
+
+
+def sort_key(query: Query, ranks: dict[int, int] | None) -> Callable[[dict], tuple] | None:
+    """Ключ сортировки или `None`, если порядок хранилища подходит."""
+    if query.sort == "id":
+        return lambda task_map: (task_map["id"],)
+    if query.sort == "deadline":
+        # Сроки в isoformat упорядочены как строки
+        return lambda task_map: (task_map.get("deadline") or "", task_map["id"])
+    if query.sort == "priority":
+        return lambda task_map: (
+            PRIORITY_ORDER.get(task_map.get("priority"), len(PRIORITY_ORDER)), task_map["id"]
+        )
+    if ranks is not None:
+        return lambda task_map: (ranks[task_map["id"]],)
+    return None
+
+
+def select(
+        query: Query,
+        records: Iterable[dict],
+        ranks: dict[int, int] | None = None
+) -> Iterator[dict]:
+    """
+    Отфильтровать, отсортировать и вырезать страницу из потока задач.
+    Без сортировки поток обрывается, как только страница набрана;
+    с сортировкой и `limit` в памяти держится только `offset + limit` задач.
+    :param ranks: Ранги из `plan`, тогда текст уже проверен индексом.
+    """
+    records = (task_map for task_map in records
+               if query.matches(task_map, check_text=ranks is None))
+    key = sort_key(query, ranks)
+    end = None if query.limit is None else query.offset + query.limit
+    if key is None:
+        return itertools.islice(records, query.offset, end)
+
+    if end is None:
+        ordered = sorted(records, key=key, reverse=query.descending)
+    elif query.descending:
+        ordered = heapq.nlargest(end, records, key=key)
+    else:
+        ordered = heapq.nsmallest(end, records, key=key)
+    return iter(ordered[query.offset:end])
@@ -0,0 +1,241 @@
+"""
+Напоминания о сроках задач в фоне.
+
+Планировщик на asyncio не опрашивает хранилище по кругу: по индексу
+сроков он находит ближайший момент, когда задача войдет в окно SOS
+или просрочится, и спит до него. Чтение хранилища идет в потоке
+(`asyncio.to_thread`), чтобы не останавливать цикл событий. Хранилища
+в памяти перед каждым чтением перечитываются, если их файлы поменял
+другой процесс (меню).
+
+    python -m tasks.reminders --bell --hook "notify-send Задача"
+"""
+import asyncio
+import inspect
+import logging
+import os
+import shlex
+import sys
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from settings import settings
+from tasks.db import TaskManagerI
+from tasks.indexes import DeadlineIndex, file_signature
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+# Задача вошла в окно SOS
+SOON = "soon"
+# Срок задачи прошел
+OVERDUE = "overdue"
+# Запас к времени сна, чтобы проснуться уже после срока, а не ровно в него
+WAKE_SLACK = 0.01
+
+Notifier = Callable[[Task, str], Awaitable[None] | None]
+
+
+def describe(task: Task, kind: str) -> str:
+    """Текст напоминания."""
+    if kind == OVERDUE:
+        return f"Срок задачи \"{task.title}\" (ID {task.id}) истек"
+    return f"До срока задачи \"{task.title}\" (ID {task.id}) осталось {task.timing()}"
+
+
+def bell_notifier(task: Task, kind: str) -> None:
+    """Звонок терминала и строка в stderr."""
+    print(f"\a{describe(task, kind)}", file=sys.stderr, flush=True)
+
+
+def log_notifier(task: Task, kind: str) -> None:
+    """Строка в журнал `logging`."""
+    logger.warning(describe(task, kind))
+
+
+class CommandNotifier:
+    """
+    Запустить внешнюю команду на каждое напоминание.
+    Данные задачи передаются через переменные окружения
+    `TASK_ID`, `TASK_TITLE`, `TASK_DEADLINE` и `REMINDER_KIND`,
+    текст напоминания - последним аргументом.
+    """
+    def __init__(self, command: str) -> None:
+        self.args = shlex.split(command)
+
+    async def __call__(self, task: Task, kind: str) -> None:
+        env = dict(
+            os.environ,
+            TASK_ID=str(task.id),
+            TASK_TITLE=task.title,
+            TASK_DEADLINE=task.deadline,
+            REMINDER_KIND=kind,
+        )
+        process = await asyncio.create_subprocess_exec(
+            *self.args, describe(task, kind), env=env
+        )
+        await process.wait()
+
+
+class ReminderScheduler:
+    """
+    Следит за сроками невыполненных задач и напоминает о каждой
+    дважды: когда до срока остается `warn_before` и когда срок прошел.
+    """
+    def __init__(
+            self,
+            manager: TaskManagerI,
+            notifiers: list[Notifier] | None = None,
+            warn_before: timedelta | None = None,
+            recheck: float | None = None
+    ) -> None:
+        """
+        :param manager: Хранилище задач.
+        :param notifiers: Кому сообщать, по умолчанию - в `logging`.
+        :param warn_before: Окно SOS, по умолчанию `settings.sos_hours`.
+        :param recheck: Дольше этого (в секундах) не спать, по умолчанию
+        `settings.reminder_recheck`.
+        """
+        self.manager = manager
+        self.notifiers = notifiers if notifiers is not None else [log_notifier]
+        self.warn_before = (timedelta(hours=settings.sos_hours)
+                            if warn_before is None else warn_before)
+        self.recheck = settings.reminder_recheck if recheck is None else recheck
+        # ID задач, о которых уже напомнили
+        self.warned: set[int] = set()
+        self.overdue: set[int] = set()
+        # Свой индекс сроков для хранилищ без него, см. `deadline_index`
+        self._deadline_index: DeadlineIndex | None = None
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+
+    def sync_manager(self) -> None:
+        """
+        Хранилища в памяти (журнал, фоновая запись) не видят чужих
+        изменений сами: перечитать их, если файлы поменялись.
+        """
+        sync = getattr(self.manager, "sync", None)
+        if sync is not None:
+            sync()
+
+    def urgent(self) -> list[Task]:
+        """Срочные задачи свежего состояния хранилища."""
+        self.sync_manager()
+        return self.manager.get_urgent(self.warn_before)
+
+    def deadline_index(self) -> DeadlineIndex:
+        """
+        Индекс сроков хранилища, а если его нет - свой. Свой
+        пересобирается, только когда файл хранилища поменялся.
+        """
+        self.sync_manager()
+        get_index = getattr(self.manager, "get_deadline_index", None)
+        if get_index is not None:
+            return get_index()
+        path = getattr(self.manager, "path", None)
+        signature = file_signature(path) if path else None
+        index = self._deadline_index
+        if index is None or signature is None or index.signature != signature:
+            index = DeadlineIndex()
+            index.rebuild(self.manager.iter_records())
+            index.signature = signature
+            self._deadline_index = index
+        return index
+
+    async def notify(self, task: Task, kind: str) -> None:
+        """Разослать напоминание, ошибка одного получателя не мешает другим."""
+        for notifier in self.notifiers:
+            try:
+                result = notifier(task, kind)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Не удалось отправить напоминание")
+
+    async def check(self) -> list[tuple[Task, str]]:
+        """
+        Напомнить о задачах, которые вошли в окно SOS
+        или просрочились с прошлой проверки.
+        :return: Отправленные напоминания.
+        """
+        urgent = await asyncio.to_thread(self.urgent)
+        now = datetime.now()
+        sent = []
+        current = set()
+        for task in urgent:
+            current.add(task.id)
+            if task.deadline_at <= now:
+                if task.id not in self.overdue:
+                    self.overdue.add(task.id)
+                    # О входе в окно уже поздно напоминать
+                    self.warned.add(task.id)
+                    sent.append((task, OVERDUE))
+            elif task.id not in self.warned:
+                self.warned.add(task.id)
+                sent.append((task, SOON))
+        # Выполненные и удаленные задачи забываем
+        self.warned &= current
+        self.overdue &= current
+
+        for task, kind in sent:
+            await self.notify(task, kind)
+        return sent
+
+    def next_delay(self) -> float:
+        """Сколько секунд спать до ближайшего события, не дольше `recheck`."""
+        now = datetime.now()
+        index = self.deadline_index()
+        moments = []
+        enters_window = index.next_after(now + self.warn_before)
+        if enters_window is not None:
+            moments.append(enters_window - self.warn_before)
+        expires = index.next_after(now)
+        if expires is not None:
+            moments.append(expires)
+        delay = self.recheck
+        for moment in moments:
+            delay = min(delay, (moment - now).total_seconds() + WAKE_SLACK)
+        return max(delay, 0.0)
+
+    def refresh(self) -> None:
+        """Задачи поменялись: пересчитать время сна прямо сейчас."""
+        self._wakeup.set()
+
+    def stop(self) -> None:
+        """Остановить `run`."""
+        self._stopped = True
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Проверять задачи и спать до следующего события, пока не остановят."""
+        self._stopped = False
+        while not self._stopped:
+            self._wakeup.clear()
+            await self.check()
+            delay = await asyncio.to_thread(self.next_delay)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from tasks.db import make_manager
+
+    parser = argparse.ArgumentParser(description="Напоминания о сроках задач")
+    parser.add_argument("--bell", action="store_true", help="Звонок терминала")
+    parser.add_argument("--hook", help="Команда, которая запускается на напоминание")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    task_notifiers: list[Notifier] = [log_notifier]
+    if args.bell:
+        task_notifiers.append(bell_notifier)
+    if args.hook:
+        task_notifiers.append(CommandNotifier(args.hook))
+    try:
+        asyncio.run(ReminderScheduler(make_manager(), task_notifiers).run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,312 @@
+"""
+Хранилище, разбитое на несколько файлов (шардов) по ID задачи.
+
+Задача с ID `n` лежит в шарде `n % count`, задачи в шарде упорядочены
+по ID, поэтому шарды сливаются потоком. Каждый шард - обычный
+`TaskManagerJSON` со своим файлом, блокировкой и индексами, поэтому
+изменение одной задачи переписывает только ее шард. Все задачи
+читаются из шардов параллельно, в пуле процессов: разбор JSON
+занимает несколько ядер, а не одно. Пул запускается один раз
+и останавливается в `close`.
+"""
+import heapq
+import itertools
+import json
+import marshal
+import os
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import timedelta
+from typing import Iterable, Iterator
+
+from settings import settings
+from tasks.db import TaskManagerI, TaskManagerJSON, batched, page_from_records
+from tasks.models import Task
+from tasks.query import Query, sort_key
+from utils.fileio import atomic_write_text
+from utils.formats import read_records
+from utils.locks import FileLock
+from utils.manager_id import ManagerID
+
+# Описание шардов: сколько их, чтобы заметить смену `settings.shard_count`
+META_NAME = "shards.json"
+# Файлы шардов: число шардов в раскладке и номер шарда, плюс индекс
+# и блокировка рядом
+SHARD_NAME_RE = re.compile(r"shard-(\d+)-\d+\.json(?:\.idx|\.lock)?")
+
+
+def read_shard(path: str, pending_only: bool = False) -> list[dict]:
+    """Прочитать задачи шарда, только невыполненные - если `pending_only`."""
+    records = read_records(path)
+    if pending_only:
+        return [task_map for task_map in records if not task_map["status"]]
+    return list(records)
+
+
+def decode_shard(path: str, pending_only: bool = False) -> bytes:
+    """
+    Прочитать шард, выполняется в процессе пула. Задачи возвращаются
+    упакованными в `marshal`: родитель распаковывает их втрое быстрее,
+    чем разбирал бы JSON, а `pickle` списка словарей почти не дешевле
+    самого разбора.
+    """
+    return marshal.dumps(read_shard(path, pending_only))
+
+
+def by_id(task_map: dict) -> int:
+    return task_map["id"]
+
+
+class TaskManagerSharded(TaskManagerI):
+    """
+    Менеджер задач поверх `count` файлов в `settings.path_shards`.
+    При первом открытии задачи переносятся из `settings.path_db`,
+    при смене числа шардов - раскладываются заново.
+    Задачи всегда идут по порядку ID, в том числе результаты поиска.
+    """
+    def __init__(
+            self,
+            directory: str | None = None,
+            count: int | None = None,
+            json_path: str | None = None
+    ):
+        """
+        :param directory: Каталог шардов.
+        :param count: Сколько шардов, по умолчанию `settings.shard_count`.
+        :param json_path: Файл JSON, из которого задачи переносятся
+        один раз, при первом открытии.
+        """
+        self.directory = directory or settings.path_shards
+        self.count = settings.shard_count if count is None else count
+        if self.count < 1:
+            raise ValueError("Шардов должно быть хотя бы 1")
+        os.makedirs(self.directory, exist_ok=True)
+        self.manager_id = ManagerID(settings.path_auto_incr)
+        self.meta_path = os.path.join(self.directory, META_NAME)
+        # Пул процессов для чтения шардов, создается при первом большом чтении
+        self._pool: ProcessPoolExecutor | None = None
+
+        # Два процесса не должны раскладывать задачи одновременно
+        with FileLock(self.meta_path + ".lock"):
+            old_count = self.read_count()
+            self.shards = [self.open_shard(self.count, num) for num in range(self.count)]
+            if old_count != self.count:
+                if old_count is not None:
+                    old_shards = [self.open_shard(old_count, num) for num in range(old_count)]
+                    records = itertools.chain(*(shard.iter_records() for shard in old_shards))
+                else:
+                    json_path = json_path or settings.path_db
+                    records = read_records(json_path) if os.path.exists(json_path) else []
+                # Новая раскладка пишется в файлы с другими именами, а описание
+                # переключается последним: при сбое посреди перекладки
+                # остается прежняя раскладка целиком
+                self.write_all(records)
+                atomic_write_text(self.meta_path, json.dumps({"count": self.count}), backups=0)
+            self.remove_stale()
+
+    def read_count(self) -> int | None:
+        """Число шардов из описания или `None`, если шардов еще нет."""
+        if not os.path.exists(self.meta_path):
+            return None
+        with open(self.meta_path, 'r', encoding='utf-8') as file:
+            return json.load(file)["count"]
+
+    def open_shard(self, count: int, num: int) -> TaskManagerJSON:
+        """Менеджер файла шарда номер `num` из раскладки на `count` шардов."""
+        return TaskManagerJSON(
+            path=os.path.join(self.directory, f"shard-{count}-{num:03}.json"),
+            id_path=settings.path_auto_incr,
+        )
+
+    def remove_stale(self) -> None:
+        """Удалить файлы прежних раскладок, в том числе брошенных при сбое."""
+        for name in os.listdir(self.directory):
+            match = SHARD_NAME_RE.fullmatch(name)
+            if match is not None and int(match.group(1)) != self.count:
+                os.remove(os.path.join(self.directory, name))
+
+    def write_all(self, records: Iterable[dict]) -> None:
+        """Разложить задачи по шардам, содержимое шардов заменяется."""
+        parts = defaultdict(list)
+        for task_map in records:
+            parts[task_map["id"] % self.count].append(task_map)
+        for num, shard in enumerate(self.shards):
+            part = sorted(parts[num], key=by_id)
+            with shard.lock:
+                shard.index.rebuild(part)
+                shard.save_data(part)
+
+    def shard_for(self, task_id: int) -> TaskManagerJSON:
+        """Шард, в котором лежит задача."""
+        return self.shards[task_id % self.count]
+
+    def group_ids(self, task_ids: Iterable[int]) -> dict[int, list[int]]:
+        """Номер шарда -> ID задач из него."""
+        groups = defaultdict(list)
+        for task_id in task_ids:
+            groups[task_id % self.count].append(task_id)
+        return groups
+
+    @property
+    def workers(self) -> int:
+        """Сколько процессов читают шарды."""
+        return min(settings.shard_workers or os.cpu_count() or 1, self.count)
+
+    def get_pool(self) -> ProcessPoolExecutor:
+        """Пул процессов, один на менеджер: запуск процессов дорогой."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        """Остановить пул процессов, если он был запущен."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def read_shards(self, pending_only: bool = False) -> list[dict]:
+        """
+        Задачи всех шардов по порядку ID. Шарды разбираются параллельно,
+        если они вместе больше `settings.parallel_load_min_bytes`.
+        :param pending_only: Только невыполненные: отбор идет в процессах
+        пула, родителю передается меньше.
+        """
+        paths = [shard.path for shard in self.shards]
+        size = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+        if self.workers > 1 and size >= settings.parallel_load_min_bytes:
+            blobs = self.get_pool().map(decode_shard, paths, itertools.repeat(pending_only))
+            parts = [marshal.loads(blob) for blob in blobs]
+        else:
+            parts = [read_shard(path, pending_only) for path in paths]
+        # Каждый шард уже упорядочен, сортировка просто сливает их
+        all_tasks = list(itertools.chain(*parts))
+        all_tasks.sort(key=by_id)
+        return all_tasks
+
+    def load_data(self) -> list[dict]:
+        """Все задачи по порядку ID."""
+        return self.read_shards()
+
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать задачи по порядку ID, шарды читаются потоком."""
+        return heapq.merge(*(shard.iter_records() for shard in self.shards), key=by_id)
+
+    def find_by_id(self, all_tasks: list[dict], task_id: int) -> int | None:
+        """
+        Находит задачу по ID.
+        :return: Либо индекс задачи в `all_tasks`, либо `None`.
+        """
+        for idx, task_map in enumerate(all_tasks):
+            if task_map["id"] == task_id:
+                return idx
+        return None
+
+    def add_task(self, task: Task) -> None:
+        """Добавить задачу, переписывается только ее шард."""
+        task_dict = task.to_dict()
+        task_dict["id"] = self.manager_id.increment()
+        self.shard_for(task_dict["id"]).add_records([task_dict], in_order=True)
+
+    def edit_task(self, task: Task, key: str, editable: str) -> None:
+        """Изменить поле задачи."""
+        self.shard_for(task.id).update_field(task.id, key, editable)
+
+    def remove_task(self, task_id: int) -> None:
+        """Удалить задачу по ID."""
+        self.shard_for(task_id).remove_task(task_id)
+
+    def complete_task(self, task: Task) -> None:
+        """Отметить задачу как выполненную."""
+        self.shard_for(task.id).update_field(task.id, "status", True)
+
+    def incomplete_task(self, task: Task) -> None:
+        """Отметить задачу как невыполненную."""
+        self.shard_for(task.id).update_field(task.id, "status", False)
+
+    def add_tasks(self, tasks: Iterable[Task]) -> int:
+        """Добавить много задач: каждый шард переписывается раз на пачку."""
+        count = 0
+        for chunk in batched(tasks, settings.batch_size):
+            parts = defaultdict(list)
+            for task_id, task in zip(self.manager_id.reserve(len(chunk)), chunk):
+                task_dict = task.to_dict()
+                task_dict["id"] = task_id
+                parts[task_id % self.count].append(task_dict)
+            for num, task_dicts in parts.items():
+                self.shards[num].add_records(task_dicts, in_order=True)
+            count += len(chunk)
+        return count
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> int:
+        """Удалить много задач, затрагиваются только их шарды."""
+        return sum(self.shards[num].remove_tasks(ids)
+                   for num, ids in self.group_ids(task_ids).items())
+
+    def update_tasks(self, changes: dict[int, dict]) -> int:
+        """Изменить поля у многих задач, затрагиваются только их шарды."""
+        return sum(
+            self.shards[num].update_tasks({task_id: changes[task_id] for task_id in ids})
+            for num, ids in self.group_ids(changes).items()
+        )
+
+    def get_tasks(self) -> list[Task]:
+        """Вывести список задач."""
+        return [Task.from_dict(task_map) for task_map in self.load_data()]
+
+    def get_page(
+            self,
+            offset: int,
+            limit: int,
+            filters: dict | None = None
+    ) -> list[Task]:
+        """Достать одну страницу задач по порядку ID."""
+        return page_from_records(self.iter_records(), offset, limit, filters)
+
+    def get_cats(self) -> dict[str, list[Task]]:
+        """Сгруппировать задачи по категориям."""
+        cat_with_task = defaultdict(list)
+        for task_map in self.load_data():
+            cat_with_task[task_map["category"]].append(Task.from_dict(task_map))
+        return cat_with_task
+
+    def get_cat_counts(self) -> dict[str, dict[str, int]]:
+        """Сложить счетчики категорий из индексов шардов."""
+        counts: dict[str, dict[str, int]] = {}
+        for shard in self.shards:
+            for category, shard_counts in shard.get_cat_counts().items():
+                total = counts.setdefault(category, {"total": 0, "done": 0, "pending": 0})
+                for key, value in shard_counts.items():
+                    total[key] += value
+        return counts
+
+    def get_incompleted(self) -> list[Task]:
+        """Получить список с не выполненными задачами."""
+        return [Task.from_dict(task_map) for task_map in self.read_shards(pending_only=True)]
+
+    def get_urgent(self, within: timedelta | None = None) -> list[Task]:
+        """Срочные задачи шардов, слитые по порядку сроков."""
+        return list(heapq.merge(*(shard.get_urgent(within) for shard in self.shards),
+                                key=lambda task: (task.deadline_at, task.id)))
+
+    def find_to_entry_title(self, entry_str: str) -> list[Task]:
+        """Полнотекстовый поиск по названию, описанию и категории."""
+        if not entry_str:
+            return self.get_tasks()
+        return self.query(Query(text=entry_str))
+
+    def query_records(self, query: Query) -> Iterator[dict]:
+        """
+        Задачи по запросу. Каждый шард отдает свои первые
+        `offset + limit` задач в нужном порядке, они сливаются.
+        """
+        end = None if query.limit is None else query.offset + query.limit
+        shard_query = replace(query, offset=0, limit=end)
+        if query.sort is None:
+            # Ранги поиска у каждого шарда свои, общий порядок - по ID
+            shard_query = replace(shard_query, sort="id", descending=False)
+        key = sort_key(shard_query, None)
+        merged = heapq.merge(*(shard.query_records(shard_query) for shard in self.shards),
+                             key=key, reverse=shard_query.descending)
+        return itertools.islice(merged, query.offset, end)
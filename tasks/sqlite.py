@@ -0,0 +1,382 @@
+import os
+import sqlite3
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from settings import settings
+from tasks.db import TaskManagerI
+from tasks.models import Task
+from tasks.indexes import tokenize
+from tasks.query import PRIORITY_ORDER, Query
+from utils.formats import read_records
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    category TEXT NOT NULL,
+    deadline TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    status INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks (deadline);
+-- Слова задачи для поиска, по одной строке на задачу (rowid = id).
+-- Слова режет `tokenize`, как в остальных хранилищах, FTS5 только
+-- делит готовую строку по пробелам
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    words, tokenize = "unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, words)
+    VALUES (new.id, py_words(new.title, new.description, new.category));
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    DELETE FROM tasks_fts WHERE rowid = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+AFTER UPDATE OF title, description, category ON tasks BEGIN
+    UPDATE tasks_fts SET words = py_words(new.title, new.description, new.category)
+    WHERE rowid = new.id;
+END;
+"""
+# user_version: 1 - перенос из JSON уже был, 2 - таблица поиска заполнена
+SCHEMA_VERSION = 2
+
+FIELDS = ("id", "title", "description", "category",
+          "deadline", "priority", "status")
+EDITABLE = set(FIELDS) - {"id"}
+
+
+def task_words(title: str, description: str, category: str) -> str:
+    """Слова задачи для таблицы поиска через пробел."""
+    return " ".join(tokenize(f"{title} {description} {category}"))
+
+
+def fts_query(text: str) -> str | None:
+    """
+    Запрос FTS5: все слова запроса как начала слов задачи.
+    :return: `None`, если в запросе нет слов - такой запрос
+    не находит ничего, как и в остальных хранилищах.
+    """
+    prefixes = sorted(set(tokenize(text)))
+    if not prefixes:
+        return None
+    return " AND ".join('"{}"*'.format(prefix.replace('"', '""')) for prefix in prefixes)
+
+
+def row_to_task(row: sqlite3.Row) -> Task:
+    """Превратить строку таблицы в задачу."""
+    task_map = dict(row)
+    task_map["status"] = bool(task_map["status"])
+    return Task.from_dict(task_map)
+
+
+class TaskManagerSQLite(TaskManagerI):
+    """
+    Менеджер задач в SQLite.
+    Выборки по категории, статусу и срокам идут по индексам,
+    задачи не загружаются в память целиком.
+    """
+    def __init__(self, path: str | None = None, json_path: str | None = None):
+        """
+        :param path: Путь к файлу БД.
+        :param json_path: Файл JSON, из которого задачи переносятся
+        один раз, при первом открытии БД.
+        """
+        self.path = path or settings.path_sqlite
+        # Запросы могут идти из другого потока (`asyncio.to_thread`
+        # в напоминаниях); модуль `sqlite3` сам сериализует обращения
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # Нужна триггерам таблицы поиска
+        self.conn.create_function("py_words", 3, task_words, deterministic=True)
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            json_path = json_path or settings.path_db
+            if os.path.exists(json_path):
+                self.migrate_from_json(json_path)
+        if version < SCHEMA_VERSION:
+            # Задачи, записанные до появления таблицы поиска
+            self.rebuild_search()
+            with self.conn:
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def rebuild_search(self) -> None:
+        """Заполнить таблицу поиска заново по всем задачам."""
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks_fts")
+            self.conn.execute(
+                "INSERT INTO tasks_fts (rowid, words) "
+                "SELECT id, py_words(title, description, category) FROM tasks"
+            )
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Перенести задачи из файла задач (JSON или другой
+        формат из `utils.formats`), ID сохраняются.
+        :return: Сколько задач перенесено.
+        """
+        all_tasks = list(read_records(json_path))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks "
+                "(id, title, description, category, deadline, priority, status) "
+                "VALUES (:id, :title, :description, :category, "
+                ":deadline, :priority, :status)",
+                all_tasks
+            )
+        return len(all_tasks)
+
+    def find_by_id(self, all_tasks: list[dict], task_id: int) -> int | None:
+        """
+        Находит задачу по ID.
+        :return: Либо индекс задачи в `all_tasks`, либо `None`.
+        """
+        for idx, task_map in enumerate(all_tasks):
+            if task_map.get("id") == task_id:
+                return idx
+        return None
+
+    def get_task(self, task_id: int) -> Task | None:
+        """Достать одну задачу по ID."""
+        row = self.conn.execute(
+            "SELECT * FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return row_to_task(row) if row is not None else None
+
+    def add_task(self, task: Task) -> None:
+        """Добавить задачу, ID выдает SQLite."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO tasks "
+                "(title, description, category, deadline, priority, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (task.title, task.description, task.category,
+                 task.deadline, task.priority, task.status)
+            )
+        task.id = cursor.lastrowid
+
+    def edit_task(self, task: Task, key: str, editable: str) -> None:
+        """Изменить поле задачи."""
+        if key not in EDITABLE:
+            raise ValueError(f"Нельзя изменить поле {key}")
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE tasks SET {key} = ? WHERE id = ?", (editable, task.id)
+            )
+
+    def remove_task(self, task_id: int) -> None:
+        """Удалить задачу по ID."""
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def add_tasks(self, tasks: Iterable[Task]) -> int:
+        """Добавить много задач одной транзакцией, ID выдает SQLite."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT INTO tasks "
+                "(title, description, category, deadline, priority, status) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((task.title, task.description, task.category,
+                  task.deadline, task.priority, task.status) for task in tasks)
+            )
+        return cursor.rowcount
+
+    def remove_tasks(self, task_ids: Iterable[int]) -> int:
+        """Удалить много задач одной транзакцией."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "DELETE FROM tasks WHERE id = ?",
+                ((task_id,) for task_id in set(task_ids))
+            )
+        return cursor.rowcount
+
+    def update_tasks(self, changes: dict[int, dict]) -> int:
+        """
+        Изменить поля у многих задач одной транзакцией.
+        :param changes: ID задачи -> {поле: новое значение}.
+        :return: Сколько задач найдено и изменено.
+        """
+        updated = 0
+        with self.conn:
+            for task_id, fields in changes.items():
+                for key in fields:
+                    if key not in EDITABLE:
+                        raise ValueError(f"Нельзя изменить поле {key}")
+                if not fields:
+                    continue
+                assignments = ", ".join(f"{key} = ?" for key in fields)
+                cursor = self.conn.execute(
+                    f"UPDATE tasks SET {assignments} WHERE id = ?",
+                    (*fields.values(), task_id)
+                )
+                updated += cursor.rowcount
+        return updated
+
+    def complete_task(self, task: Task) -> None:
+        """Отметить задачу как выполненную."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET status = 1 WHERE id = ?", (task.id,)
+            )
+
+    def incomplete_task(self, task: Task) -> None:
+        """Отметить задачу как невыполненную."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE tasks SET status = 0 WHERE id = ?", (task.id,)
+            )
+
+    def get_tasks(self) -> list[Task]:
+        """Вывести список задач."""
+        rows = self.conn.execute("SELECT * FROM tasks ORDER BY id")
+        return [row_to_task(row) for row in rows]
+
+    def iter_records(self) -> Iterator[dict]:
+        """Перебрать задачи по одной в виде словарей."""
+        for row in self.conn.execute("SELECT * FROM tasks ORDER BY id"):
+            task_map = dict(row)
+            task_map["status"] = bool(task_map["status"])
+            yield task_map
+
+    def get_page(
+            self,
+            offset: int,
+            limit: int,
+            filters: dict | None = None
+    ) -> list[Task]:
+        """
+        Достать одну страницу задач по порядку ID.
+        :param filters: Поле задачи -> нужное значение.
+        """
+        where, params = "", []
+        if filters:
+            for key in filters:
+                if key not in FIELDS:
+                    raise ValueError(f"Нет такого поля: {key}")
+            where = "WHERE " + " AND ".join(f"{key} = ?" for key in filters)
+            params = list(filters.values())
+        rows = self.conn.execute(
+            f"SELECT * FROM tasks {where} ORDER BY id LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        )
+        return [row_to_task(row) for row in rows]
+
+    def get_cats(self) -> dict[str, list[Task]]:
+        """Сгруппировать задачи по категориям."""
+        cat_with_task = defaultdict(list)
+        rows = self.conn.execute(
+            "SELECT * FROM tasks INDEXED BY idx_tasks_category "
+            "ORDER BY category, id"
+        )
+        for row in rows:
+            cat_with_task[row["category"]].append(row_to_task(row))
+        return cat_with_task
+
+    def get_cat_counts(self) -> dict[str, dict[str, int]]:
+        """Категория -> сколько задач всего, выполнено и не выполнено."""
+        rows = self.conn.execute(
+            "SELECT category, COUNT(*), SUM(status) FROM tasks "
+            "INDEXED BY idx_tasks_category GROUP BY category ORDER BY MIN(id)"
+        )
+        return {
+            category: {"total": total, "done": done, "pending": total - done}
+            for category, total, done in rows
+        }
+
+    def get_incompleted(self) -> list[Task]:
+        """Получить список с не выполненными задачами."""
+        rows = self.conn.execute(
+            "SELECT * FROM tasks WHERE status = 0 ORDER BY id"
+        )
+        return [row_to_task(row) for row in rows]
+
+    def get_urgent(self, within: timedelta | None = None) -> list[Task]:
+        """
+        Просроченные и срочные невыполненные задачи по порядку сроков.
+        Сроки в `isoformat` сравниваются как строки, поэтому выборка
+        идет по индексу `idx_tasks_deadline`.
+        """
+        if within is None:
+            within = timedelta(hours=settings.sos_hours)
+        moment = (datetime.now() + within).isoformat()
+        rows = self.conn.execute(
+            "SELECT * FROM tasks INDEXED BY idx_tasks_deadline "
+            "WHERE deadline < ? AND status = 0 ORDER BY deadline, id",
+            (moment,)
+        )
+        return [row_to_task(row) for row in rows]
+
+    def find_to_entry_title(self, entry_str: str) -> list[Task]:
+        """
+        Полнотекстовый поиск по названию, описанию и категории
+        через таблицу FTS5: слова запроса - начала слов задачи.
+        """
+        if not entry_str:
+            return self.get_tasks()
+        return self.query(Query(text=entry_str))
+
+    def query_records(self, query: Query) -> Iterator[dict]:
+        """
+        Задачи по запросу одним SQL-запросом: фильтры, сортировка
+        и страница считаются в SQLite, индекс выбирает планировщик БД.
+        Текст ищется по таблице FTS5, результаты идут по порядку ID.
+        """
+        conditions, params = [], []
+        if query.status is not None:
+            conditions.append("status = ?")
+            params.append(int(query.status))
+        if query.category is not None:
+            conditions.append("category = ?")
+            params.append(query.category)
+        if query.priority is not None:
+            conditions.append("priority = ?")
+            params.append(query.priority)
+        # Сроки в `isoformat` сравниваются как строки
+        if query.deadline_from is not None:
+            conditions.append("deadline >= ?")
+            params.append(query.deadline_from.isoformat())
+        if query.deadline_to is not None:
+            conditions.append("deadline < ?")
+            params.append(query.deadline_to.isoformat())
+        if query.text:
+            match = fts_query(query.text)
+            if match is None:
+                return
+            conditions.append("id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+            params.append(match)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+        direction = " DESC" if query.descending else ""
+        if query.sort == "deadline":
+            order = f"deadline{direction}, id{direction}"
+        elif query.sort == "priority":
+            cases = " ".join(f"WHEN ? THEN {rank}" for rank in PRIORITY_ORDER.values())
+            order = (f"CASE priority {cases} ELSE {len(PRIORITY_ORDER)} END{direction}, "
+                     f"id{direction}")
+            params.extend(PRIORITY_ORDER)
+        else:
+            order = f"id{direction}" if query.sort == "id" else "id"
+
+        # LIMIT -1 - без ограничения
+        limit = -1 if query.limit is None else query.limit
+        rows = self.conn.execute(
+            f"SELECT * FROM tasks {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            (*params, limit, query.offset)
+        )
+        for row in rows:
+            task_map = dict(row)
+            task_map["status"] = bool(task_map["status"])
+            yield task_map
+
+    def close(self) -> None:
+        """Закрыть соединение с БД."""
+        self.conn.close()
@@ -0,0 +1,172 @@
+import csv
+import os
+import sys
+from dataclasses import fields
+from typing import Callable, Iterable, Iterator
+
+from tasks.db import TaskManagerI
+from tasks.models import Task
+from utils.fileio import atomic_write
+from utils.formats import FORMATS
+
+
+TASK_FIELDS = [field.name for field in fields(Task)]
+TRANSFER_FORMATS = ("jsonl", "csv")
+# Через сколько задач сообщать о прогрессе
+PROGRESS_EVERY = 10000
+STATUS_TRUE = {"true", "1", "да", "yes"}
+STATUS_FALSE = {"false", "0", "нет", "no", ""}
+
+
+def guess_format(path: str) -> str:
+    """Формат обмена по расширению файла: `.csv` или JSON Lines."""
+    return "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+
+
+def parse_status(value: bool | str) -> bool:
+    """Статус задачи из JSON или из текста ячейки CSV."""
+    if isinstance(value, bool):
+        return value
+    status = str(value).strip().casefold()
+    if status in STATUS_TRUE:
+        return True
+    if status in STATUS_FALSE:
+        return False
+    raise ValueError(f"Непонятный статус задачи: {value}")
+
+
+def record_to_task(record: dict, num: int) -> Task:
+    """
+    Задача из записи импорта. ID из файла не переносится,
+    новый выдает хранилище.
+    :param num: Номер записи, чтобы было понятно, где ошибка.
+    """
+    try:
+        return Task(
+            title=record["title"],
+            description=record.get("description") or "",
+            category=record["category"],
+            deadline=record["deadline"],
+            priority=record.get("priority") or "",
+            status=parse_status(record.get("status", False)),
+        )
+    except KeyError as error:
+        raise ValueError(f"Запись {num}: нет поля {error.args[0]}") from None
+    except ValueError as error:
+        raise ValueError(f"Запись {num}: {error}") from None
+
+
+def read_csv(path: str) -> Iterator[dict]:
+    """Перебрать строки CSV с заголовком по одной."""
+    # utf-8-sig - на случай файла из Excel с BOM
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        yield from csv.DictReader(file)
+
+
+def write_csv(path: str, records: Iterable[dict]) -> None:
+    """Записать задачи в CSV с заголовком."""
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=TASK_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def with_progress(
+        items: Iterable,
+        progress: Callable[[int], None] | None,
+        every: int = PROGRESS_EVERY
+) -> Iterator:
+    """Пропустить поток через себя, сообщая, сколько уже прошло."""
+    count = 0
+    for item in items:
+        yield item
+        count += 1
+        if progress is not None and count % every == 0:
+            progress(count)
+    if progress is not None and (count % every or not count):
+        progress(count)
+
+
+def iter_import(path: str, format_name: str | None = None) -> Iterator[Task]:
+    """Перебрать задачи из файла импорта по одной."""
+    format_name = format_name or guess_format(path)
+    if format_name == "csv":
+        records = read_csv(path)
+    elif format_name == "jsonl":
+        records = FORMATS["jsonl"].iter_records(path)
+    else:
+        raise ValueError(f"Неизвестный формат обмена: {format_name}")
+    for num, record in enumerate(records, start=1):
+        yield record_to_task(record, num)
+
+
+def import_tasks(
+        manager: TaskManagerI,
+        path: str,
+        format_name: str | None = None,
+        progress: Callable[[int], None] | None = None
+) -> int:
+    """
+    Импортировать задачи из JSON Lines или CSV.
+    Файл читается потоком и уходит в `add_tasks` одной пачкой.
+    :param format_name: "jsonl" или "csv", по умолчанию по расширению.
+    :param progress: Вызывается с числом обработанных задач.
+    :return: Сколько задач добавлено.
+    """
+    return manager.add_tasks(with_progress(iter_import(path, format_name), progress))
+
+
+def export_tasks(
+        manager: TaskManagerI,
+        path: str,
+        format_name: str | None = None,
+        progress: Callable[[int], None] | None = None
+) -> int:
+    """
+    Выгрузить все задачи в JSON Lines или CSV.
+    Задачи пишутся потоком, файл заменяется атомарно.
+    :return: Сколько задач выгружено.
+    """
+    format_name = format_name or guess_format(path)
+    if format_name == "csv":
+        write = write_csv
+    elif format_name == "jsonl":
+        write = FORMATS["jsonl"].write
+    else:
+        raise ValueError(f"Неизвестный формат обмена: {format_name}")
+
+    count = 0
+
+    def counted(records: Iterable[dict]) -> Iterator[dict]:
+        nonlocal count
+        for record in with_progress(records, progress):
+            count += 1
+            yield record
+
+    atomic_write(path, lambda tmp_path: write(tmp_path, counted(manager.iter_records())))
+    return count
+
+
+def print_progress(count: int) -> None:
+    """Показать прогресс в stderr, не мешая выводу в stdout."""
+    print(f"\rОбработано задач: {count}", end="", file=sys.stderr, flush=True)
+
+
+if __name__ == '__main__':
+    # python -m tasks.transfer import tasks.csv
+    # python -m tasks.transfer export tasks.jsonl
+    import argparse
+
+    from tasks.db import make_manager
+
+    parser = argparse.ArgumentParser(description="Импорт и экспорт задач")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=TRANSFER_FORMATS)
+    args = parser.parse_args()
+
+    task_manager = make_manager()
+    action = import_tasks if args.command == "import" else export_tasks
+    total = action(task_manager, args.path, args.format, print_progress)
+    print(file=sys.stderr)
+    print(f"{'Импортировано' if args.command == 'import' else 'Выгружено'} задач: {total}")
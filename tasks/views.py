@@ -1,32 +1,48 @@
-from typing import Callable
+from dataclasses import replace
+from functools import cached_property
+from typing import Callable, Iterator
 from datetime import datetime, timedelta
-import math
-import re
+import itertools
 
 from rich.console import Group, Console
 from rich.padding import Padding
-from rich.prompt import Prompt
+from rich.panel import Panel
 from rich.style import Style
 from rich.text import Text
 
 from settings import settings
-from tasks.db import TaskManagerJSON
+from tasks.db import TaskManagerI, make_manager
 from tasks.models import Task
+from tasks.query import SORT_FIELDS, Query
 from utils import const
 from utils.funcs import make_panel, choices_options
+from utils.render import RenderCache, Screen
+from utils.terms import deadline_from_term, parse_term
 
 
 class TaskCLI:
     def __init__(self):
         self.console = Console()
-        self.manager = TaskManagerJSON()
+        self.screen = Screen(self.console)
+        # Готовые строки задач в списках, см. `abb_repr_task`
+        self.render_cache = RenderCache()
         self.limited = settings.limited
         self.options = {
             # "0": self.back,
             "102": ("Разбить на категории", self.present_cats),
-            "103": ("Показать только не выполненные", self.present_not_comple)
+            "103": ("Показать только не выполненные", self.present_not_comple),
+            "104": ("Срочные задачи", self.present_urgent),
+            "105": ("Фильтры и сортировка", self.present_query),
         }
 
+    @cached_property
+    def manager(self) -> TaskManagerI:
+        """
+        Хранилище открывается при первом обращении, а не при запуске:
+        журналу и SQLite при открытии нужно прочитать данные.
+        """
+        return make_manager()
+
     def get_tasks(self) -> None:
         """
         Показать все задачи, с разбиением на страницы
@@ -36,10 +52,10 @@ class TaskCLI:
         :return:
         """
         while True:
-            self.console.clear()
             # Информационная панель
-            tasks = self.manager.get_tasks()
-            choice = self.repr_tasks(tasks=tasks, title="Список всех задач")
+            choice = self.repr_tasks(
+                tasks=self.manager.get_page, title="Список всех задач"
+            )
             t_option = self.options.get(choice)
             if choice == "":
                 return
@@ -47,53 +63,60 @@ class TaskCLI:
                 title, option = t_option
                 option()
 
-    def paginate(self, tasks: list) -> iter:
+    def paginate(
+            self,
+            fetch_page: Callable[[int, int], list[Task]]
+    ) -> Iterator[list[Task]]:
         """
         Генератор для постраничного разбиения задач.
+        Каждая страница запрашивается у `fetch_page(offset, limit)`
+        только тогда, когда до нее дошли.
 
         :return: Генератор списков с задачами.
         """
-        if not tasks or self.limited <= 0:
-            yield []  # Возвращаем пустую страницу, если задач нет или ограничение некорректно
+        if self.limited <= 0:
+            yield []  # Возвращаем пустую страницу, если ограничение некорректно
             return
 
-        count_pages = math.ceil(len(tasks) / self.limited)
-        for page in range(count_pages):
-            start = page * self.limited
-            end = start + self.limited
-            yield tasks[start:end]
+        offset = 0
+        while True:
+            page = fetch_page(offset, self.limited)
+            if not page:
+                if offset == 0:
+                    yield []  # Возвращаем пустую страницу, если задач нет
+                return
+            yield page
+            if len(page) < self.limited:
+                return
+            offset += self.limited
 
 
-    def abb_repr_task(self, num: int, task: Task) -> Group:
+    def abb_repr_task(self, num: int, task: Task) -> Padding:
         """
-        Генерирует сокращенное отображение для задачи.
-        :param num:
-        :param task:
-        :return:
+        Сокращенное отображение задачи в списке.
+        Берется из `render_cache`, пока номер, видимые поля задачи
+        и метка SOS не поменялись.
+        :param num: Номер задачи на странице.
+        :param task: Задача.
         """
         # sos - это маркер, который
         # оповещает о том, что время либо истекло,
-        # либо осталось 7 часов до истечения.
-
-        sos = Text(
-            "SOS",
-            style=Style(
-                bgcolor="red"
-            )
+        # либо осталось `settings.sos_hours` часов до истечения.
+        sos = task.timing() < timedelta(hours=settings.sos_hours)
+        key = (num, task.title, task.status, task.priority, sos)
+        return self.render_cache.get(
+            task.id, key, lambda: Padding(self.build_abb_task(num, task, sos), pad=(1, 1))
         )
 
+    @staticmethod
+    def build_abb_task(num: int, task: Task, sos: bool) -> Group:
+        """Собрать сокращенное отображение задачи."""
         title = Text.assemble(
             (f"{num}) ", "dark_blue"),
             (f"{task.title} ", "blue3"),
-            style=Style(
-
-            )
         )
-        if task.timing() < timedelta(hours=7):
-            title.append(
-                sos
-            )
-
+        if sos:
+            title.append(Text("SOS", style=Style(bgcolor="red")))
 
         row1 = Text.assemble(
             ("ID:", "bold bright_black"),
@@ -106,13 +129,7 @@ class TaskCLI:
             ("Приоритет: ", "bold bright_black"),
             (f"{task.priority}", "white")
         )
-
-        task = Group(
-            title,
-            row1,
-            row2
-        )
-        return task
+        return Group(title, row1, row2)
 
     def delete_task(self, task: Task) -> None:
         """ Отображение для удаления определенных задач."""
@@ -137,17 +154,26 @@ class TaskCLI:
 
     def repr_tasks(
             self,
-            tasks: list[Task],
+            tasks: list[Task] | Callable[[int, int], list[Task]],
             title: str
     ) -> str | None:
         """
         Нормализирует показ списков.
 
-        :param tasks: Список задач.
+        :param tasks: Список задач или функция `(offset, limit)`,
+        которая отдает одну страницу, например `manager.get_page`.
         :param title: Особенности списка задач
         :return: Либо `choice`, либо `None`.
         """
-        if not tasks:
+        if callable(tasks):
+            fetch_page = tasks
+        else:
+            def fetch_page(offset: int, limit: int) -> list[Task]:
+                return tasks[offset:offset + limit]
+
+        pages = self.paginate(fetch_page)
+        first_page = next(pages)
+        if not first_page:
             repr_result = make_panel(
                 Text(
                     "Задач пока нет!",
@@ -155,12 +181,12 @@ class TaskCLI:
                 ),
                 subtitle=False
             )
-            self.console.print(repr_result)
+            self.screen.draw(repr_result)
             choice = self.console.input(const.ENTER_TO_MENU)
             return choice
 
-        for page_num, page_tasks in enumerate(self.paginate(tasks), 1):
-            self.console.clear()
+        for page_num, page_tasks in enumerate(
+                itertools.chain([first_page], pages), 1):
             repr_result = [] # noqa
             task_map = dict()
 
@@ -169,40 +195,17 @@ class TaskCLI:
             )
 
             for num, task in enumerate(page_tasks, 1):
-                group = self.abb_repr_task(num, task)
-                repr_result.append(
-                    Padding(
-                        group,
-                        pad=(1, 1),
-                    )
-                )
+                repr_result.append(self.abb_repr_task(num, task))
                 task_map[str(num)] = task
 
             repr_result.append(
                 Text(f"Страница: {page_num}"),
             )
 
-            group_choices = choices_options(self.options)
-            repr_result.append(
-                make_panel(
-                    Text.assemble(
-                        ("\"\".  ", "bold bright_black"),
-                        ("Оставьте пустым, чтобы выйти", "white")
-                    ),
-                    Text.assemble(
-                        (f"1-{self.limited}. ", "bold bright_black"),
-                        ("Напишите номер задачи", "white")
-                    ),
-                    Text.assemble(
-                        ("11.  ", "bold bright_black"),
-                        "След. страница"
-                    ),
-                    *group_choices,
-                    subtitle=False
-                )
-            )
+            repr_result.append(self.options_panel)
 
-            self.console.print(
+            # Кадр перерисовывается по разнице с прошлым, без очистки экрана
+            self.screen.draw(
                 make_panel(
                     *repr_result,
                     title=title
@@ -216,14 +219,35 @@ class TaskCLI:
                 continue
             return choice
 
+    @cached_property
+    def options_panel(self) -> Panel:
+        """Панель с опциями под списком задач, она одна на все страницы."""
+        return make_panel(
+            Text.assemble(
+                ("\"\".  ", "bold bright_black"),
+                ("Оставьте пустым, чтобы выйти", "white")
+            ),
+            Text.assemble(
+                (f"1-{self.limited}. ", "bold bright_black"),
+                ("Напишите номер задачи", "white")
+            ),
+            Text.assemble(
+                ("11.  ", "bold bright_black"),
+                "След. страница"
+            ),
+            *choices_options(self.options),
+            subtitle=False
+        )
+
     def search_task(self) -> None:
         """
-        Отображения для поиска задач по вхождению подстрок
-        в название.
+        Отображения для поиска задач по словам из названия,
+        описания и категории.
         """
+        self.screen.clear()
         self.console.print(
             make_panel(
-                "Напишите строку которая может входить в название задачи.",
+                "Напишите слова из названия, описания или категории задачи.",
                 title="Поиск..."
             )
         )
@@ -234,23 +258,25 @@ class TaskCLI:
     def present_cats(self) -> None:
         """
         Отображения для категории.
-        Функция дает каждой категории код и список
-        всех задач для дальнейшего отображения.
+        Экран рисуется по счетчикам из индекса категорий,
+        задачи читаются только у выбранной категории и по страницам.
         """
         while True:
-            self.console.clear()
             repr_result = []
-            tasks_map = self.manager.get_cats()
+            counts = self.manager.get_cat_counts()
             cats_map = {}
-            for num, cat in enumerate(tasks_map.keys(), 1):
+            for num, (cat, cat_counts) in enumerate(counts.items(), 1):
                 cats_map[str(num)] = cat
                 repr_result.append(
                     Text.assemble(
                         (f"{num}) ", "bold bright_black"),
-                        f"{cat}"
+                        f"{cat} ",
+                        (f"(всего {cat_counts['total']}, "
+                         f"✅ {cat_counts['done']}, "
+                         f"❌ {cat_counts['pending']})", "bright_black")
                     )
                 )
-            self.console.print(
+            self.screen.draw(
                 make_panel(
                 Text(
                     "Выберите категорию:",
@@ -262,24 +288,105 @@ class TaskCLI:
             )
             choice = str(self.console.input())
             cat = cats_map.get(choice)
-            tasks = tasks_map.get(cat)
             if choice == "":
                 return
 
-            if tasks is not None:
-                self.repr_tasks(tasks, title=f"Категория \"{cat}\"")
+            if cat is not None:
+                self.repr_tasks(
+                    tasks=self.category_pages(cat),
+                    title=f"Категория \"{cat}\""
+                )
+
+    def category_pages(self, cat: str) -> Callable[[int, int], list[Task]]:
+        """Функция `(offset, limit)`, которая отдает страницу задач категории."""
+        def fetch_page(offset: int, limit: int) -> list[Task]:
+            return self.manager.get_page(offset, limit, {"category": cat})
+
+        return fetch_page
 
     def present_not_comple(self) -> None:
         """Показывает только не выполненные задачи"""
-        completed_tasks = self.manager.get_incompleted()
-        self.repr_tasks(tasks=completed_tasks, title="Задачи ждущие выполнения")
+        def fetch_page(offset: int, limit: int) -> list[Task]:
+            return self.manager.get_page(offset, limit, {"status": False})
+
+        self.repr_tasks(tasks=fetch_page, title="Задачи ждущие выполнения")
+
+    def present_urgent(self) -> None:
+        """
+        Показывает просроченные задачи и те, до срока которых
+        осталось меньше `settings.sos_hours` часов.
+        """
+        self.repr_tasks(
+            tasks=self.manager.get_urgent(),
+            title="Срочные задачи"
+        )
+
+    def present_query(self) -> None:
+        """
+        Показывает задачи по фильтрам и сортировке, которые
+        спрашивает у пользователя. Пустой ответ - без фильтра.
+        """
+        query = self.ask_query()
+        if query is None:
+            return
+
+        def fetch_page(offset: int, limit: int) -> list[Task]:
+            return self.manager.query(replace(query, offset=offset, limit=limit))
+
+        self.repr_tasks(tasks=fetch_page, title="Задачи по фильтрам")
+
+    def ask_query(self) -> Query | None:
+        """
+        Спросить фильтры и сортировку.
+        :return: Запрос или `None`, если срок введен неправильно.
+        """
+        from rich.prompt import Prompt
+
+        self.screen.clear()
+        self.console.print(
+            make_panel(
+                Text(
+                    "Чтобы не фильтровать по полю, оставьте его пустым",
+                    style=Style(color="bright_black")
+                ),
+                title="Фильтры и сортировка"
+            )
+        )
+        statuses = {"все": None, "не выполненные": False, "выполненные": True}
+        status = Prompt.ask("Статус", choices=list(statuses), default="все")
+        category = self.console.input("Категория: ")
+        priority = Prompt.ask(
+            "Приоритет", choices=["", "Высокий", "Средний", "Низкий"], default=""
+        )
+        due = self.console.input("Срок не позже чем через (h12 d2 m1): ")
+        text = self.console.input("Слова из названия, описания или категории: ")
+        sort = Prompt.ask(
+            "Сортировать по", choices=["", *SORT_FIELDS], default=""
+        )
+
+        deadline_to = None
+        if due:
+            term = parse_term(due)
+            if term is None:
+                self.console.print("[red]Неправильный формат![/red]")
+                self.console.input(const.ENTER_TO_MENU)
+                return None
+            deadline_to = datetime.now() + term
+        return Query(
+            status=statuses[status],
+            category=category or None,
+            priority=priority or None,
+            deadline_to=deadline_to,
+            text=text or None,
+            sort=sort or None,
+        )
 
     def add_task(self) -> None:
         """
         Добавить задачу.
         :return:
         """
-        self.console.clear()
+        self.screen.clear()
 
         self.console.print(
             make_panel(
@@ -306,13 +413,7 @@ class TaskCLI:
 
             deadline = self.term_input_normalize(const.TERM_HELP_TEXT)
 
-            priority = Prompt.ask(
-                Text.assemble(
-                    (const.PRIORITY_HELP_TEXT, "bold bright_black")
-                ),
-                choices=["Высокий", "Средний", "Низкий"],
-                default="Высокий"
-            )
+            priority = self.ask_priority()
 
             task = Task(
                 id=1,
@@ -329,13 +430,29 @@ class TaskCLI:
         self.manager.add_task(task=task)
         self.status_process("💾 Новая задача создана!", task)
 
+    def ask_priority(self) -> str:
+        """Спросить уровень важности задачи."""
+        # rich.prompt нужен только здесь, не грузим его при запуске
+        from rich.prompt import Prompt
+
+        return Prompt.ask(
+            Text.assemble(
+                (const.PRIORITY_HELP_TEXT, "bold bright_black")
+            ),
+            choices=["Высокий", "Средний", "Низкий"],
+            default="Высокий"
+        )
+
     def status_process(self, title: str, task: Task) -> None:
         """
         Сообщает о результате обработки данных.
         :param title: Сообщение, которое нужно вывести на экран.
         :param task: Обрабатываемая задача.
         """
-        self.console.clear()
+        # Сюда приходят все изменения задач: ее строку в списке
+        # нужно собрать заново
+        self.render_cache.invalidate(task.id)
+        self.screen.clear()
         self.console.print(
             make_panel(
                 Text.assemble((title, "bold chartreuse1")),
@@ -358,23 +475,14 @@ class TaskCLI:
                 )
             )
 
-            match_hours = re.compile(r"h(\d+)").search(user_input)
-            match_days = re.compile(r"d(\d+)").search(user_input)
-            match_months = re.compile(r"m(\d+)").search(user_input)
-
-            hours = int(match_hours.group(1)) if match_hours else 0
-            days = int(match_days.group(1)) if match_days else 0
-            months = int(match_months.group(1)) if match_months else 0
-            days += months * 30
+            deadline = deadline_from_term(user_input)
 
             if not user_input:
                 self.console.print("[red]Сроки не могут пустыми![/red]")
-            elif not match_hours and not match_days and not match_months:
+            elif deadline is None:
                 self.console.print("[red]Неправильный формат![/red]")
             else:
-                term = timedelta(hours=hours, days=days)
-                deadline = datetime.now() + term
-                return deadline.isoformat()
+                return deadline
 
     def input_and_valid(
             self,
@@ -420,7 +528,7 @@ class TaskCLI:
         :param options: Опции для задачи.
         :return:
         """
-        self.console.clear()
+        self.screen.clear()
         repr_result = [
             Text.assemble(prompt),
             task,
@@ -515,13 +623,7 @@ class TaskCLI:
 
     def change_priority(self, task: Task):
         """Процесс изменения приоритета"""
-        new_priority = Prompt.ask(
-                Text.assemble(
-                    (const.PRIORITY_HELP_TEXT, "bold bright_black")
-                ),
-                choices=["Высокий", "Средний", "Низкий"],
-                default="Высокий"
-            )
+        new_priority = self.ask_priority()
         self.manager.edit_task(task, key="priority", editable=new_priority)
         task.priority = new_priority
         self.status_process("Вы изменили проритет задачи!", task)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from tasks.db import TaskManagerJSON
+from tasks.models import Task
+
+
+def make_task(
+        title: str = "Задача",
+        category: str = "тесты",
+        term: timedelta = timedelta(0),
+        **fields
+) -> Task:
+    """
+    Задача для тестов со сроком через `term` от текущего момента.
+    :param fields: Остальные поля задачи, если нужны не по умолчанию.
+    """
+    values = {
+        "title": title,
+        "description": "Проверка",
+        "category": category,
+        "deadline": (datetime.now() + term).isoformat(),
+        "priority": "Высокий",
+        "status": False,
+    }
+    values.update(fields)
+    return Task(**values)
+
+
+def make_paths(directory: Path) -> dict[str, str]:
+    """Пустой файл задач и счетчик ID с нуля в каталоге `directory`."""
+    db_path = directory / "data.json"
+    db_path.write_text("[]", encoding="utf-8")
+    id_path = directory / "auto_increment_tasks.txt"
+    id_path.write_text("0", encoding="utf-8")
+    return {"path": str(db_path), "id_path": str(id_path)}
+
+
+@pytest.fixture(name="db_paths")
+def temp_db_paths(tmp_path) -> dict[str, str]:
+    return make_paths(tmp_path)
+
+
+@pytest.fixture(name="manager")
+def temp_manager(db_paths) -> TaskManagerJSON:
+    return TaskManagerJSON(**db_paths)
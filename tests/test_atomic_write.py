@@ -0,0 +1,157 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from settings import settings
+from tasks.db import TaskManagerJSON
+from utils.fileio import atomic_write_text, backup_path
+from utils.formats import JSONFormat
+from utils.manager_id import ManagerID
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORIGINAL = [{"id": 1, "title": "Старая", "description": "", "category": "тесты",
+             "deadline": "2024-12-07T02:06:44.339708", "priority": "Средний",
+             "status": False}]
+
+
+@pytest.fixture(name="db_path")
+def temp_db(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(ORIGINAL, ensure_ascii=False, indent=4), encoding="utf-8")
+    return str(path)
+
+
+def assert_intact(path: str) -> None:
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file) == ORIGINAL, "Файл задач не должен пострадать"
+    leftovers = [name for name in os.listdir(os.path.dirname(path))
+                 if name.endswith(".tmp")]
+    assert leftovers == [], "Временные файлы должны удаляться"
+
+
+@pytest.mark.parametrize("error", [RuntimeError("сбой"), KeyboardInterrupt()])
+def test_exception_mid_save(db_path, monkeypatch, error):
+    manager = TaskManagerJSON(path=db_path, id_path=db_path + ".incr")
+
+    def broken_write(self, path, records):
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('[{"id": ')
+        raise error
+
+    monkeypatch.setattr(JSONFormat, "write_all", broken_write)
+    with pytest.raises(type(error)):
+        manager.save_data(ORIGINAL * 2)
+    monkeypatch.undo()
+
+    assert_intact(db_path)
+    assert manager.load_data() == ORIGINAL
+
+
+def run_crashing_child(script: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(script)],
+        cwd=ROOT, capture_output=True, timeout=30
+    )
+
+
+def test_process_dies_mid_write(db_path):
+    result = run_crashing_child(f"""
+        import os
+        from utils.formats import FORMATS
+        from utils.fileio import atomic_write
+
+        def records():
+            for num in range(10000):
+                if num == 5000:
+                    os._exit(1)
+                yield {{"id": num, "title": "x" * 100}}
+
+        atomic_write({db_path!r}, lambda tmp: FORMATS["json"].write(tmp, records()))
+    """)
+    assert result.returncode == 1, result.stderr
+    with open(db_path, encoding="utf-8") as file:
+        assert json.load(file) == ORIGINAL
+
+
+@pytest.mark.skipif(os.name == "nt", reason="SIGKILL есть только в POSIX")
+def test_process_killed_mid_write(db_path):
+    result = run_crashing_child(f"""
+        import os, signal
+        from utils.formats import FORMATS
+        from utils.fileio import atomic_write
+
+        def records():
+            for num in range(10000):
+                if num == 5000:
+                    os.kill(os.getpid(), signal.SIGKILL)
+                yield {{"id": num, "title": "x" * 100}}
+
+        atomic_write({db_path!r}, lambda tmp: FORMATS["json"].write(tmp, records()))
+    """)
+    assert result.returncode == -signal.SIGKILL
+    with open(db_path, encoding="utf-8") as file:
+        assert json.load(file) == ORIGINAL
+
+
+def test_backups_ring(db_path):
+    for version in range(1, 5):
+        atomic_write_text(db_path, str(version), backups=2)
+
+    with open(db_path, encoding="utf-8") as file:
+        assert file.read() == "4"
+    with open(backup_path(db_path, 1), encoding="utf-8") as file:
+        assert file.read() == "3"
+    with open(backup_path(db_path, 2), encoding="utf-8") as file:
+        assert file.read() == "2"
+    assert not os.path.exists(backup_path(db_path, 3))
+
+
+def test_save_data_uses_backups(db_path, monkeypatch):
+    monkeypatch.setattr(settings, "backups", 1)
+    manager = TaskManagerJSON(path=db_path, id_path=db_path + ".incr")
+    manager.save_data([])
+
+    with open(backup_path(db_path, 1), encoding="utf-8") as file:
+        assert json.load(file) == ORIGINAL
+    assert manager.load_data() == []
+
+
+def test_manager_id_survives_crash(tmp_path, monkeypatch):
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    manager_id = ManagerID(id_path)
+    manager_id.update_id(41)
+
+    def crash(*args, **kwargs):
+        raise OSError("диск отвалился")
+
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        manager_id.update_id(42)
+    monkeypatch.undo()
+
+    assert manager_id.load_id() == 41
+
+
+def test_failed_save_keeps_indexes_in_sync(db_path, monkeypatch):
+    manager = TaskManagerJSON(path=db_path, id_path=db_path + ".incr")
+    task = manager.get_tasks()[0]
+    assert [found.id for found in manager.find_to_entry_title("старая")] == [1]
+
+    def broken_atomic_write(path, write, **kwargs):
+        raise OSError("диск переполнен")
+
+    monkeypatch.setattr("tasks.db.atomic_write", broken_atomic_write)
+    with pytest.raises(OSError):
+        manager.edit_task(task, "title", "Молоко")
+    monkeypatch.undo()
+
+    assert_intact(db_path)
+    # Несохраненное название не должно находиться
+    assert manager.find_to_entry_title("молоко") == []
+    assert [found.id for found in manager.find_to_entry_title("старая")] == [1]
@@ -0,0 +1,35 @@
+import json
+
+from benchmarks.bench_store import MIN_TIME_DELTA, compare, load_baselines
+
+BASELINE = {"time": 0.100, "peak": 10 * 2 ** 20}
+
+
+def test_no_baseline_is_not_a_regression():
+    assert compare({"time": 10.0, "peak": 2 ** 30}, None, 0.25) == []
+
+
+def test_within_threshold_passes():
+    assert compare({"time": 0.120, "peak": 12 * 2 ** 20}, BASELINE, 0.25) == []
+    # Быстрее и экономнее базового - тоже не регрессия
+    assert compare({"time": 0.050, "peak": 2 ** 20}, BASELINE, 0.25) == []
+
+
+def test_slower_and_bigger_are_flagged():
+    problems = compare({"time": 0.150, "peak": 20 * 2 ** 20}, BASELINE, 0.25)
+    assert len(problems) == 2
+    assert problems[0].startswith("время")
+    assert problems[1].startswith("память")
+
+
+def test_small_time_delta_is_noise():
+    baseline = {"time": 0.001, "peak": 2 ** 20}
+    result = {"time": 0.001 + MIN_TIME_DELTA / 2, "peak": 2 ** 20}
+    assert compare(result, baseline, 0.25) == []
+
+
+def test_load_baselines(tmp_path):
+    path = tmp_path / "baselines.json"
+    assert load_baselines(str(path)) == {}
+    path.write_text(json.dumps({"1000": {"load_data": BASELINE}}), encoding="utf-8")
+    assert load_baselines(str(path))["1000"]["load_data"] == BASELINE
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import cli
+from settings import settings
+
+
+@pytest.fixture(autouse=True)
+def temp_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "storage", "json")
+    monkeypatch.setattr(settings, "path_db", str(tmp_path / "data.json"))
+    monkeypatch.setattr(settings, "path_auto_incr", str(tmp_path / "auto_increment_tasks.txt"))
+
+
+def run(capsys, *argv: str) -> tuple[int, str]:
+    code = cli.main(list(argv))
+    return code, capsys.readouterr().out
+
+
+def test_add_list_done(capsys):
+    assert run(capsys, "add", "Купить хлеб", "--category", "Дом", "--deadline", "h3")[0] == 0
+    assert run(capsys, "add", "Отчет", "--category", "Работа", "--deadline", "d2")[0] == 0
+
+    code, out = run(capsys, "list", "--json")
+    tasks = json.loads(out)
+    assert [task["title"] for task in tasks] == ["Купить хлеб", "Отчет"]
+
+    assert run(capsys, "done", str(tasks[0]["id"]))[0] == 0
+    assert run(capsys, "done", "999")[0] == 1
+
+    code, out = run(capsys, "list", "--pending")
+    assert out.splitlines()[0].endswith("\tОтчет")
+    code, out = run(capsys, "--json", "list", "--done", "--limit", "5")
+    assert [task["title"] for task in json.loads(out)] == ["Купить хлеб"]
+
+
+def test_search_cats_stats(capsys):
+    run(capsys, "add", "Купить хлеб", "--category", "Дом", "--deadline", "h3")
+    run(capsys, "add", "Купить молоко", "--category", "Дом", "--deadline", "h3")
+
+    code, out = run(capsys, "search", "молок", "--json")
+    assert [task["title"] for task in json.loads(out)] == ["Купить молоко"]
+    code, out = run(capsys, "cats", "--json")
+    assert json.loads(out) == {"Дом": {"total": 2, "done": 0, "pending": 2}}
+    code, out = run(capsys, "stats", "--json")
+    assert json.loads(out) == {"total": 2, "done": 0, "pending": 2, "overdue": 0}
+
+
+def test_bad_deadline(capsys):
+    code = cli.main(["add", "Без срока", "--category", "Дом", "--deadline", "завтра"])
+    assert code == 2
+    assert "срока" in capsys.readouterr().err
+
+
+def test_list_query(capsys):
+    run(capsys, "add", "Купить хлеб", "--category", "Дом", "--deadline", "h3", "--priority", "Низкий")
+    run(capsys, "add", "Отчет", "--category", "Работа", "--deadline", "d2")
+    run(capsys, "add", "Купить молоко", "--category", "Дом", "--deadline", "h1")
+
+    code, out = run(capsys, "list", "--category", "Дом", "--sort", "deadline", "--json")
+    assert [task["title"] for task in json.loads(out)] == ["Купить молоко", "Купить хлеб"]
+    code, out = run(capsys, "list", "--due", "h5", "--sort", "priority", "--desc", "--json")
+    assert [task["title"] for task in json.loads(out)] == ["Купить хлеб", "Купить молоко"]
+    code, out = run(capsys, "list", "--search", "купить", "--priority", "Низкий", "--json")
+    assert [task["title"] for task in json.loads(out)] == ["Купить хлеб"]
+    assert cli.main(["list", "--due", "завтра"]) == 1
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tasks.columnar import TaskTable, numpy
+from tasks.models import Task
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(
+    numpy is None, reason="NumPy не установлен"))]
+
+
+def make_record(task_id: int, category: str, status: bool, hours: int) -> dict:
+    return {
+        "id": task_id,
+        "title": f"Задача {task_id}",
+        "description": "",
+        "category": category,
+        "deadline": (NOW + timedelta(hours=hours)).isoformat(),
+        "priority": "Высокий" if task_id % 2 else "Низкий",
+        "status": status,
+    }
+
+
+RECORDS = [
+    make_record(1, "Работа", False, -1),
+    make_record(2, "Работа", True, -5),
+    make_record(3, "Дом", False, 3),
+    make_record(4, "Дом", False, -2),
+]
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_aggregates(use_numpy):
+    table = TaskTable(use_numpy=use_numpy)
+    table.rebuild(RECORDS)
+
+    assert table.count_by_category() == {"Работа": 2, "Дом": 2}
+    assert table.count_by_priority() == {"Высокий": 2, "Низкий": 2}
+    assert table.count_by_status() == {"done": 1, "pending": 3}
+    assert table.overdue_ids(NOW) == [1, 4]
+    assert table.ids_in_category("Дом") == [3, 4]
+
+    table.remove(RECORDS[0])
+    table.add({**RECORDS[3], "status": True})
+    assert table.count_by_category() == {"Работа": 1, "Дом": 2}
+    assert table.overdue_ids(NOW) == []
+    table.compact()
+    assert table.ids_in_category("Дом") == [3, 4]
+    assert len(table) == 3
+
+
+def test_manager_keeps_table_in_sync(manager):
+    manager.add_tasks(Task.from_dict({**record, "id": None}) for record in RECORDS)
+    table = manager.get_table()
+    assert table.count_by_status() == {"done": 1, "pending": 3}
+
+    first = manager.get_tasks()[0]
+    manager.complete_task(first)
+    manager.remove_task(manager.get_tasks()[-1].id)
+    assert manager.get_table().count_by_status() == {"done": 2, "pending": 1}
+    assert manager.get_table().count_by_category() == {"Работа": 2, "Дом": 1}
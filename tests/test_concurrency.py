@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSES = 6
+TASKS_PER_PROCESS = 25
+
+WORKER = """
+    from datetime import datetime
+
+    from settings import settings
+    from tasks.db import TaskManagerJSON, TaskManagerJSONCached
+    from tasks.models import Task
+
+    settings.fsync = False
+    if {cached}:
+        manager = TaskManagerJSONCached(flush_every=4, flush_interval=0,
+                                        path={db_path!r}, id_path={id_path!r})
+    else:
+        manager = TaskManagerJSON(path={db_path!r}, id_path={id_path!r})
+
+    for num in range({count}):
+        manager.add_task(Task(
+            title="worker {worker} task " + str(num),
+            description="",
+            category="worker {worker}",
+            deadline=datetime.now().isoformat(),
+            priority="Низкий",
+            status=False,
+        ))
+    for task in manager.get_tasks():
+        if task.category == "worker {worker}" and task.title.endswith("0"):
+            manager.complete_task(task)
+"""
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["json", "json_cached"])
+def test_parallel_writers_lose_nothing(tmp_path, cached):
+    db_path = str(tmp_path / "data.json")
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    with open(db_path, "w", encoding="utf-8") as file:
+        file.write("[]")
+
+    processes = []
+    for worker in range(PROCESSES):
+        script = textwrap.dedent(WORKER).format(
+            cached=cached, db_path=db_path, id_path=id_path,
+            count=TASKS_PER_PROCESS, worker=worker
+        )
+        processes.append(subprocess.Popen(
+            [sys.executable, "-c", script], cwd=ROOT, stderr=subprocess.PIPE, text=True
+        ))
+    for process in processes:
+        _, err = process.communicate(timeout=120)
+        assert process.returncode == 0, err
+
+    with open(db_path, encoding="utf-8") as file:
+        all_tasks = json.load(file)
+
+    ids = [task["id"] for task in all_tasks]
+    assert len(all_tasks) == PROCESSES * TASKS_PER_PROCESS, "Ни одна задача не должна потеряться"
+    assert len(set(ids)) == len(ids), "ID не должны повторяться"
+    completed = [task for task in all_tasks if task["status"]]
+    assert len(completed) == PROCESSES * 3, "Все отметки о выполнении должны сохраниться"
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+import pytest
+
+from tasks.async_manager import TaskManagerAsync
+from tasks.db import TaskManagerJSON
+from tests.conftest import make_task
+
+
+@pytest.fixture(name="store")
+def temp_store(db_paths):
+    return TaskManagerJSON(**db_paths)
+
+
+@pytest.fixture(name="manager")
+def temp_manager(store):
+    manager = TaskManagerAsync(store)
+    yield manager
+    manager.close()
+
+
+def on_disk(store: TaskManagerJSON) -> list[dict]:
+    return store.load_data()
+
+
+def test_reads_do_not_wait_for_disk(manager, store):
+    gate = threading.Event()
+    manager.submit(gate.wait)
+
+    manager.add_task(make_task("Первая"))
+    manager.add_task(make_task("Вторая", "дом"))
+    assert [task.title for task in manager.get_tasks()] == ["Первая", "Вторая"]
+    assert manager.get_cat_counts()["дом"]["total"] == 1
+    assert manager.pending_writes == 3
+    assert on_disk(store) == []
+
+    gate.set()
+    manager.flush()
+    assert manager.pending_writes == 0
+    assert on_disk(store) == list(manager.iter_records())
+
+
+def test_writes_land_in_order(manager, store):
+    manager.add_task(make_task("Задача"))
+    task = manager.get_tasks()[0]
+    manager.edit_task(task, "title", "Изменена")
+    manager.complete_task(task)
+    manager.add_tasks([make_task(f"Пачка {num}") for num in range(3)])
+    ids = [task_map["id"] for task_map in manager.iter_records()]
+    manager.update_tasks({ids[1]: {"priority": "Низкий"}, ids[2]: {"status": True}})
+    manager.remove_tasks([ids[3]])
+    manager.remove_task(task.id)
+    manager.flush()
+
+    assert on_disk(store) == list(manager.iter_records())
+    assert [task_map["title"] for task_map in on_disk(store)] == ["Пачка 0", "Пачка 1"]
+    # Индексы файла остались верными
+    assert store.find_to_entry_title("пачка")[0].title == "Пачка 0"
+    # Заново открытое хранилище видит то же самое
+    assert TaskManagerAsync(store).get_tasks() == manager.get_tasks()
+
+
+def test_write_error_is_raised_on_flush(manager, store, monkeypatch):
+    def broken(task_dicts):
+        raise OSError("Диск заполнен")
+
+    monkeypatch.setattr(store, "add_records", broken)
+    manager.add_task(make_task("Не сохранится"))
+    with pytest.raises(OSError):
+        manager.flush()
+    # Память снова совпадает с диском
+    assert manager.get_tasks() == []
+    manager.flush()
+
+
+def test_menu_shows_write_error(manager, store, monkeypatch):
+    from menu import Menu
+
+    def broken(task_dicts):
+        raise OSError("Диск заполнен")
+
+    monkeypatch.setattr(store, "add_records", broken)
+    menu = Menu()
+    menu.task_cli.manager = manager
+
+    def add_task():
+        manager.add_task(make_task("Новая"))
+        # Запись успевает упасть до проверки после действия
+        manager.executor.submit(lambda: None).result()
+
+    menu.options["2"] = ("Добавить новую задачу", add_task)
+    menu.distribute("2")
+    assert "Диск заполнен" in menu.nav_comm.plain
+    assert manager.get_tasks() == []
+
+
+def test_asyncio(store):
+    async def scenario():
+        manager = await TaskManagerAsync.open(store)
+        manager.add_task(make_task("Из asyncio"))
+        await manager.drain()
+        manager.close()
+        return manager
+
+    manager = asyncio.run(scenario())
+    assert [task_map["title"] for task_map in on_disk(store)] == ["Из asyncio"]
+    assert manager.pending_writes == 0
@@ -0,0 +1,154 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from settings import settings
+from tasks.journal import TaskManagerJournal
+from tests.conftest import make_task
+
+
+@pytest.fixture(name="paths")
+def temp_paths(tmp_path):
+    id_path = tmp_path / "auto_increment_tasks.txt"
+    id_path.write_text("0", encoding="utf-8")
+    return {
+        "path": str(tmp_path / "journal.log"),
+        "snapshot_path": str(tmp_path / "snapshot.json"),
+        "id_path": str(id_path),
+        "json_path": str(tmp_path / "missing.json"),
+    }
+
+
+def test_replay_restores_state(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_task(make_task("Первая"))
+    manager.add_task(make_task("Вторая"))
+    first, second = manager.get_tasks()
+    manager.edit_task(first, "title", "Изменена")
+    manager.complete_task(first)
+    manager.remove_task(second.id)
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    tasks = restored.get_tasks()
+    assert len(tasks) == 1
+    assert tasks[0].title == "Изменена"
+    assert tasks[0].status is True
+
+
+def test_write_appends_one_line(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_task(make_task("Первая"))
+    manager.complete_task(manager.get_tasks()[0])
+
+    with open(paths["path"], encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+
+
+def test_compaction(paths):
+    manager = TaskManagerJournal(compact_after=3, **paths)
+    for num in range(4):
+        manager.add_task(make_task(f"Задача {num}"))
+
+    with open(paths["path"], encoding="utf-8") as file:
+        assert len(file.readlines()) == 1, "Журнал должен был свернуться"
+
+    restored = TaskManagerJournal(compact_after=3, **paths)
+    assert [task.title for task in restored.get_tasks()] == [
+        f"Задача {num}" for num in range(4)
+    ]
+
+
+def test_torn_last_line_is_ignored(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_task(make_task("Первая"))
+    with open(paths["path"], "a", encoding="utf-8") as file:
+        file.write('{"op": "remove", "i')
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    assert len(restored.get_tasks()) == 1
+    restored.add_task(make_task("Вторая"))
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    assert len(restored.get_tasks()) == 2
+
+
+def test_torn_line_that_parses_is_cut(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_task(make_task("Первая"))
+    task_id = manager.get_tasks()[0].id
+    # Запись оборвалась ровно перед переводом строки
+    with open(paths["path"], "a", encoding="utf-8") as file:
+        file.write(json.dumps({"op": "remove", "id": task_id}))
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    assert len(restored.get_tasks()) == 1
+    restored.add_task(make_task("Вторая"))
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    assert [task.title for task in restored.get_tasks()] == ["Первая", "Вторая"]
+
+
+def test_batch_operations(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    assert manager.add_tasks(make_task(f"Задача {num}") for num in range(4)) == 4
+    ids = [task.id for task in manager.get_tasks()]
+    assert manager.update_tasks({ids[0]: {"title": "Изменена"}, 999: {"title": "-"}}) == 1
+    assert manager.remove_tasks([ids[1], ids[2], 999]) == 2
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    assert [task.title for task in restored.get_tasks()] == ["Изменена", "Задача 3"]
+
+
+def test_get_urgent(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_tasks([make_task("Скоро"), make_task("Потом")])
+    soon, later = manager.get_tasks()
+    manager.edit_task(later, "deadline", (datetime.now() + timedelta(days=2)).isoformat())
+    assert manager.get_urgent() == [soon]
+
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    restored.complete_task(soon)
+    assert restored.get_urgent() == []
+
+
+def test_cat_counts(paths):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_tasks([make_task("Первая"), make_task("Вторая")])
+    first, second = manager.get_tasks()
+    manager.complete_task(first)
+    manager.edit_task(second, "category", "Дом")
+    expected = {"тесты": {"total": 1, "done": 1, "pending": 0},
+                "Дом": {"total": 1, "done": 0, "pending": 1}}
+    assert manager.get_cat_counts() == expected
+    assert TaskManagerJournal(compact_after=100, **paths).get_cat_counts() == expected
+
+
+def test_tasks_are_migrated_from_json(paths, tmp_path):
+    records = [dict(make_task(f"Старая {num}").to_dict(), id=num) for num in (3, 7)]
+    json_path = tmp_path / "data.json"
+    json_path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    paths["json_path"] = str(json_path)
+
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    assert [task.id for task in manager.get_tasks()] == [3, 7]
+    manager.remove_task(3)
+
+    # Снимок уже есть - файл JSON больше не читается
+    restored = TaskManagerJournal(compact_after=100, **paths)
+    assert [task.title for task in restored.get_tasks()] == ["Старая 7"]
+
+
+def test_appends_are_fsynced(paths, monkeypatch):
+    manager = TaskManagerJournal(compact_after=100, **paths)
+    manager.add_tasks([make_task("Первая"), make_task("Вторая")])
+    ids = [task.id for task in manager.get_tasks()]
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    manager.update_tasks({task_id: {"status": True} for task_id in ids})
+    assert len(synced) == 1, "Пачка сбрасывается на диск одним fsync"
+
+    monkeypatch.setattr(settings, "fsync", False)
+    manager.remove_task(ids[0])
+    assert len(synced) == 1
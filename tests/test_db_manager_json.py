@@ -2,25 +2,15 @@ from dataclasses import asdict
 from datetime import datetime
 
 import pytest
-import tempfile
 
 from tasks.models import Task
-from tasks.views import TaskManagerJSON
+from tasks.db import TaskManagerJSON
+from tests.conftest import make_paths
 
 
 @pytest.fixture(name="manager_json", scope="session")
-def temp_task_manager():
-    with tempfile.NamedTemporaryFile(delete=False, mode='w', encoding='utf-8') as temp_db_file:
-        temp_db_file.write("[]")
-        temp_db_file.flush()
-        manager = TaskManagerJSON()
-        manager.path = temp_db_file.name
-    with tempfile.NamedTemporaryFile(delete=False, mode='w', encoding='utf-8') as temp_id_file:
-        temp_id_file.write("0")
-        temp_id_file.flush()
-        manager.id_path = temp_id_file.name
-
-    yield manager
+def temp_task_manager(tmp_path_factory):
+    return TaskManagerJSON(**make_paths(tmp_path_factory.mktemp("json")))
 
 
 @pytest.fixture(name="tasks", scope="session")
@@ -168,3 +158,24 @@ def test_remove_task(manager_json: TaskManagerJSON, tasks):
     assert asdict(task2) not in tasks_in_db, "Задача должна быть удалена"
     assert len(tasks_in_db) == len(tasks)
 
+
+
+def test_get_page(manager_json: TaskManagerJSON, tasks):
+    assert manager_json.get_page(0, 6) == tasks
+    assert manager_json.get_page(1, 6) == []
+    assert manager_json.get_page(0, 6, {"status": True}) == []
+
+
+def test_batch_operations(manager_json: TaskManagerJSON, tasks):
+    new_tasks = [Task(**{**asdict(tasks[0]), "title": f"Пакет {num}"}) for num in range(3)]
+    assert manager_json.add_tasks(iter(new_tasks)) == 3
+    records = manager_json.load_data()
+    assert [task["title"] for task in records[-3:]] == ["Пакет 0", "Пакет 1", "Пакет 2"]
+    batch_ids = [task["id"] for task in records[-3:]]
+    assert len(set(batch_ids)) == 3
+    assert manager_json.find_to_entry_title("пакет")[0].id in batch_ids
+
+    assert manager_json.update_tasks({batch_ids[0]: {"status": True}}) == 1
+    assert manager_json.get_page(0, 6, {"status": True})[0].id == batch_ids[0]
+    assert manager_json.remove_tasks(batch_ids) == 3
+    assert manager_json.get_tasks() == tasks
@@ -0,0 +1,88 @@
+import gc
+import json
+import time
+
+import pytest
+
+from tasks import db
+from tasks.db import TaskManagerJSONCached
+from tests.conftest import make_task
+
+
+@pytest.fixture(name="manager_cached")
+def temp_cached_manager(db_paths):
+    manager = TaskManagerJSONCached(flush_every=3, flush_interval=0, **db_paths)
+    yield manager
+    manager.flush()
+
+
+def read_file(manager: TaskManagerJSONCached) -> list[dict]:
+    with open(manager.path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def test_changes_stay_in_memory(manager_cached):
+    manager_cached.add_task(make_task("Первая"))
+    manager_cached.add_task(make_task("Вторая"))
+
+    assert manager_cached.dirty, "Изменения должны ждать записи"
+    assert read_file(manager_cached) == [], "Файл не должен меняться до сброса"
+    assert len(manager_cached.get_tasks()) == 2
+
+
+def test_flush_after_n_changes(manager_cached):
+    for num in range(3):
+        manager_cached.add_task(make_task(f"Задача {num}"))
+
+    assert not manager_cached.dirty
+    assert len(read_file(manager_cached)) == 3
+
+
+def test_explicit_flush(manager_cached):
+    manager_cached.add_task(make_task("Первая"))
+    tasks = manager_cached.get_tasks()
+    manager_cached.complete_task(tasks[0])
+    manager_cached.flush()
+
+    tasks_in_file = read_file(manager_cached)
+    assert tasks_in_file[0]["status"] is True
+    assert not manager_cached.dirty
+
+
+def test_flush_by_timer(manager_cached):
+    manager_cached.flush_interval = 0.05
+    manager_cached.add_task(make_task("Первая"))
+    time.sleep(0.3)
+
+    assert len(read_file(manager_cached)) == 1, "Таймер должен был сбросить кэш"
+
+
+def test_batch_operations(manager_cached):
+    added = manager_cached.add_tasks(make_task(f"Задача {num}") for num in range(5))
+    assert added == 5
+    ids = [task.id for task in manager_cached.get_tasks()]
+
+    assert manager_cached.update_tasks({ids[0]: {"status": True}, 999: {}}) == 1
+    assert manager_cached.remove_tasks(ids[3:]) == 2
+    manager_cached.flush()
+
+    saved = read_file(manager_cached)
+    assert [task["id"] for task in saved] == ids[:3]
+    assert saved[0]["status"] is True
+
+
+def test_exit_flush_does_not_pin_instances(manager_cached):
+    assert manager_cached not in db._dirty
+    manager_cached.add_task(make_task("Первая"))
+    assert manager_cached in db._dirty
+
+    db.flush_all()
+    assert manager_cached not in db._dirty
+    assert [task["title"] for task in read_file(manager_cached)] == ["Первая"]
+
+    thrown = TaskManagerJSONCached(flush_every=3, flush_interval=0,
+                                   path=manager_cached.path, id_path=manager_cached.id_path)
+    thrown.add_task(make_task("Брошенная"))
+    del thrown
+    gc.collect()
+    assert not any(item.path == manager_cached.path for item in db._dirty)
@@ -0,0 +1,156 @@
+import json
+import os
+from datetime import timedelta
+
+import pytest
+
+from settings import settings
+from tasks.db import TaskManagerJSON
+from tasks.query import Query
+from tasks.sharded import TaskManagerSharded
+from tests.conftest import make_task
+
+
+@pytest.fixture(autouse=True)
+def temp_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "path_db", str(tmp_path / "data.json"))
+    monkeypatch.setattr(settings, "path_auto_incr", str(tmp_path / "auto_increment_tasks.txt"))
+    monkeypatch.setattr(settings, "path_shards", str(tmp_path / "shards"))
+
+
+@pytest.fixture(name="manager")
+def temp_manager():
+    manager = TaskManagerSharded(count=3)
+    manager.add_tasks([make_task(f"Задача {num}", f"кат{num % 2}") for num in range(7)])
+    return manager
+
+
+def shard_titles(manager: TaskManagerSharded) -> list[list[str]]:
+    return [[task_map["title"] for task_map in shard.load_data()] for shard in manager.shards]
+
+
+def test_tasks_spread_by_id(manager):
+    assert shard_titles(manager) == [
+        ["Задача 1", "Задача 4"], ["Задача 2", "Задача 5"], ["Задача 0", "Задача 3", "Задача 6"]
+    ]
+    assert [task.title for task in manager.get_tasks()] == [f"Задача {num}" for num in range(7)]
+    assert [task_map["id"] for task_map in manager.iter_records()] == list(range(2, 9))
+
+
+def test_edit_touches_only_its_shard(manager):
+    mtimes = [os.stat(shard.path).st_mtime_ns for shard in manager.shards]
+    task = manager.get_tasks()[0]
+    manager.edit_task(task, "title", "Изменена")
+    manager.complete_task(task)
+    assert [os.stat(shard.path).st_mtime_ns == mtime
+            for shard, mtime in zip(manager.shards, mtimes)] == [True, True, False]
+
+    manager.remove_task(manager.get_tasks()[-1].id)
+    assert manager.update_tasks({2: {"priority": "Низкий"}, 3: {"status": True}}) == 2
+    assert manager.remove_tasks([4, 5, 100]) == 2
+    assert [(task.title, task.status) for task in manager.get_tasks()] == [
+        ("Изменена", True), ("Задача 1", True), ("Задача 4", False), ("Задача 5", False)
+    ]
+    assert len(manager.get_incompleted()) == 2
+
+
+def test_parallel_load_matches_sequential(manager, monkeypatch):
+    sequential = manager.load_data()
+    monkeypatch.setattr(settings, "parallel_load_min_bytes", 0)
+    monkeypatch.setattr(settings, "shard_workers", 2)
+    assert manager.load_data() == sequential
+    pool = manager._pool
+    assert pool is not None
+    # Пул один на менеджер, отбор невыполненных идет в нем же
+    pending = [task.id for task in manager.get_incompleted()]
+    assert pending == [task_map["id"] for task_map in sequential]
+    assert manager._pool is pool
+
+    manager.close()
+    assert manager._pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(len, [])
+
+
+def test_aggregates(manager):
+    assert manager.get_cat_counts() == {
+        "кат0": {"total": 4, "done": 0, "pending": 4},
+        "кат1": {"total": 3, "done": 0, "pending": 3},
+    }
+    assert {cat: len(tasks) for cat, tasks in manager.get_cats().items()} == {"кат0": 4, "кат1": 3}
+    assert [task.title for task in manager.get_page(2, 3)] == ["Задача 2", "Задача 3", "Задача 4"]
+
+    manager.add_task(make_task("Скоро", term=timedelta(hours=1)))
+    manager.add_task(make_task("Сейчас", term=timedelta(minutes=1)))
+    urgent = manager.get_urgent(timedelta(hours=2))
+    assert [task.title for task in urgent[-2:]] == ["Сейчас", "Скоро"]
+
+
+def test_query_merges_shards(manager):
+    page = manager.query(Query(category="кат0", offset=1, limit=2))
+    assert [task.title for task in page] == ["Задача 2", "Задача 4"]
+    page = manager.query(Query(sort="id", descending=True, limit=3))
+    assert [task.id for task in page] == [8, 7, 6]
+    assert [task.title for task in manager.find_to_entry_title("задача")] == [
+        f"Задача {num}" for num in range(7)
+    ]
+    assert [task.id for task in manager.query(Query(text="задача", offset=2, limit=2))] == [4, 5]
+
+
+def test_migrate_and_reshard():
+    with open(settings.path_db, 'w', encoding='utf-8') as file:
+        json.dump([make_task(f"Старая {num}").to_dict() | {"id": num} for num in range(1, 6)], file)
+    manager = TaskManagerSharded(count=2)
+    assert [task.id for task in manager.get_tasks()] == [1, 2, 3, 4, 5]
+
+    # Файл JSON переносится только один раз
+    os.remove(settings.path_db)
+    manager = TaskManagerSharded(count=4)
+    assert [len(shard.load_data()) for shard in manager.shards] == [1, 2, 1, 1]
+    assert [task.id for task in manager.get_tasks()] == [1, 2, 3, 4, 5]
+
+    manager = TaskManagerSharded(count=1)
+    assert sorted(name for name in os.listdir(manager.directory)
+                  if name.endswith(".json")) == ["shard-1-000.json", "shards.json"]
+    assert [task.id for task in manager.get_tasks()] == [1, 2, 3, 4, 5]
+
+
+def test_reshard_survives_crash(manager, monkeypatch):
+    expected = manager.load_data()
+    save_data = TaskManagerJSON.save_data
+    saved = []
+
+    def crash_after_first(self, all_tasks):
+        if saved:
+            raise OSError("Процесс упал")
+        saved.append(self.path)
+        save_data(self, all_tasks)
+
+    monkeypatch.setattr(TaskManagerJSON, "save_data", crash_after_first)
+    with pytest.raises(OSError):
+        TaskManagerSharded(count=2)
+    monkeypatch.setattr(TaskManagerJSON, "save_data", save_data)
+
+    # Описание не переключилось - прежняя раскладка цела
+    assert TaskManagerSharded(count=3).load_data() == expected
+    assert not any(name.startswith("shard-2-") for name in os.listdir(manager.directory))
+    assert TaskManagerSharded(count=2).load_data() == expected
+
+
+def test_shards_stay_sorted_across_processes(manager):
+    # Другой процесс взял блок ID раньше, а дописывает позже:
+    # ID 10 попадает в шард после ID 109 (оба - шард 1)
+    other = TaskManagerSharded(count=3)
+    other.add_task(make_task("Чужая"))
+    manager.add_task(make_task("Своя"))
+    other.add_task(make_task("Чужая вторая"))
+
+    for shard in manager.shards:
+        ids = [task_map["id"] for task_map in shard.load_data()]
+        assert ids == sorted(ids)
+    ids = [task_map["id"] for task_map in manager.iter_records()]
+    assert ids == list(range(2, 11)) + [109]
+    assert [task.id for task in manager.get_page(7, 3)] == [9, 10, 109]
+    assert [task.id for task in manager.query(Query(category="тесты"))] == [9, 10, 109]
+    manager.edit_task(manager.get_tasks()[-2], "title", "Изменена")
+    assert [task.title for task in manager.get_tasks()[-2:]] == ["Изменена", "Своя"]
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from tasks.models import Task
+from tasks.sqlite import TaskManagerSQLite
+from tests.conftest import make_task
+
+
+@pytest.fixture(name="manager_sqlite")
+def temp_sqlite_manager(tmp_path):
+    manager = TaskManagerSQLite(
+        path=str(tmp_path / "tasks.sqlite3"),
+        json_path=str(tmp_path / "missing.json")
+    )
+    yield manager
+    manager.close()
+
+
+def test_add_and_edit(manager_sqlite):
+    task = make_task("Первая")
+    manager_sqlite.add_task(task)
+    manager_sqlite.edit_task(task, "title", "Изменена")
+    manager_sqlite.complete_task(task)
+
+    task_in_db = manager_sqlite.get_task(task.id)
+    assert task_in_db.title == "Изменена"
+    assert task_in_db.status is True
+
+
+def test_queries(manager_sqlite):
+    for num in range(5):
+        manager_sqlite.add_task(make_task(f"Задача {num}", f"кат{num % 2}"))
+    first = manager_sqlite.get_tasks()[0]
+    manager_sqlite.complete_task(first)
+    manager_sqlite.remove_task(manager_sqlite.get_tasks()[-1].id)
+
+    cats = manager_sqlite.get_cats()
+    assert {cat: len(tasks) for cat, tasks in cats.items()} == {"кат0": 2, "кат1": 2}
+    assert len(manager_sqlite.get_incompleted()) == 3
+    assert [task.title for task in manager_sqlite.get_page(1, 2)] == [
+        "Задача 1", "Задача 2"
+    ]
+    assert len(manager_sqlite.find_to_entry_title("ЗАДАЧА")) == 4
+
+
+def test_queries_use_indexes(manager_sqlite):
+    plan = manager_sqlite.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE status = 0"
+    ).fetchall()
+    assert "idx_tasks_status" in " ".join(row["detail"] for row in plan)
+
+
+def test_migration_from_json(tmp_path):
+    task = asdict(make_task("Из JSON"))
+    task["id"] = 7
+    json_path = tmp_path / "data.json"
+    json_path.write_text(json.dumps([task], ensure_ascii=False), encoding="utf-8")
+
+    manager = TaskManagerSQLite(
+        path=str(tmp_path / "tasks.sqlite3"), json_path=str(json_path)
+    )
+    assert manager.get_task(7) == Task(**task)
+    manager.close()
+
+    # Повторный запуск не переносит задачи второй раз
+    json_path.write_text("[]", encoding="utf-8")
+    manager = TaskManagerSQLite(
+        path=str(tmp_path / "tasks.sqlite3"), json_path=str(json_path)
+    )
+    assert len(manager.get_tasks()) == 1
+    manager.close()
+
+
+def test_batch_operations(manager_sqlite):
+    assert manager_sqlite.add_tasks(make_task(f"Задача {num}") for num in range(4)) == 4
+    ids = [task.id for task in manager_sqlite.get_tasks()]
+    assert manager_sqlite.update_tasks({ids[0]: {"status": True}, 999: {"status": True}}) == 1
+    assert manager_sqlite.remove_tasks([ids[1], ids[2], 999]) == 2
+
+    tasks = manager_sqlite.get_tasks()
+    assert [task.id for task in tasks] == [ids[0], ids[3]]
+    assert tasks[0].status is True
+    with pytest.raises(ValueError):
+        manager_sqlite.update_tasks({ids[0]: {"id": 5}})
+
+
+def test_get_urgent(manager_sqlite):
+    soon, later, done = make_task("Скоро"), make_task("Потом"), make_task("Сделано")
+    later.deadline = (datetime.now() + timedelta(days=2)).isoformat()
+    manager_sqlite.add_tasks([later, soon, done])
+    tasks = {task.title: task for task in manager_sqlite.get_tasks()}
+    manager_sqlite.complete_task(tasks["Сделано"])
+
+    assert manager_sqlite.get_urgent() == [tasks["Скоро"]]
+    assert [task.title for task in manager_sqlite.get_urgent(timedelta(days=3))] == [
+        "Скоро", "Потом"]
+
+
+def test_cat_counts(manager_sqlite):
+    manager_sqlite.add_tasks([make_task("Первая"), make_task("Вторая"),
+                              make_task("Третья", category="Дом")])
+    manager_sqlite.complete_task(manager_sqlite.get_tasks()[0])
+    assert manager_sqlite.get_cat_counts() == {
+        "тесты": {"total": 2, "done": 1, "pending": 1},
+        "Дом": {"total": 1, "done": 0, "pending": 1},
+    }
+
+
+def test_search_uses_fts(manager_sqlite):
+    manager_sqlite.add_tasks([make_task("Купить хлеб", "Дом"), make_task("Отчет", "Работа")])
+    task = manager_sqlite.get_tasks()[1]
+    manager_sqlite.edit_task(task, "description", "Ёлочные игрушки")
+
+    # Начала слов в названии, описании и категории, как в JSON
+    assert [task.title for task in manager_sqlite.find_to_entry_title("КУП хле")] == ["Купить хлеб"]
+    assert [task.title for task in manager_sqlite.find_to_entry_title("елоч раб")] == ["Отчет"]
+    assert manager_sqlite.find_to_entry_title("хлеб работа") == []
+    assert manager_sqlite.find_to_entry_title('"*') == []
+
+    manager_sqlite.remove_task(task.id)
+    assert manager_sqlite.find_to_entry_title("отчет") == []
+    plan = manager_sqlite.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'хлеб*'"
+    ).fetchall()
+    assert "VIRTUAL TABLE INDEX" in " ".join(row["detail"] for row in plan)
+
+
+def test_search_table_filled_for_old_db(tmp_path):
+    path = str(tmp_path / "tasks.sqlite3")
+    manager = TaskManagerSQLite(path=path, json_path=str(tmp_path / "missing.json"))
+    manager.add_task(make_task("Старая задача"))
+    manager.close()
+
+    # БД до появления таблицы поиска
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DROP TABLE tasks_fts")
+        conn.execute("PRAGMA user_version = 1")
+    conn.close()
+
+    manager = TaskManagerSQLite(path=path, json_path=str(tmp_path / "missing.json"))
+    assert [task.title for task in manager.find_to_entry_title("стар")] == ["Старая задача"]
+    manager.close()
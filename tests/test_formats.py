@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from settings import settings
+from tasks.db import TaskManagerJSON
+from utils.formats import FORMATS, convert, detect_format, pack, read_records, unpack
+
+
+RECORDS = [
+    {"id": 1, "title": "Купить ёлку", "description": "", "category": "Дом",
+     "deadline": "2024-12-07T02:06:44.339708", "priority": "Средний", "status": False},
+    {"id": 2 ** 40, "title": "я" * 300, "description": "x", "category": "Работа",
+     "deadline": "2024-12-05T09:23:54.828175", "priority": "Высокий", "status": True},
+]
+
+
+@pytest.mark.parametrize("name", sorted(FORMATS))
+def test_roundtrip_and_detection(tmp_path, name):
+    path = str(tmp_path / "data")
+    FORMATS[name].write(path, iter(RECORDS))
+
+    assert list(read_records(path)) == RECORDS
+    assert detect_format(path).iter_records(path) is not None
+
+
+def test_pack_unpack_values():
+    values = [None, True, False, 0, 127, 128, -1, -33, -2 ** 40, 2 ** 63,
+              1.5, "", "ж" * 40, list(range(20)), {str(num): num for num in range(20)}]
+    for value in values:
+        assert unpack(pack(value)) == (value, len(pack(value)))
+
+
+def test_convert(tmp_path):
+    src = tmp_path / "data.json"
+    src.write_text(json.dumps(RECORDS, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    assert convert(str(src), str(src), "binary") == 2
+    assert detect_format(str(src)) is FORMATS["binary"]
+    assert list(read_records(str(src))) == RECORDS
+
+
+def test_manager_uses_storage_format(tmp_path, monkeypatch):
+    src = tmp_path / "data.json"
+    src.write_text(json.dumps(RECORDS, ensure_ascii=False, indent=4), encoding="utf-8")
+    monkeypatch.setattr(settings, "storage_format", "jsonl")
+
+    manager = TaskManagerJSON(path=str(src), id_path=str(tmp_path / "auto_increment_tasks.txt"))
+    manager.complete_task(manager.get_tasks()[0])
+
+    assert detect_format(str(src)) is FORMATS["jsonl"]
+    assert all(task.status for task in manager.get_tasks())
@@ -0,0 +1,198 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from tasks.db import TaskManagerJSON
+from tasks.indexes import CategoryIndex, DeadlineIndex, IdIndex, SearchIndex
+
+
+def make_record(task_id: int, title: str) -> dict:
+    return {
+        "id": task_id,
+        "title": title,
+        "description": "Проверка индекса",
+        "category": "тесты",
+        "deadline": datetime.now().isoformat(),
+        "priority": "Высокий",
+        "status": False,
+    }
+
+
+@pytest.fixture(name="manager_unsorted")
+def temp_unsorted_manager(tmp_path):
+    db_path = tmp_path / "data.json"
+    records = [make_record(5, "Пять"), make_record(2, "Два"), make_record(9, "Девять")]
+    db_path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    id_path = tmp_path / "auto_increment_tasks.txt"
+    id_path.write_text("9", encoding="utf-8")
+
+    return TaskManagerJSON(path=str(db_path), id_path=str(id_path))
+
+
+def test_find_by_id_unsorted(manager_unsorted):
+    all_tasks = manager_unsorted.load_data()
+    for task_id in (5, 2, 9):
+        pos = manager_unsorted.find_by_id(all_tasks, task_id)
+        assert all_tasks[pos]["id"] == task_id
+    assert manager_unsorted.find_by_id(all_tasks, 100) is None
+
+
+def test_index_follows_mutations(manager_unsorted):
+    manager_unsorted.remove_task(5)
+    manager_unsorted.add_task(manager_unsorted.get_tasks()[0])
+    all_tasks = manager_unsorted.load_data()
+
+    assert [task["id"] for task in all_tasks] == [2, 9, 10]
+    assert manager_unsorted.find_by_id(all_tasks, 10) == 2
+    assert manager_unsorted.find_by_id(all_tasks, 5) is None
+
+
+def test_index_is_persisted(manager_unsorted):
+    manager_unsorted.rebuild_index()
+
+    index = IdIndex()
+    assert index.load(manager_unsorted.index_path)
+    assert index.positions == {5: 0, 2: 1, 9: 2}
+
+
+def test_saving_does_not_write_index(manager_unsorted):
+    manager_unsorted.remove_task(2)
+    assert not os.path.exists(manager_unsorted.index_path)
+    all_tasks = manager_unsorted.load_data()
+    assert manager_unsorted.find_by_id(all_tasks, 9) == 1
+
+
+def test_id_index_remove_is_incremental(monkeypatch):
+    monkeypatch.setattr(IdIndex, "COMPACT_AFTER", 2)
+    ids = list(range(10, 16))
+    index = IdIndex()
+    index.rebuild([{"id": task_id} for task_id in ids])
+    index.add(30, len(ids))
+    ids.append(30)
+    for task_id in (12, 30, 10, 13):
+        index.remove(task_id)
+        ids.remove(task_id)
+        assert {task_id: index.get(task_id) for task_id in ids} == {
+            task_id: pos for pos, task_id in enumerate(ids)
+        }
+    index.add(31, len(ids))
+    assert index.get(31) == 3 and index.get(12) is None
+    # Удалений больше, чем задач, - позиции пересчитаны
+    assert index.removed == [] and index.positions == {11: 0, 14: 1, 15: 2, 31: 3}
+
+
+def test_stale_index_is_rebuilt(manager_unsorted):
+    manager_unsorted.rebuild_index()
+    # Файл правят руками - индекс больше не совпадает
+    records = [make_record(9, "Девять"), make_record(5, "Пять")]
+    with open(manager_unsorted.path, "w", encoding="utf-8") as file:
+        json.dump(records, file, ensure_ascii=False, indent=1)
+
+    fresh = TaskManagerJSON(path=manager_unsorted.path, id_path=manager_unsorted.id_path)
+    all_tasks = fresh.load_data()
+    assert fresh.find_by_id(all_tasks, 5) == 1
+    assert fresh.find_by_id(all_tasks, 2) is None
+
+
+def test_search_index_prefix_and_case():
+    index = SearchIndex()
+    index.rebuild([
+        make_record(1, "Купить ЁЛКУ"),
+        make_record(2, "Позвонить в банк"),
+    ])
+
+    assert index.search("ёлк") == [1]
+    assert index.search("ЕЛКА") == []
+    assert index.search("позв банк") == [2]
+    assert index.search("проверка") == [1, 2], "Описание тоже участвует в поиске"
+
+
+def test_search_ranks_title_first():
+    index = SearchIndex()
+    title_match = make_record(1, "Отчет")
+    description_match = make_record(2, "Другое")
+    description_match["description"] = "Отчет за месяц"
+    index.rebuild([description_match, title_match])
+
+    assert index.search("отчет") == [1, 2]
+
+
+def test_search_index_follows_mutations(manager_unsorted):
+    assert [task.id for task in manager_unsorted.find_to_entry_title("дев")] == [9]
+
+    manager_unsorted.edit_task(manager_unsorted.get_tasks()[0], "title", "Девятка")
+    manager_unsorted.remove_task(9)
+
+    found = manager_unsorted.find_to_entry_title("дев")
+    assert [task.id for task in found] == [5]
+
+
+def test_deadline_index_queries():
+    now = datetime(2025, 1, 1, 12, 0, 0)
+    records = [make_record(task_id, "Срок") for task_id in range(1, 6)]
+    for record, hours in zip(records, [5, -2, 30, 1, -1]):
+        record["deadline"] = (now + timedelta(hours=hours)).isoformat()
+    records[4]["status"] = True
+
+    index = DeadlineIndex()
+    index.rebuild(records)
+    assert index.overdue(now) == [2]
+    assert index.due_within(timedelta(hours=7), now) == [4, 1]
+    assert index.due_before(now + timedelta(hours=7)) == [2, 4, 1]
+    assert index.next_due(2, now) == [4, 1]
+
+    index.remove(records[3])
+    records[3]["status"] = True
+    index.add(records[3])
+    index.remove(records[4])
+    records[4]["status"] = False
+    index.add(records[4])
+    assert index.due_before(now + timedelta(hours=7)) == [2, 5, 1]
+
+
+def test_get_urgent_follows_mutations(manager_unsorted):
+    soon = manager_unsorted.get_urgent()
+    assert [task.id for task in soon] == [5, 2, 9]
+
+    task = soon[0]
+    manager_unsorted.complete_task(task)
+    manager_unsorted.edit_task(
+        soon[1], "deadline", (datetime.now() + timedelta(days=3)).isoformat()
+    )
+    assert [task.id for task in manager_unsorted.get_urgent()] == [9]
+    assert [task.id for task in manager_unsorted.get_urgent(timedelta(days=4))] == [9, 2]
+
+
+def test_category_index_counts():
+    records = [make_record(task_id, "Категория") for task_id in range(1, 5)]
+    records[0]["category"] = "Дом"
+    records[1]["status"] = True
+    index = CategoryIndex()
+    index.rebuild(records)
+    assert index.counts() == {
+        "Дом": {"total": 1, "done": 0, "pending": 1},
+        "тесты": {"total": 3, "done": 1, "pending": 2},
+    }
+
+    index.remove(records[0])
+    index.remove(records[0])
+    index.remove(records[1])
+    records[1]["status"] = False
+    index.add(records[1])
+    assert index.counts() == {"тесты": {"total": 3, "done": 0, "pending": 3}}
+
+
+def test_cat_counts_follow_mutations(manager_unsorted):
+    assert manager_unsorted.get_cat_counts() == {
+        "тесты": {"total": 3, "done": 0, "pending": 3}}
+
+    task = manager_unsorted.get_tasks()[0]
+    manager_unsorted.complete_task(task)
+    manager_unsorted.edit_task(task, "category", "Дом")
+    manager_unsorted.remove_task(9)
+    assert manager_unsorted.get_cat_counts() == {
+        "тесты": {"total": 1, "done": 0, "pending": 1},
+        "Дом": {"total": 1, "done": 1, "pending": 0},
+    }
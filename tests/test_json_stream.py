@@ -0,0 +1,38 @@
+import io
+import json
+
+import pytest
+
+from utils.json_stream import dump_json_array, iter_json_array
+
+
+RECORDS = [
+    {"id": 1, "title": "Задача \"в кавычках\"", "status": False},
+    {"id": 2, "title": "Вторая", "status": True, "score": 2.5},
+    {"id": 3, "title": "", "status": None, "tags": [1, {"a": -1e-5}]},
+]
+
+
+@pytest.mark.parametrize("indent", [4, None])
+def test_dump_matches_json_dump(indent):
+    for records in ([], RECORDS):
+        file = io.StringIO()
+        dump_json_array(iter(records), file, indent=indent)
+        assert file.getvalue() == json.dumps(records, ensure_ascii=False, indent=indent)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, 64 * 1024])
+def test_iter_reads_by_chunks(chunk_size):
+    text = json.dumps(RECORDS, ensure_ascii=False, indent=4)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == RECORDS
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size)) == []
+
+
+def test_numbers_on_chunk_border():
+    assert list(iter_json_array(io.StringIO("[12.75, 300]"), 2)) == [12.75, 300]
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1 2]", "[1, {"])
+def test_broken_json(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 2))
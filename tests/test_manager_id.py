@@ -0,0 +1,80 @@
+import gc
+import os
+import subprocess
+import sys
+import textwrap
+
+from utils import manager_id as manager_id_module
+from utils.manager_id import ManagerID
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_block_is_reserved_once(tmp_path):
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    manager_id = ManagerID(id_path, block_size=10)
+
+    ids = [manager_id.increment() for _ in range(12)]
+
+    assert ids == list(range(2, 14))
+    assert manager_id.load_id() == 21, "Зарезервированы два блока по 10"
+
+
+def test_release_returns_unused_ids(tmp_path):
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    manager_id = ManagerID(id_path, block_size=10)
+    manager_id.increment()
+    manager_id.release()
+
+    assert ManagerID(id_path, block_size=10).increment() == 3
+
+
+def test_release_keeps_foreign_reservations(tmp_path):
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    first = ManagerID(id_path, block_size=10)
+    second = ManagerID(id_path, block_size=10)
+    first.increment()
+    second.increment()
+    first.release()
+
+    assert first.load_id() == 21, "Блок второго счетчика нельзя отдавать"
+
+
+def test_exit_release_does_not_pin_instances(tmp_path):
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    manager_id = ManagerID(id_path, block_size=10)
+    assert manager_id not in manager_id_module._holding
+    manager_id.increment()
+    assert manager_id in manager_id_module._holding
+
+    manager_id_module.release_all()
+    assert manager_id not in manager_id_module._holding
+    assert ManagerID(id_path, block_size=10).increment() == 3
+
+    manager_id.increment()
+    del manager_id
+    gc.collect()
+    assert not any(item.path == id_path for item in manager_id_module._holding)
+
+
+def test_no_duplicates_across_processes(tmp_path):
+    id_path = str(tmp_path / "auto_increment_tasks.txt")
+    script = textwrap.dedent(f"""
+        from utils.manager_id import ManagerID
+        manager_id = ManagerID({id_path!r}, block_size=7)
+        print(" ".join(str(manager_id.increment()) for _ in range(200)))
+    """)
+    processes = [
+        subprocess.Popen([sys.executable, "-c", script], cwd=ROOT,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(6)
+    ]
+    ids = []
+    for process in processes:
+        out, _ = process.communicate(timeout=60)
+        assert process.returncode == 0
+        ids.extend(int(num) for num in out.split())
+
+    assert len(ids) == 6 * 200
+    assert len(set(ids)) == len(ids), "ID не должны повторяться"
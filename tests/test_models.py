@@ -0,0 +1,25 @@
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from tasks.models import Task
+from tests.conftest import make_task
+
+
+def test_slots_and_dict_roundtrip():
+    task = make_task("Модель", deadline=datetime(2030, 1, 1, 12, 0, 0, 500).isoformat(), id=1)
+    assert not hasattr(task, "__dict__")
+    assert task.to_dict() == asdict(task)
+    assert Task.from_dict(task.to_dict()) == task
+
+
+def test_deadline_parsed_once_and_refreshed():
+    deadline = datetime(2030, 1, 1, 12, 0, 0)  # isoformat без микросекунд
+    task = make_task("Модель", deadline=deadline.isoformat(), id=1)
+    assert task.deadline_at == deadline
+    assert task.deadline_at is task.deadline_at
+
+    task.deadline = (deadline + timedelta(days=1)).isoformat()
+    assert task.deadline_at == deadline + timedelta(days=1)
+    assert timedelta(days=1) < task.timing()
+    # Кэш не участвует в сравнении задач
+    assert task == make_task("Модель", deadline=(deadline + timedelta(days=1)).isoformat(), id=1)
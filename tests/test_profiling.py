@@ -0,0 +1,82 @@
+import io
+import json
+import os
+
+import pytest
+
+from settings import settings
+from tasks.db import TaskManagerJSON
+from tasks.models import Task
+from tests.conftest import make_task
+from utils import profiling
+from utils.formats import FORMATS
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path / "profiles"))
+
+
+@pytest.fixture(autouse=True)
+def cleanup():
+    yield
+    profiling.uninstall()
+
+
+def test_disabled_changes_nothing(monkeypatch):
+    monkeypatch.delenv(profiling.ENV_VAR, raising=False)
+    load_data = TaskManagerJSON.load_data
+    assert profiling.install() is False
+    assert TaskManagerJSON.load_data is load_data
+    assert profiling.stats is None
+
+
+def test_summary_counts_calls_and_bytes(manager, monkeypatch, capsys):
+    monkeypatch.setenv(profiling.ENV_VAR, "summary,trace")
+    assert profiling.install() is True
+    manager.add_task(make_task("Первая"))
+    manager.add_task(make_task("Вторая"))
+    assert len(list(manager.iter_records())) == 2
+    assert [task.title for task in manager.get_tasks()] == ["Первая", "Вторая"]
+
+    stats = profiling.stats
+    assert stats.calls["TaskManagerJSON.add_task"][0] == 2
+    assert stats.calls["TaskManagerJSON.iter_records"][0] == 1
+    assert stats.calls["TaskManagerJSON.load_data"][0] >= 3
+    assert stats.calls["Task.from_dict"][0] == 2
+    size = os.path.getsize(manager.path)
+    assert stats.bytes_written >= size and stats.bytes_read >= size
+
+    profiling.report({"summary", "trace"})
+    err = capsys.readouterr().err
+    assert "TaskManagerJSON.add_task" in err
+    trace_path = err.strip().splitlines()[-1].split(": ", 1)[1]
+    with open(trace_path, encoding="utf-8") as file:
+        events = json.load(file)["traceEvents"]
+    assert {"TaskManagerJSON.add_task", "Task.from_dict"} <= {event["name"] for event in events}
+
+
+def test_ui_targets_keep_static_methods(monkeypatch):
+    from rich.console import Console
+
+    from tasks.views import TaskCLI
+
+    monkeypatch.setenv(profiling.ENV_VAR, "summary")
+    assert profiling.install(ui=True) is True
+    assert isinstance(TaskCLI.__dict__["build_abb_task"], staticmethod)
+    task = make_task("Отрисовка")
+    task.id = 1
+    Console(file=io.StringIO()).print(TaskCLI().abb_repr_task(1, task))
+    assert profiling.stats.calls["TaskCLI.build_abb_task"][0] == 1
+
+
+def test_uninstall_restores_methods(manager, monkeypatch):
+    load_data = TaskManagerJSON.load_data
+    from_dict = Task.__dict__["from_dict"]
+    monkeypatch.setenv(profiling.ENV_VAR, "summary")
+    profiling.install()
+    assert TaskManagerJSON.load_data is not load_data
+    assert profiling.uninstall() is not None
+    assert TaskManagerJSON.load_data is load_data
+    assert Task.__dict__["from_dict"] is from_dict
+    assert all("write" not in vars(store_format) for store_format in FORMATS.values())
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tasks.db import TaskManagerJSON
+from tasks.journal import TaskManagerJournal
+from tasks.models import Task
+from tasks.query import Query, plan, select
+from tasks.sqlite import TaskManagerSQLite
+
+NOW = datetime.now()
+
+TASKS = [
+    # название, категория, приоритет, срок через часов, выполнена
+    ("Купить хлеб", "Дом", "Низкий", 2, False),
+    ("Отчет за квартал", "Работа", "Высокий", 30, False),
+    ("Помыть окна", "Дом", "Средний", -5, False),
+    ("Отчет для налоговой", "Работа", "Средний", 10, True),
+    ("Позвонить маме", "Семья", "Высокий", 50, False),
+    ("Купить подарок", "Семья", "Низкий", 1, False),
+]
+
+QUERIES = [
+    Query(),
+    Query(status=False),
+    Query(category="Дом"),
+    Query(status=False, priority="Высокий"),
+    Query(status=False, deadline_to=NOW + timedelta(hours=12)),
+    Query(deadline_from=NOW, deadline_to=NOW + timedelta(hours=40)),
+    Query(text="купи"),
+    Query(text="отчет", status=False),
+    Query(sort="deadline"),
+    Query(sort="priority", descending=True),
+    Query(sort="id", descending=True, offset=1, limit=2),
+    Query(status=False, sort="deadline", limit=3),
+    Query(category="Дом", text="окна"),
+    Query(category="Нет такой"),
+    Query(offset=2, limit=2),
+    # Запрос без слов не находит ничего, с индексом и без
+    Query(text="!!!"),
+]
+
+
+def make_tasks() -> list[Task]:
+    return [
+        Task(title=title, description="Проверка запросов", category=category,
+             deadline=(NOW + timedelta(hours=hours)).isoformat(),
+             priority=priority, status=status)
+        for title, category, priority, hours, status in TASKS
+    ]
+
+
+def expected_titles(query: Query) -> list[str]:
+    """Ответ, посчитанный перебором без индексов."""
+    records = [dict(task.to_dict(), id=num)
+               for num, task in enumerate(make_tasks(), 1)]
+    return [task_map["title"] for task_map in select(query, records)]
+
+
+@pytest.fixture(name="manager_json")
+def temp_manager_json(manager):
+    manager.add_tasks(make_tasks())
+    return manager
+
+
+@pytest.fixture(name="manager_journal")
+def temp_manager_journal(tmp_path, db_paths):
+    manager = TaskManagerJournal(
+        path=str(tmp_path / "journal.log"),
+        snapshot_path=str(tmp_path / "snapshot.json"),
+        id_path=db_paths["id_path"],
+        json_path=str(tmp_path / "missing.json"),
+    )
+    manager.add_tasks(make_tasks())
+    return manager
+
+
+@pytest.fixture(name="manager_sqlite")
+def temp_manager_sqlite(tmp_path):
+    manager = TaskManagerSQLite(
+        path=str(tmp_path / "tasks.sqlite3"),
+        json_path=str(tmp_path / "missing.json")
+    )
+    manager.add_tasks(make_tasks())
+    yield manager
+    manager.close()
+
+
+def titles(manager, query: Query) -> list[str]:
+    return [task.title for task in manager.query(query)]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_json_scan_and_indexes(manager_json, query):
+    # Без индексов - один проход по файлу
+    assert manager_json.categories is None
+    assert titles(manager_json, query) == expected_titles(query)
+    # С актуальными индексами ответ тот же
+    manager_json.get_category_index()
+    manager_json.get_deadline_index()
+    assert titles(manager_json, query) == expected_titles(query)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_journal(manager_journal, query):
+    assert titles(manager_journal, query) == expected_titles(query)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_sqlite(manager_sqlite, query):
+    if query.text and query.sort is None:
+        # SQLite отдает найденное по порядку ID, а не по релевантности
+        assert sorted(titles(manager_sqlite, query)) == sorted(expected_titles(query))
+    else:
+        assert titles(manager_sqlite, query) == expected_titles(query)
+
+
+def test_stale_index_is_not_used(manager_json):
+    manager_json.get_category_index()
+    # Файл поменяли в обход менеджера
+    other = TaskManagerJSON(path=manager_json.path, id_path=manager_json.id_path)
+    other.add_task(make_tasks()[0])
+    assert len(manager_json.query(Query(category="Дом"))) == 3
+
+
+def test_search_is_served_from_index(manager_json, monkeypatch):
+    assert [task.title for task in manager_json.find_to_entry_title("купи")] == [
+        "Купить хлеб", "Купить подарок"
+    ]
+
+    def no_reads():
+        raise AssertionError("Файл не должен читаться")
+        yield
+
+    monkeypatch.setattr(manager_json, "iter_records", no_reads)
+    assert [task.title for task in manager_json.find_to_entry_title("отчет")] == [
+        "Отчет за квартал", "Отчет для налоговой"
+    ]
+    assert titles(manager_json, Query(text="отчет", status=False)) == ["Отчет за квартал"]
+    assert manager_json.find_to_entry_title("!!!") == []
+
+
+def test_plan_intersects_indexes(manager_journal):
+    query = Query(status=False, category="Дом", deadline_to=NOW + timedelta(hours=3))
+    candidates, ranks = plan(query, category_index=manager_journal.category_index,
+                             deadline_index=manager_journal.deadline_index)
+    assert candidates == {1, 3}
+    assert ranks is None
+    assert plan(Query(priority="Низкий"), manager_journal.search_index) == (None, None)
+
+
+def test_bad_sort_field():
+    with pytest.raises(ValueError):
+        Query(sort="title")
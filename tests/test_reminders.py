@@ -0,0 +1,118 @@
+import asyncio
+from datetime import timedelta
+
+from tasks.async_manager import TaskManagerAsync
+from tasks.db import TaskManagerJSON
+from tasks.journal import TaskManagerJournal
+from tasks.reminders import OVERDUE, SOON, ReminderScheduler
+from tasks.sqlite import TaskManagerSQLite
+from tests.conftest import make_task
+
+WARN = timedelta(hours=7)
+
+
+def test_scheduler_sleeps_until_events(manager):
+    manager.add_tasks([
+        make_task("В окне", term=timedelta(hours=1)),
+        make_task("Войдет в окно", term=WARN + timedelta(seconds=0.3)),
+        make_task("Скоро истечет", term=timedelta(seconds=0.5)),
+        make_task("Нескоро", term=timedelta(days=5)),
+    ])
+    received = []
+
+    async def run() -> int:
+        scheduler = ReminderScheduler(
+            manager, [lambda task, kind: received.append((task.title, kind))],
+            warn_before=WARN, recheck=30
+        )
+        checks = 0
+        original_check = scheduler.check
+
+        async def counted_check():
+            nonlocal checks
+            checks += 1
+            return await original_check()
+
+        scheduler.check = counted_check
+        runner = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.8)
+        scheduler.stop()
+        await runner
+        return checks
+
+    checks = asyncio.run(run())
+    assert sorted(received) == sorted([
+        ("В окне", SOON),
+        ("Скоро истечет", SOON),
+        ("Войдет в окно", SOON),
+        ("Скоро истечет", OVERDUE),
+    ])
+    # Старт, вход в окно, истечение срока - без опроса по кругу
+    assert checks <= 4
+
+
+def test_check_notifies_once_and_forgets_done(manager):
+    manager.add_task(make_task("Срочно", term=timedelta(hours=1)))
+    scheduler = ReminderScheduler(manager, [], warn_before=WARN)
+
+    assert [kind for _, kind in asyncio.run(scheduler.check())] == [SOON]
+    assert asyncio.run(scheduler.check()) == []
+
+    manager.complete_task(manager.get_tasks()[0])
+    asyncio.run(scheduler.check())
+    assert scheduler.warned == set()
+
+
+def test_own_deadline_index_is_cached(tmp_path):
+    manager = TaskManagerSQLite(
+        path=str(tmp_path / "tasks.sqlite3"),
+        json_path=str(tmp_path / "missing.json")
+    )
+    manager.add_task(make_task("Срочно", term=timedelta(hours=1)))
+    manager.add_task(make_task("Потом", term=WARN + timedelta(hours=1)))
+    scheduler = ReminderScheduler(manager, [], warn_before=WARN)
+
+    # Хранилище без своего индекса читается в потоке, вне цикла событий
+    assert [kind for _, kind in asyncio.run(scheduler.check())] == [SOON]
+    index = scheduler.deadline_index()
+    assert 0 < scheduler.next_delay() <= scheduler.recheck
+    assert scheduler.deadline_index() is index, "Файл не менялся"
+
+    manager.complete_task(manager.get_tasks()[1])
+    assert scheduler.deadline_index() is not index
+    assert len(scheduler.deadline_index()) == 1
+    manager.close()
+
+
+def test_daemon_sees_other_process_changes(tmp_path):
+    paths = {
+        "path": str(tmp_path / "journal.log"),
+        "snapshot_path": str(tmp_path / "snapshot.json"),
+        "id_path": str(tmp_path / "auto_increment_tasks.txt"),
+        "json_path": str(tmp_path / "missing.json"),
+    }
+    daemon = TaskManagerJournal(compact_after=3, **paths)
+    menu = TaskManagerJournal(compact_after=3, **paths)
+    scheduler = ReminderScheduler(daemon, [], warn_before=WARN)
+    assert asyncio.run(scheduler.check()) == []
+
+    # Меню в другом процессе добавило задачу, а потом журнал свернулся
+    menu.add_task(make_task("Срочно", term=timedelta(hours=1)))
+    assert [kind for _, kind in asyncio.run(scheduler.check())] == [SOON]
+    menu.add_tasks([make_task("Потом", term=timedelta(days=2)) for _ in range(3)])
+    menu.complete_task(menu.get_tasks()[0])
+    assert asyncio.run(scheduler.check()) == []
+    assert len(scheduler.deadline_index()) == 3
+
+
+def test_own_writes_do_not_reload(manager):
+    store = TaskManagerAsync(manager)
+    store.add_task(make_task("Срочно", term=timedelta(hours=1)))
+    store.flush()
+    assert store.sync() is False
+
+    other = TaskManagerJSON(path=manager.path, id_path=manager.id_path)
+    other.add_task(make_task("Чужая", term=timedelta(hours=2)))
+    assert store.sync() is True
+    assert [task.title for task in store.get_urgent(WARN)] == ["Срочно", "Чужая"]
+    store.close()
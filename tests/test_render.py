@@ -0,0 +1,64 @@
+import io
+from datetime import timedelta
+
+from rich.console import Console
+
+from tasks.views import TaskCLI
+from tests.conftest import make_task
+from utils.render import CLEAR_HOME, ERASE_BELOW, RenderCache, Screen, move_to
+
+
+def make_screen(height: int = 30) -> Screen:
+    console = Console(file=io.StringIO(), force_terminal=True, width=60, height=height)
+    return Screen(console, diff=True)
+
+
+def test_render_cache():
+    cache = RenderCache(max_size=2)
+    builds = []
+
+    def build(value):
+        return lambda: builds.append(value) or value
+
+    assert cache.get(1, "a", build("a")) == "a"
+    assert cache.get(1, "a", build("a2")) == "a"
+    assert cache.get(1, "b", build("b")) == "b"
+    cache.get(2, "x", build("x"))
+    cache.get(3, "y", build("y"))
+    assert 1 not in cache.items and len(cache) == 2
+    cache.invalidate(2)
+    assert list(cache.items) == [3]
+    assert builds == ["a", "b", "x", "y"]
+
+
+def test_screen_rewrites_changed_lines_only():
+    screen = make_screen()
+    assert screen.frame(["один", "два", "три"]).startswith(CLEAR_HOME)
+
+    out = screen.frame(["один", "2", "три"])
+    assert out == move_to(1) + "2\x1b[K" + move_to(3) + ERASE_BELOW
+    # Кадр короче: хвост прошлого стирается
+    assert screen.frame(["один"]) == move_to(1) + ERASE_BELOW
+
+
+def test_screen_full_redraw_when_frame_does_not_fit():
+    screen = make_screen(height=4)
+    screen.frame(["а", "б"])
+    assert screen.frame(["а", "б", "в"]).startswith(CLEAR_HOME)
+    assert screen.lines is None
+    screen.clear()
+    assert screen.frame(["а"]).startswith(CLEAR_HOME)
+
+
+def test_task_row_is_cached_until_change():
+    task_cli = TaskCLI()
+    task = make_task(id=1, term=timedelta(days=3))
+    row = task_cli.abb_repr_task(1, task)
+    assert task_cli.abb_repr_task(1, task) is row
+    assert task_cli.abb_repr_task(2, task) is not row
+
+    task.title = "Новое название"
+    changed = task_cli.abb_repr_task(2, task)
+    assert changed is not row
+    task_cli.render_cache.invalidate(task.id)
+    assert task_cli.abb_repr_task(2, task) is not changed
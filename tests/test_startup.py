@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import tasks.views
+from tasks.views import TaskCLI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Бюджет на импорт модуля, мкс. С запасом для медленных машин.
+STARTUP_BUDGET_US = {"cli": 150_000, "menu": 400_000}
+# Что не должно грузиться при запуске
+LAZY_MODULES = {
+    "cli": ["rich", "sqlite3", "tasks.journal", "tasks.sqlite", "tasks.transfer"],
+    "menu": ["rich.prompt", "sqlite3", "tasks.journal", "tasks.sqlite", "tasks.transfer"],
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Совокупное время импорта каждого модуля по `-X importtime`, мкс."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ["cli", "menu"])
+def test_import_budget(module):
+    # Первый запуск может компилировать .pyc, меряем второй
+    import_times(module)
+    times = import_times(module)
+
+    for lazy in LAZY_MODULES[module]:
+        assert lazy not in times, f"{lazy} не должен грузиться при импорте {module}"
+    assert times[module] < STARTUP_BUDGET_US[module], (
+        f"Импорт {module} занял {times[module]} мкс"
+    )
+
+
+def test_store_opens_on_first_use(monkeypatch):
+    calls = []
+    monkeypatch.setattr(tasks.views, "make_manager", lambda: calls.append(1) or "manager")
+
+    task_cli = TaskCLI()
+    assert calls == [], "Хранилище не должно открываться при создании TaskCLI"
+    assert task_cli.manager == "manager"
+    assert task_cli.manager == "manager"
+    assert calls == [1]
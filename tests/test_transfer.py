@@ -0,0 +1,55 @@
+import csv
+import json
+from datetime import datetime
+
+import pytest
+
+from tasks.transfer import export_tasks, import_tasks
+from tests.conftest import make_task
+
+# Запятая проверяет кавычки в CSV
+DESCRIPTION = "Проверка обмена, с запятой"
+
+
+@pytest.mark.parametrize("name", ["tasks.jsonl", "tasks.csv"])
+def test_export_import_roundtrip(manager, tmp_path, name):
+    manager.add_tasks([make_task("Первая", description=DESCRIPTION),
+                       make_task("Вторая", description=DESCRIPTION, status=True)])
+    path = str(tmp_path / name)
+    counts = []
+
+    assert export_tasks(manager, path, progress=counts.append) == 2
+    assert counts[-1] == 2
+    assert import_tasks(manager, path) == 2
+
+    tasks = manager.get_tasks()
+    assert [task.title for task in tasks] == ["Первая", "Вторая"] * 2
+    assert [task.status for task in tasks] == [False, True] * 2
+    assert len({task.id for task in tasks}) == 4
+
+
+def test_import_csv_with_missing_field(manager, tmp_path):
+    path = tmp_path / "tasks.csv"
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["title", "category", "deadline", "status"])
+        writer.writerow(["Есть", "тесты", datetime.now().isoformat(), "да"])
+        writer.writerow(["Нет срока", "тесты"])
+
+    with pytest.raises(ValueError, match="Запись 2"):
+        import_tasks(manager, str(path))
+    # Ошибка посреди импорта не оставляет половину задач
+    assert manager.get_tasks() == []
+
+
+def test_import_jsonl_many_rows(manager, tmp_path):
+    path = tmp_path / "tasks.jsonl"
+    with open(path, 'w', encoding='utf-8') as file:
+        for num in range(2500):
+            task = {"title": f"Задача {num}", "category": "тесты",
+                    "deadline": "2030-01-01T00:00:00.000000", "status": False}
+            file.write(json.dumps(task, ensure_ascii=False) + "\n")
+
+    assert import_tasks(manager, str(path)) == 2500
+    assert len(manager.get_page(0, 3000)) == 2500
+    assert manager.find_to_entry_title("2499")[0].title == "Задача 2499"
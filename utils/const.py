@@ -1,5 +1,6 @@
 GREY_MAKE_A_CHOICE = "Выберите что-нибудь из предложенного..."
 RED_MAKE_A_CHOICE = "Выберите что-нибудь из предложенного!"
+NOT_SAVED = "Изменения не сохранены на диск: "
 
 ENTER_TO_MENU = "Enter to Menu"
 
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from typing import Callable
+
+from settings import settings
+
+
+def fsync_path(path: str) -> None:
+    """Сбросить содержимое файла на диск."""
+    with open(path, 'ab') as file:
+        os.fsync(file.fileno())
+
+
+def fsync_dir(path: str) -> None:
+    """
+    Сбросить на диск запись каталога, чтобы переименование
+    пережило сбой питания. На Windows так сделать нельзя.
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def backup_path(path: str, num: int) -> str:
+    """Путь к резервной копии номер `num` (1 - самая свежая)."""
+    return f"{path}.bak.{num}"
+
+
+def rotate_backups(path: str, backups: int) -> None:
+    """
+    Сдвинуть кольцо резервных копий и сохранить текущий файл
+    как самую свежую копию. Файл остается на месте: копия
+    делается жесткой ссылкой, а если нельзя - копированием.
+    """
+    if backups <= 0 or not os.path.exists(path):
+        return
+    for num in range(backups - 1, 0, -1):
+        if os.path.exists(backup_path(path, num)):
+            os.replace(backup_path(path, num), backup_path(path, num + 1))
+    newest = backup_path(path, 1)
+    if os.path.exists(newest):
+        os.remove(newest)
+    try:
+        os.link(path, newest)
+    except OSError:
+        shutil.copy2(path, newest)
+
+
+def atomic_write(
+        path: str,
+        write: Callable[[str], None],
+        fsync: bool | None = None,
+        backups: int | None = None
+) -> None:
+    """
+    Записать файл так, чтобы при сбое посреди записи
+    на месте остался старый файл целиком.
+    Данные пишутся во временный файл рядом, сбрасываются
+    на диск и атомарно переименовываются в `path`.
+
+    :param path: Итоговый файл.
+    :param write: Функция, которая пишет содержимое в переданный ей путь.
+    :param fsync: Сбрасывать ли данные на диск, по умолчанию `settings.fsync`.
+    :param backups: Сколько резервных копий держать, по умолчанию `settings.backups`.
+    """
+    fsync = settings.fsync if fsync is None else fsync
+    backups = settings.backups if backups is None else backups
+    directory = os.path.dirname(os.path.abspath(path))
+
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    os.close(fd)
+    try:
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        write(tmp_path)
+        if fsync:
+            fsync_path(tmp_path)
+        rotate_backups(path, backups)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if fsync:
+        fsync_dir(directory)
+
+
+def atomic_write_text(path: str, text: str, **kwargs) -> None:
+    """Атомарно записать строку в файл."""
+    def write(tmp_path: str) -> None:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+    atomic_write(path, write, **kwargs)
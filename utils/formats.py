@@ -0,0 +1,345 @@
+import abc
+import json
+import struct
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from utils.fileio import atomic_write
+from utils.json_stream import CHUNK_SIZE, dump_json_array, iter_json_array
+
+
+# Файлы в двоичном формате начинаются с этой метки,
+# дальше подряд идут записи в кодировке MessagePack.
+BINARY_MAGIC = b"TCLB\x01"
+
+
+class StoreFormat(abc.ABC):
+    """Формат файла с задачами: как читать и писать записи."""
+    name: str = ""
+
+    @abc.abstractmethod
+    def iter_records(self, path: str) -> Iterator[dict]:
+        """Перебрать записи из файла по одной."""
+        ...
+
+    @abc.abstractmethod
+    def write(self, path: str, records: Iterable[dict]) -> None:
+        """Записать записи в файл по одной."""
+        ...
+
+    def read_all(self, path: str) -> list[dict]:
+        """Прочитать все записи списком, формат может сделать это быстрее потока."""
+        return list(self.iter_records(path))
+
+    def write_all(self, path: str, records: list[dict]) -> None:
+        """Записать готовый список записей, формат может сделать это быстрее потока."""
+        self.write(path, records)
+
+
+class JSONFormat(StoreFormat):
+    """JSON-массив с отступами, как раньше хранился `data.json`."""
+    name = "json"
+    indent: int | None = 4
+
+    def iter_records(self, path: str) -> Iterator[dict]:
+        with open(path, 'r', encoding='utf-8') as file:
+            yield from iter_json_array(file)
+
+    def write(self, path: str, records: Iterable[dict]) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            dump_json_array(records, file, indent=self.indent)
+
+    def read_all(self, path: str) -> list[dict]:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def write_all(self, path: str, records: list[dict]) -> None:
+        # Текст собирается целиком: так кодировщик JSON заметно быстрее
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(records, ensure_ascii=False, indent=self.indent))
+
+
+class CompactJSONFormat(JSONFormat):
+    """JSON-массив без отступов и лишних пробелов."""
+    name = "json_compact"
+
+    def write(self, path: str, records: Iterable[dict]) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("[")
+            for num, record in enumerate(records):
+                if num:
+                    file.write(",")
+                file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            file.write("]")
+
+    def write_all(self, path: str, records: list[dict]) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(records, ensure_ascii=False, separators=(",", ":")))
+
+
+class JSONLinesFormat(StoreFormat):
+    """JSON Lines: одна запись на строку."""
+    name = "jsonl"
+
+    def iter_records(self, path: str) -> Iterator[dict]:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+    def write(self, path: str, records: Iterable[dict]) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+                file.write("\n")
+
+
+class _NeedMore(Exception):
+    """Запись обрывается на границе прочитанного куска."""
+
+
+def pack(obj: Any) -> bytes:
+    """Закодировать значение в MessagePack (подмножество без ext/bin)."""
+    if obj is None:
+        return b"\xc0"
+    if obj is True:
+        return b"\xc3"
+    if obj is False:
+        return b"\xc2"
+    if isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            return struct.pack("B", obj)
+        if -32 <= obj < 0:
+            return struct.pack("b", obj)
+        if obj >= 0:
+            for code, fmt, limit in ((0xcc, ">B", 1 << 8), (0xcd, ">H", 1 << 16),
+                                     (0xce, ">I", 1 << 32), (0xcf, ">Q", 1 << 64)):
+                if obj < limit:
+                    return struct.pack(">B", code) + struct.pack(fmt, obj)
+        else:
+            for code, fmt, limit in ((0xd0, ">b", 1 << 7), (0xd1, ">h", 1 << 15),
+                                     (0xd2, ">i", 1 << 31), (0xd3, ">q", 1 << 63)):
+                if obj >= -limit:
+                    return struct.pack(">B", code) + struct.pack(fmt, obj)
+        raise ValueError(f"Слишком большое число: {obj}")
+    if isinstance(obj, float):
+        return b"\xcb" + struct.pack(">d", obj)
+    if isinstance(obj, str):
+        data = obj.encode("utf-8")
+        size = len(data)
+        if size < 32:
+            return struct.pack("B", 0xa0 | size) + data
+        if size < 1 << 8:
+            return b"\xd9" + struct.pack(">B", size) + data
+        if size < 1 << 16:
+            return b"\xda" + struct.pack(">H", size) + data
+        return b"\xdb" + struct.pack(">I", size) + data
+    if isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 16:
+            head = struct.pack("B", 0x90 | size)
+        elif size < 1 << 16:
+            head = b"\xdc" + struct.pack(">H", size)
+        else:
+            head = b"\xdd" + struct.pack(">I", size)
+        return head + b"".join(pack(item) for item in obj)
+    if isinstance(obj, dict):
+        size = len(obj)
+        if size < 16:
+            head = struct.pack("B", 0x80 | size)
+        elif size < 1 << 16:
+            head = b"\xde" + struct.pack(">H", size)
+        else:
+            head = b"\xdf" + struct.pack(">I", size)
+        return head + b"".join(pack(key) + pack(value) for key, value in obj.items())
+    raise TypeError(f"Нельзя закодировать {type(obj).__name__}")
+
+
+_FIXED = {
+    0xcc: ">B", 0xcd: ">H", 0xce: ">I", 0xcf: ">Q",
+    0xd0: ">b", 0xd1: ">h", 0xd2: ">i", 0xd3: ">q",
+    0xca: ">f", 0xcb: ">d",
+}
+_SIZES = {
+    0xd9: ">B", 0xda: ">H", 0xdb: ">I",
+    0xdc: ">H", 0xdd: ">I", 0xde: ">H", 0xdf: ">I",
+}
+
+
+def unpack(data: bytes, pos: int = 0) -> tuple[Any, int]:
+    """
+    Раскодировать одно значение MessagePack.
+    :return: Значение и позиция сразу после него.
+    """
+    if pos >= len(data):
+        raise _NeedMore()
+    code = data[pos]
+    pos += 1
+
+    if code < 0x80:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code == 0xc0:
+        return None, pos
+    if code == 0xc2:
+        return False, pos
+    if code == 0xc3:
+        return True, pos
+    if code in _FIXED:
+        fmt = _FIXED[code]
+        end = pos + struct.calcsize(fmt)
+        if end > len(data):
+            raise _NeedMore()
+        return struct.unpack(fmt, data[pos:end])[0], end
+
+    if 0xa0 <= code <= 0xbf:
+        kind, size = "str", code & 0x1f
+    elif 0x90 <= code <= 0x9f:
+        kind, size = "array", code & 0x0f
+    elif 0x80 <= code <= 0x8f:
+        kind, size = "map", code & 0x0f
+    elif code in _SIZES:
+        fmt = _SIZES[code]
+        end = pos + struct.calcsize(fmt)
+        if end > len(data):
+            raise _NeedMore()
+        size = struct.unpack(fmt, data[pos:end])[0]
+        pos = end
+        kind = "str" if code <= 0xdb else "array" if code <= 0xdd else "map"
+    else:
+        raise ValueError(f"Неизвестный код MessagePack: {code:#x}")
+
+    if kind == "str":
+        end = pos + size
+        if end > len(data):
+            raise _NeedMore()
+        return data[pos:end].decode("utf-8"), end
+    if kind == "array":
+        items = []
+        for _ in range(size):
+            item, pos = unpack(data, pos)
+            items.append(item)
+        return items, pos
+    result = {}
+    for _ in range(size):
+        key, pos = unpack(data, pos)
+        result[key], pos = unpack(data, pos)
+    return result, pos
+
+
+class BinaryFormat(StoreFormat):
+    """Компактный двоичный формат: метка и записи в MessagePack."""
+    name = "binary"
+
+    def iter_records(self, path: str) -> Iterator[dict]:
+        with open(path, 'rb') as file:
+            if file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError("Файл не в двоичном формате задач")
+            yield from self._iter_file(file)
+
+    @staticmethod
+    def _iter_file(file: BinaryIO) -> Iterator[dict]:
+        buffer = b""
+        pos = 0
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            while pos < len(buffer):
+                try:
+                    record, pos_after = unpack(buffer, pos)
+                except _NeedMore:
+                    break
+                pos = pos_after
+                yield record
+            if not chunk:
+                if pos < len(buffer):
+                    raise ValueError("Файл задач обрывается посреди записи")
+                return
+
+    def write(self, path: str, records: Iterable[dict]) -> None:
+        with open(path, 'wb') as file:
+            file.write(BINARY_MAGIC)
+            for record in records:
+                file.write(pack(record))
+
+
+FORMATS: dict[str, StoreFormat] = {
+    store_format.name: store_format
+    for store_format in (JSONFormat(), CompactJSONFormat(),
+                         JSONLinesFormat(), BinaryFormat())
+}
+
+
+def get_format(name: str) -> StoreFormat:
+    """Формат по названию из `settings.storage_format`."""
+    store_format = FORMATS.get(name)
+    if store_format is None:
+        raise ValueError(f"Неизвестный формат хранения: {name}")
+    return store_format
+
+
+def detect_format(path: str) -> StoreFormat | None:
+    """
+    Определить формат файла по первым байтам.
+    :return: Формат или `None`, если файл пустой.
+    """
+    with open(path, 'rb') as file:
+        head = file.read(len(BINARY_MAGIC))
+        if head == BINARY_MAGIC:
+            return FORMATS["binary"]
+        head = (head + file.read(CHUNK_SIZE)).lstrip(b" \t\r\n\xef\xbb\xbf")
+    if not head:
+        return None
+    if head.startswith(b"["):
+        return FORMATS["json"]
+    if head.startswith(b"{"):
+        return FORMATS["jsonl"]
+    raise ValueError(f"Не удалось определить формат файла {path}")
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Перебрать записи из файла в любом из известных форматов."""
+    store_format = detect_format(path)
+    if store_format is None:
+        return iter(())
+    return store_format.iter_records(path)
+
+
+def load_records(path: str) -> list[dict]:
+    """Прочитать все записи файла списком, формат определяется по началу."""
+    store_format = detect_format(path)
+    if store_format is None:
+        return []
+    return store_format.read_all(path)
+
+
+def convert(src: str, dst: str, format_name: str) -> int:
+    """
+    Переписать файл с задачами в другой формат.
+    :return: Сколько записей переписано.
+    """
+    count = 0
+
+    def counted(records: Iterable[dict]) -> Iterator[dict]:
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    target = get_format(format_name)
+    atomic_write(dst, lambda tmp_path: target.write(tmp_path, counted(read_records(src))))
+    return count
+
+
+if __name__ == '__main__':
+    # python -m utils.formats db/data.json db/data.bin --format binary
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Конвертер файла задач")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--format", choices=sorted(FORMATS), required=True)
+    args = parser.parse_args()
+    converted = convert(args.src, args.dst, args.format)
+    print(f"Переписано задач: {converted}")
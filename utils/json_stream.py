@@ -0,0 +1,107 @@
+import json
+import re
+from typing import Any, Iterable, Iterator, TextIO
+
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_spaces = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(file: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Читает JSON-массив из файла по одному элементу,
+    в памяти держится только текущий кусок файла.
+
+    :param file: Открытый текстовый файл с JSON-массивом.
+    :param chunk_size: Сколько символов читать за раз.
+    :return: Генератор элементов массива.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        """Дочитать следующий кусок, `False` если файл кончился."""
+        nonlocal buffer, pos, eof
+        chunk = file.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_spaces() -> str:
+        """Пропустить пробелы и вернуть следующий символ ('' в конце файла)."""
+        nonlocal pos
+        while True:
+            pos = _spaces.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                return ""
+
+    if skip_spaces() != "[":
+        raise ValueError("Ожидался JSON-массив")
+    pos += 1
+
+    if skip_spaces() == "]":
+        return
+
+    while True:
+        skip_spaces()
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            # Число на границе куска могло прочитаться не целиком,
+            # поэтому элемент принимается, только если за ним уже
+            # виден разделитель.
+            after = _spaces.match(buffer, end).end()
+            if (after == len(buffer) or buffer[after] not in ",]") \
+                    and not eof and fill():
+                continue
+            break
+        pos = end
+        yield item
+
+        char = skip_spaces()
+        if char == ",":
+            pos += 1
+        elif char == "]":
+            return
+        else:
+            raise ValueError("Ожидалась ',' или ']' в JSON-массиве")
+
+
+def dump_json_array(
+        items: Iterable[Any],
+        file: TextIO,
+        indent: int | None = 4
+) -> None:
+    """
+    Записывает элементы в файл как JSON-массив по одному,
+    не собирая весь текст в памяти. Результат совпадает
+    с `json.dump(list(items), file, ensure_ascii=False, indent=indent)`.
+    """
+    if indent is None:
+        separator, prefix, closing = ", ", "", "]"
+    else:
+        separator, prefix, closing = ",\n", "\n", "\n]"
+    pad = " " * (indent or 0)
+
+    file.write("[")
+    first = True
+    for item in items:
+        text = json.dumps(item, ensure_ascii=False, indent=indent)
+        if indent is not None:
+            text = pad + text.replace("\n", "\n" + pad)
+        file.write(prefix if first else separator)
+        file.write(text)
+        first = False
+    file.write("]" if first else closing)
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _lock(file) -> None:
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK сдается после 10 попыток, ждем дальше
+                time.sleep(0.05)
+
+    def _unlock(file) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    Блокировка между процессами на отдельном файле.
+    Внутри процесса она повторно входимая и защищает еще
+    и от одновременного доступа из разных потоков.
+
+        with FileLock("db/data.json.lock"):
+            ...
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self) -> None:
+        """Захватить блокировку, ожидая других владельцев."""
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            file = open(self.path, 'a+b')
+            try:
+                _lock(file)
+            except BaseException:
+                file.close()
+                self._thread_lock.release()
+                raise
+            self._file = file
+        self._depth += 1
+
+    def release(self) -> None:
+        """Отпустить блокировку."""
+        self._depth -= 1
+        if self._depth == 0:
+            _unlock(self._file)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
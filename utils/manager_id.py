@@ -1,20 +1,52 @@
+import atexit
 import os
+import threading
+import weakref
+
+from settings import settings
+from utils.fileio import atomic_write_text
+from utils.locks import FileLock
+
+# Счетчики, у которых на руках остаток блока: при выходе он возвращается.
+# Ссылки слабые, чтобы счетчик не жил до конца процесса.
+_holding: "weakref.WeakSet[ManagerID]" = weakref.WeakSet()
+
+
+def release_all() -> None:
+    """Вернуть остатки блоков всех живых счетчиков."""
+    for manager_id in list(_holding):
+        manager_id.release()
+
+
+atexit.register(release_all)
 
 
 class ManagerID:
     """Класс для работы с ID объектов универсальный
     в основном используется для автоматического инкремента.
+
+    ID выдаются из блока, заранее зарезервированного в файле
+    под блокировкой, поэтому несколько процессов никогда
+    не получат одинаковый ID, а диск трогается раз на блок.
     """
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, block_size: int | None = None) -> None:
         """
         :param path: Принимает путь, где находится файл с последним ID
+        :param block_size: Сколько ID резервировать за раз,
+        по умолчанию `settings.id_block_size`.
         """
         self.path = path
+        self.block_size = settings.id_block_size if block_size is None else block_size
+        self.lock = FileLock(self.path + ".lock")
+        # Следующий свободный ID блока и последний ID блока
+        self.next_id: int | None = None
+        self.last_id: int | None = None
+        self._thread_lock = threading.Lock()
 
-        if not os.path.exists(self.path):
-            # Если файл не существует, создаем его с пустым списком задач
-            with open(self.path, 'w', encoding='utf-8') as file:
-                file.write("1")
+        with self.lock:
+            if not os.path.exists(self.path):
+                # Если файл не существует, создаем его
+                atomic_write_text(self.path, "1", backups=0)
 
     def load_id(self) -> int:
         """Получает последний ID"""
@@ -27,13 +59,42 @@ class ManagerID:
         return int(id)
 
     def update_id(self, new_id: int) -> int:
-        """Сохраняет новое значение"""
-        with open(self.path, 'w', encoding='utf-8') as file:
-            file.write(str(new_id))
+        """Сохраняет новое значение, при сбое остается старое"""
+        atomic_write_text(self.path, str(new_id), backups=0)
         return new_id
 
+    def reserve(self, count: int) -> range:
+        """
+        Зарезервировать `count` ID подряд.
+        В файле остается последний зарезервированный ID.
+        """
+        with self.lock:
+            curr_id = self.load_id()
+            self.update_id(curr_id + count)
+        return range(curr_id + 1, curr_id + count + 1)
+
     def increment(self) -> int:
-        """Увеличивает значение на одну"""
-        curr_id = self.load_id()
-        new_id = self.update_id(curr_id + 1)
+        """Выдает следующий ID, при необходимости резервирует новый блок"""
+        with self._thread_lock:
+            if self.next_id is None or self.next_id > self.last_id:
+                block = self.reserve(max(self.block_size, 1))
+                self.next_id, self.last_id = block.start, block.stop - 1
+                _holding.add(self)
+            new_id = self.next_id
+            self.next_id += 1
         return new_id
+
+    def release(self) -> None:
+        """
+        Вернуть неиспользованный остаток блока, если после нас
+        никто ничего не резервировал. Иначе остаток пропадает,
+        в ID будет пропуск.
+        """
+        with self._thread_lock:
+            _holding.discard(self)
+            if self.next_id is None or self.next_id > self.last_id:
+                return
+            with self.lock:
+                if os.path.exists(self.path) and self.load_id() == self.last_id:
+                    self.update_id(self.next_id - 1)
+            self.next_id = self.last_id = None
@@ -0,0 +1,299 @@
+"""
+Замеры горячих мест хранилища и интерфейса, включаются по желанию.
+
+    TASKS_PROFILE=summary python main.py
+    TASKS_PROFILE=summary,trace python main.py list --pending
+    TASKS_PROFILE=cprofile python main.py
+
+Режимы (через запятую, переменная окружения важнее `settings.profile`):
+- `summary` - при выходе в stderr печатается сводка: сколько раз
+  вызывался каждый метод, сколько времени он занял, сколько байт
+  файлов задач прочитано и записано;
+- `trace` - каждый вызов пишется в `trace-<pid>.json` в формате
+  Chrome Trace Event (открывается в `chrome://tracing` или Perfetto);
+- `cprofile` - весь сеанс под `cProfile`, результат в `profile-<pid>.prof`
+  (`python -m pstats`).
+Файлы кладутся в `settings.profile_dir`.
+
+Выключенные замеры ничего не стоят: методы оборачиваются в `install`
+только тогда, когда замеры включены, иначе код остается прежним.
+"""
+import atexit
+import functools
+import os
+import sys
+import time
+from typing import Callable, Iterator
+
+from settings import settings
+
+ENV_VAR = "TASKS_PROFILE"
+MODES = ("summary", "trace", "cprofile")
+# Больше событий в трассе не пишется, чтобы не съесть всю память
+MAX_TRACE_EVENTS = 1_000_000
+
+# Что замерять: модуль -> класс -> методы
+STORE_TARGETS = {
+    "tasks.db": {
+        "TaskManagerJSON": [
+            "load_data", "save_data", "iter_records", "mutate", "add_task",
+            "edit_task", "remove_task", "add_tasks", "remove_tasks", "update_tasks",
+            "find_by_id", "get_tasks", "get_page", "get_cats", "get_cat_counts",
+            "get_incompleted", "get_urgent", "find_to_entry_title", "query_records",
+            "sync_indexes", "get_index",
+        ],
+        "TaskManagerJSONCached": ["load_data", "iter_records", "mutate", "add_tasks", "flush"],
+    },
+    "tasks.models": {
+        "Task": ["from_dict", "to_dict", "timing"],
+    },
+}
+# Методы экранов целиком не замеряются: в них же ждется ввод.
+# Отрисовка любого экрана - это `Console.print`, списков - `Screen.draw`.
+UI_TARGETS = {
+    "tasks.views": {
+        "TaskCLI": ["abb_repr_task", "build_abb_task"],
+    },
+    "utils.render": {
+        "Screen": ["draw", "render"],
+    },
+    "rich.console": {
+        "Console": ["print"],
+    },
+}
+
+
+class Stats:
+    """Накопленные замеры сеанса."""
+    def __init__(self, trace: bool = False) -> None:
+        # имя -> [вызовов, секунд]
+        self.calls: dict[str, list] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.trace = trace
+        self.events: list[dict] = []
+        self.started = time.perf_counter()
+
+    def add(self, name: str, start: float, elapsed: float) -> None:
+        """Учесть один вызов."""
+        entry = self.calls.get(name)
+        if entry is None:
+            entry = self.calls[name] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += elapsed
+        if self.trace and len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append({
+                "name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                "ts": (start - self.started) * 1e6, "dur": elapsed * 1e6,
+            })
+
+    def summary(self) -> str:
+        """Сводка по методам, самые долгие первыми."""
+        lines = [f"{'метод':<40} {'вызовов':>8} {'всего, мс':>10} {'среднее, мс':>12}"]
+        for name, (count, total) in sorted(self.calls.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<40} {count:>8} {total * 1000:>10.1f} "
+                         f"{total / count * 1000:>12.3f}")
+        lines.append(f"Прочитано из файлов задач: {self.bytes_read} байт, "
+                     f"записано: {self.bytes_written} байт")
+        return "\n".join(lines)
+
+
+stats: Stats | None = None
+# Что подменено: (класс или объект, атрибут, прежнее значение или `None`,
+# если атрибута у объекта не было)
+_replaced: list[tuple[object, str, object]] = []
+_profiler = None
+
+
+def replace_attr(owner: object, name: str, value: object) -> None:
+    """Подменить атрибут и запомнить прежний для `uninstall`."""
+    _replaced.append((owner, name, vars(owner).get(name)))
+    setattr(owner, name, value)
+
+
+class TimedIterator:
+    """Итератор, который засчитывает в `name` только время внутри `next`."""
+    def __init__(self, name: str, iterator: Iterator) -> None:
+        self.name = name
+        self.iterator = iterator
+        self.elapsed = 0.0
+        self.start = time.perf_counter()
+
+    def __iter__(self) -> "TimedIterator":
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            self.finish()
+            raise
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+    def finish(self) -> None:
+        if self.name is not None:
+            stats.add(self.name, self.start, self.elapsed)
+            self.name = None
+
+    def __del__(self) -> None:
+        # Поток бросили, не дочитав (например, после `islice`)
+        if stats is not None:
+            self.finish()
+
+
+def timed(name: str, func: Callable) -> Callable:
+    """Обертка, которая засчитывает вызовы `func` в `name`."""
+    import inspect
+
+    is_generator = inspect.isgeneratorfunction(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+        if is_generator or isinstance(result, Iterator):
+            # Время потока считается по мере чтения, без кода между `next`
+            timed_iterator = TimedIterator(name, result)
+            timed_iterator.elapsed = elapsed
+            return timed_iterator
+        stats.add(name, start, elapsed)
+        return result
+
+    return wrapper
+
+
+def wrap_targets(targets: dict[str, dict[str, list[str]]]) -> None:
+    """Обернуть методы из `targets`, уже обернутые пропускаются."""
+    import importlib
+
+    wrapped = {(owner, name) for owner, name, _ in _replaced}
+    for module_name, classes in targets.items():
+        module = importlib.import_module(module_name)
+        for class_name, methods in classes.items():
+            cls = getattr(module, class_name)
+            for method in methods:
+                # Только методы самого класса, унаследованные обернет родитель
+                func = cls.__dict__.get(method)
+                if func is None or (cls, method) in wrapped:
+                    continue
+                name = f"{class_name}.{method}"
+                if isinstance(func, classmethod):
+                    replace_attr(cls, method, classmethod(timed(name, func.__func__)))
+                elif isinstance(func, staticmethod):
+                    replace_attr(cls, method, staticmethod(timed(name, func.__func__)))
+                else:
+                    replace_attr(cls, method, timed(name, func))
+
+
+def count_file_bytes() -> None:
+    """Считать байты, которые форматы хранения читают и пишут."""
+    from utils.formats import FORMATS
+
+    for store_format in FORMATS.values():
+        for method in ("iter_records", "read_all"):
+            read = getattr(store_format, method)
+
+            def counted_read(path: str, read=read):
+                stats.bytes_read += os.path.getsize(path)
+                return read(path)
+
+            replace_attr(store_format, method, counted_read)
+
+        for method in ("write", "write_all"):
+            write = getattr(store_format, method)
+
+            def counted_write(path: str, records, write=write) -> None:
+                write(path, records)
+                stats.bytes_written += os.path.getsize(path)
+
+            replace_attr(store_format, method, counted_write)
+
+
+def enabled_modes() -> set[str]:
+    """Включенные режимы из переменной окружения или настроек."""
+    value = os.environ.get(ENV_VAR, settings.profile) or ""
+    modes = {mode.strip() for mode in value.split(",") if mode.strip()}
+    unknown = modes - set(MODES)
+    if unknown:
+        print(f"Неизвестные режимы {ENV_VAR}: {', '.join(sorted(unknown))}", file=sys.stderr)
+    return modes & set(MODES)
+
+
+def install(ui: bool = False) -> bool:
+    """
+    Включить замеры, если они заданы. Вызывать при запуске,
+    до создания менеджера и экранов.
+    :param ui: Замерять еще и отрисовку (модули `rich` будут загружены).
+    :return: Включены ли замеры.
+    """
+    global stats, _profiler
+    modes = enabled_modes()
+    if not modes:
+        return False
+    if stats is None:
+        stats = Stats(trace="trace" in modes)
+        count_file_bytes()
+        atexit.register(report, modes)
+        if "cprofile" in modes:
+            import cProfile
+
+            _profiler = cProfile.Profile()
+            _profiler.enable()
+            atexit.register(dump_profile, _profiler)
+    wrap_targets(STORE_TARGETS)
+    if ui:
+        wrap_targets(UI_TARGETS)
+    return True
+
+
+def uninstall() -> Stats | None:
+    """
+    Вернуть методы как были, без отчета при выходе.
+    :return: Замеры сеанса.
+    """
+    global stats, _profiler
+    for owner, name, original in reversed(_replaced):
+        if original is None:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+    _replaced.clear()
+    atexit.unregister(report)
+    if _profiler is not None:
+        _profiler.disable()
+        atexit.unregister(dump_profile)
+        _profiler = None
+    session, stats = stats, None
+    return session
+
+
+def output_path(name: str) -> str:
+    """Путь к файлу замеров этого процесса."""
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    return os.path.join(settings.profile_dir, f"{name}-{os.getpid()}")
+
+
+def dump_profile(profiler) -> None:
+    """Сохранить результаты `cProfile`."""
+    profiler.disable()
+    path = output_path("profile") + ".prof"
+    profiler.dump_stats(path)
+    print(f"Профиль сохранен: {path}", file=sys.stderr)
+
+
+def report(modes: set[str]) -> None:
+    """Вывести сводку и сохранить трассу в конце сеанса."""
+    if "summary" in modes:
+        print(stats.summary(), file=sys.stderr)
+    if "trace" in modes:
+        import json
+
+        path = output_path("trace") + ".json"
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": stats.events}, file, ensure_ascii=False)
+        print(f"Трасса сохранена: {path}", file=sys.stderr)
@@ -0,0 +1,127 @@
+"""
+Быстрая отрисовка экранов в терминале.
+
+`RenderCache` хранит готовые renderable задач, чтобы не собирать
+`Text` и `Group` заново на каждой странице. `Screen` перерисовывает
+экран без очистки: курсор уходит в начало, а переписываются только
+строки, которые поменялись с прошлого кадра. На медленных терминалах
+и по SSH так экран не мигает и по сети уходит меньше байтов.
+"""
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from rich.console import Console, RenderableType
+
+from settings import settings
+
+# Очистить экран и поставить курсор в начало
+CLEAR_HOME = "\x1b[H\x1b[2J"
+# Стереть строку от курсора до конца / экран от курсора до конца
+ERASE_LINE = "\x1b[K"
+ERASE_BELOW = "\x1b[J"
+# Строк внизу экрана под ввод: если кадр их занимает,
+# терминал прокрутится и сравнивать кадры будет не с чем
+INPUT_ROWS = 2
+
+
+def move_to(row: int) -> str:
+    """Курсор в начало строки `row` (с нуля)."""
+    return f"\x1b[{row + 1};1H"
+
+
+class RenderCache:
+    """
+    Готовые renderable задач по ID.
+    Вместе с renderable хранится ключ - значения, из которых он
+    собран; если ключ поменялся, renderable собирается заново.
+    Старые записи вытесняются, когда их больше `max_size`.
+    """
+    def __init__(self, max_size: int = 512) -> None:
+        self.max_size = max_size
+        self.items: OrderedDict[int, tuple[Hashable, RenderableType]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(
+            self,
+            task_id: int,
+            key: Hashable,
+            build: Callable[[], RenderableType]
+    ) -> RenderableType:
+        """Готовый renderable задачи или собранный `build` и запомненный."""
+        item = self.items.get(task_id)
+        if item is not None and item[0] == key:
+            self.items.move_to_end(task_id)
+            return item[1]
+        renderable = build()
+        self.items[task_id] = (key, renderable)
+        self.items.move_to_end(task_id)
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+        return renderable
+
+    def invalidate(self, task_id: int | None = None) -> None:
+        """Забыть renderable задачи, без `task_id` - все."""
+        if task_id is None:
+            self.items.clear()
+        else:
+            self.items.pop(task_id, None)
+
+
+class Screen:
+    """
+    Экран терминала, который помнит последний нарисованный кадр.
+    `draw` переписывает только изменившиеся строки, `clear` - обычная
+    очистка для экранов с вводом, после нее кадр рисуется целиком.
+    """
+    def __init__(self, console: Console, diff: bool | None = None) -> None:
+        """
+        :param console: Консоль, в которую рисовать.
+        :param diff: Перерисовывать по разнице кадров,
+        по умолчанию `settings.diff_redraw`.
+        """
+        self.console = console
+        self.diff = settings.diff_redraw if diff is None else diff
+        # Строки последнего кадра вместе с кодами стилей
+        self.lines: list[str] | None = None
+
+    def clear(self) -> None:
+        """Очистить экран, следующий кадр рисуется целиком."""
+        self.console.clear()
+        self.lines = None
+
+    def render(self, renderable: RenderableType) -> list[str]:
+        """Кадр в виде строк терминала."""
+        with self.console.capture() as capture:
+            self.console.print(renderable)
+        return capture.get().splitlines()
+
+    def frame(self, lines: list[str]) -> str:
+        """
+        Что записать в терминал, чтобы показать кадр `lines`.
+        Запоминает кадр для следующего сравнения.
+        """
+        previous = self.lines
+        fits = len(lines) + INPUT_ROWS <= self.console.height
+        # Кадр выше экрана прокрутит терминал, его не сравнить со следующим
+        self.lines = lines if fits else None
+        if previous is None or not fits:
+            return CLEAR_HOME + "\n".join(lines) + "\n"
+
+        out = []
+        for row, line in enumerate(lines):
+            if row >= len(previous) or previous[row] != line:
+                out.append(move_to(row) + line + ERASE_LINE)
+        # Под кадром стираются хвост прошлого кадра и прошлый ввод
+        out.append(move_to(len(lines)) + ERASE_BELOW)
+        return "".join(out)
+
+    def draw(self, renderable: RenderableType) -> None:
+        """Показать кадр вместо предыдущего."""
+        if not self.diff or not self.console.is_terminal:
+            self.clear()
+            self.console.print(renderable)
+            return
+        self.console.file.write(self.frame(self.render(renderable)))
+        self.console.file.flush()
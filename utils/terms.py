@@ -0,0 +1,36 @@
+import re
+from datetime import datetime, timedelta
+
+
+HOURS_RE = re.compile(r"h(\d+)")
+DAYS_RE = re.compile(r"d(\d+)")
+MONTHS_RE = re.compile(r"m(\d+)")
+
+
+def parse_term(text: str) -> timedelta | None:
+    """
+    Разобрать срок вида `h12 d2 m1` (часы, дни, месяцы).
+    Месяц считается за 30 дней.
+    :return: Длительность или `None`, если срока в строке нет.
+    """
+    match_hours = HOURS_RE.search(text)
+    match_days = DAYS_RE.search(text)
+    match_months = MONTHS_RE.search(text)
+    if not match_hours and not match_days and not match_months:
+        return None
+
+    hours = int(match_hours.group(1)) if match_hours else 0
+    days = int(match_days.group(1)) if match_days else 0
+    months = int(match_months.group(1)) if match_months else 0
+    return timedelta(hours=hours, days=days + months * 30)
+
+
+def deadline_from_term(text: str) -> str | None:
+    """
+    Срок задачи от текущего момента в `isoformat`.
+    :return: Срок или `None`, если строка не разобрана.
+    """
+    term = parse_term(text)
+    if term is None:
+        return None
+    return (datetime.now() + term).isoformat()